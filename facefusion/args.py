@@ -60,6 +60,10 @@ def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	# face landmarker
 	apply_state_item('face_landmarker_model', args.get('face_landmarker_model'))
 	apply_state_item('face_landmarker_score', args.get('face_landmarker_score'))
+	# face tracker
+	apply_state_item('face_tracker', args.get('face_tracker'))
+	apply_state_item('face_tracker_interval', args.get('face_tracker_interval'))
+	apply_state_item('face_tracker_score', args.get('face_tracker_score'))
 	# face selector
 	apply_state_item('face_selector_mode', args.get('face_selector_mode'))
 	apply_state_item('face_selector_order', args.get('face_selector_order'))
@@ -82,6 +86,8 @@ def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	apply_state_item('trim_frame_end', args.get('trim_frame_end'))
 	apply_state_item('temp_frame_format', args.get('temp_frame_format'))
 	apply_state_item('keep_temp', args.get('keep_temp'))
+	apply_state_item('frame_pipeline', args.get('frame_pipeline'))
+	apply_state_item('video_segment_count', args.get('video_segment_count'))
 	# output creation
 	apply_state_item('output_image_quality', args.get('output_image_quality'))
 	if is_image(args.get('target_path')):
@@ -120,14 +126,27 @@ def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	apply_state_item('execution_providers', args.get('execution_providers'))
 	apply_state_item('execution_thread_count', args.get('execution_thread_count'))
 	apply_state_item('execution_queue_count', args.get('execution_queue_count'))
+	apply_state_item('execution_backend', args.get('execution_backend'))
+	apply_state_item('execution_batch_size', args.get('execution_batch_size'))
+	apply_state_item('execution_batch_wait', args.get('execution_batch_wait'))
+	apply_state_item('execution_session_count', args.get('execution_session_count'))
+	apply_state_item('execution_concurrency_limit', args.get('execution_concurrency_limit'))
+	apply_state_item('execution_intra_op_thread_count', args.get('execution_intra_op_thread_count'))
+	apply_state_item('execution_inter_op_thread_count', args.get('execution_inter_op_thread_count'))
+	apply_state_item('execution_graph_optimization', args.get('execution_graph_optimization'))
+	apply_state_item('execution_quantization', args.get('execution_quantization'))
 	# download
 	apply_state_item('download_providers', args.get('download_providers'))
 	apply_state_item('download_scope', args.get('download_scope'))
 	# memory
 	apply_state_item('video_memory_strategy', args.get('video_memory_strategy'))
 	apply_state_item('system_memory_limit', args.get('system_memory_limit'))
+	apply_state_item('face_store_memory_limit', args.get('face_store_memory_limit'))
+	apply_state_item('inference_pool_memory_limit', args.get('inference_pool_memory_limit'))
 	# misc
 	apply_state_item('log_level', args.get('log_level'))
+	apply_state_item('log_inference_profile', args.get('log_inference_profile'))
+	apply_state_item('inference_profile_path', args.get('inference_profile_path'))
 	# jobs
 	apply_state_item('job_id', args.get('job_id'))
 	apply_state_item('job_status', args.get('job_status'))
@@ -0,0 +1,166 @@
+import os
+import platform
+import sys
+from time import perf_counter
+from typing import List, Optional, Tuple
+
+import numpy
+import psutil
+
+from facefusion import config, inference_manager, logger, process_manager, state_manager, wording
+from facefusion.common_helper import get_first
+from facefusion.face_analyser import get_many_faces
+from facefusion.filesystem import create_directory, is_image, is_video
+from facefusion.hash_helper import create_hash
+from facefusion.json import read_json, write_json
+from facefusion.processors.core import has_face_processors, multi_process_chain_frames
+from facefusion.temp_helper import clear_temp_directory, create_temp_directory, get_temp_directory_path
+from facefusion.typing import AutotuneConfig, AutotuneConfigSet, VisionFrame
+from facefusion.vision import count_video_frame_total, read_static_image, sample_video_frames, write_image
+
+AUTOTUNE_FRAME_TOTAL = 16
+AUTOTUNE_FACE_FRAME_STEP = 4
+AUTOTUNE_THREAD_COUNTS = [ 1, 2, 4, 8, 16, 32 ]
+AUTOTUNE_QUEUE_COUNTS = [ 1, 2 ]
+AUTOTUNE_BATCH_SIZES = [ 1, 4 ]
+AUTOTUNE_INTRA_OP_THREAD_COUNTS = [ 0, 1, 2 ]
+
+
+def autotune(source_paths : List[str], target_path : Optional[str]) -> Optional[AutotuneConfig]:
+	sample_vision_frames = create_sample_frames(target_path)
+	temp_frame_paths = [ os.path.join(get_temp_directory_path('autotune'), str(frame_number).zfill(4) + '.png') for frame_number in range(len(sample_vision_frames)) ]
+
+	if has_face_processors(state_manager.get_item('processors')) and not has_sample_faces(sample_vision_frames):
+		logger.warn(wording.get('autotuning_without_faces'), __name__)
+		return None
+	autotune_config : AutotuneConfig =\
+	{
+		'execution_thread_count': get_first(resolve_autotune_thread_counts()),
+		'execution_queue_count': get_first(AUTOTUNE_QUEUE_COUNTS),
+		'execution_batch_size': get_first(AUTOTUNE_BATCH_SIZES),
+		'execution_intra_op_thread_count': get_first(AUTOTUNE_INTRA_OP_THREAD_COUNTS)
+	}
+
+	state_manager.init_item('temp_frame_format', 'png')
+	state_manager.init_item('face_selector_mode', 'many')
+	create_temp_directory('autotune')
+	process_manager.start()
+	best_frames_per_second = run_autotune_trial(source_paths, temp_frame_paths, sample_vision_frames, autotune_config)
+
+	for key, values in resolve_autotune_search():
+		for value in values:
+			if not process_manager.is_processing():
+				break
+			if value == autotune_config.get(key):
+				continue
+			trial_autotune_config : AutotuneConfig = autotune_config.copy()
+			trial_autotune_config[key] = value #type:ignore[literal-required]
+			frames_per_second = run_autotune_trial(source_paths, temp_frame_paths, sample_vision_frames, trial_autotune_config)
+
+			if frames_per_second <= best_frames_per_second:
+				break
+			autotune_config = trial_autotune_config
+			best_frames_per_second = frames_per_second
+
+	process_manager.end()
+	clear_temp_directory('autotune')
+	inference_manager.clear_inference_pools()
+
+	if best_frames_per_second:
+		write_autotune_config(autotune_config)
+		return autotune_config
+	return None
+
+
+def run_autotune_trial(source_paths : List[str], temp_frame_paths : List[str], sample_vision_frames : List[VisionFrame], autotune_config : AutotuneConfig) -> float:
+	if state_manager.get_item('execution_intra_op_thread_count') != autotune_config.get('execution_intra_op_thread_count'):
+		inference_manager.clear_inference_pools()
+	for key, value in autotune_config.items():
+		state_manager.init_item(key, value) #type:ignore[arg-type]
+
+	write_image(get_first(temp_frame_paths), get_first(sample_vision_frames))
+	multi_process_chain_frames(source_paths, temp_frame_paths[:1])
+	for temp_frame_path, sample_vision_frame in zip(temp_frame_paths, sample_vision_frames):
+		write_image(temp_frame_path, sample_vision_frame)
+	start_time = perf_counter()
+	multi_process_chain_frames(source_paths, temp_frame_paths)
+	frames_per_second = len(temp_frame_paths) / (perf_counter() - start_time)
+	logger.debug(wording.get('autotuning_trial').format(thread_count = autotune_config.get('execution_thread_count'), queue_count = autotune_config.get('execution_queue_count'), batch_size = autotune_config.get('execution_batch_size'), intra_op_thread_count = autotune_config.get('execution_intra_op_thread_count'), frames_per_second = round(frames_per_second, 2)), __name__)
+	return frames_per_second
+
+
+def has_sample_faces(sample_vision_frames : List[VisionFrame]) -> bool:
+	return any(get_many_faces([ sample_vision_frame ]) for sample_vision_frame in sample_vision_frames[::AUTOTUNE_FACE_FRAME_STEP])
+
+
+def create_sample_frames(target_path : Optional[str]) -> List[VisionFrame]:
+	if is_image(target_path):
+		return [ read_static_image(target_path) ] * AUTOTUNE_FRAME_TOTAL
+	if is_video(target_path):
+		video_frame_total = count_video_frame_total(target_path)
+		frame_step = max(video_frame_total // AUTOTUNE_FRAME_TOTAL, 1)
+		return [ vision_frame for _, vision_frame in sample_video_frames(target_path, 0, video_frame_total, frame_step) ][:AUTOTUNE_FRAME_TOTAL]
+	return list(numpy.random.default_rng(0).integers(0, 255, (AUTOTUNE_FRAME_TOTAL, 720, 1280, 3), dtype = numpy.uint8))
+
+
+def resolve_autotune_search() -> List[Tuple[str, List[int]]]:
+	return\
+	[
+		('execution_thread_count', resolve_autotune_thread_counts()),
+		('execution_batch_size', AUTOTUNE_BATCH_SIZES),
+		('execution_queue_count', AUTOTUNE_QUEUE_COUNTS),
+		('execution_intra_op_thread_count', AUTOTUNE_INTRA_OP_THREAD_COUNTS)
+	]
+
+
+def resolve_autotune_thread_counts() -> List[int]:
+	return [ thread_count for thread_count in AUTOTUNE_THREAD_COUNTS if thread_count <= max(os.cpu_count() or 1, 1) ]
+
+
+def create_hardware_fingerprint() -> str:
+	hardware_fingerprint = '|'.join(
+	[
+		platform.system(),
+		platform.machine(),
+		platform.processor(),
+		str(os.cpu_count()),
+		str(psutil.virtual_memory().total // 1024 ** 3),
+		state_manager.get_item('execution_device_id'),
+		'_'.join(state_manager.get_item('execution_providers'))
+	])
+	return create_hash(hardware_fingerprint.encode())
+
+
+def create_autotune_key() -> str:
+	return create_hardware_fingerprint() + '.' + '_'.join(state_manager.get_item('processors'))
+
+
+def get_autotune_path() -> str:
+	return os.path.join('.caches', 'autotune.json')
+
+
+def get_autotune_config() -> Optional[AutotuneConfig]:
+	autotune_config_set : AutotuneConfigSet = read_json(get_autotune_path()) or {} #type:ignore[assignment]
+	return autotune_config_set.get(create_autotune_key())
+
+
+def write_autotune_config(autotune_config : AutotuneConfig) -> bool:
+	autotune_config_set : AutotuneConfigSet = read_json(get_autotune_path()) or {} #type:ignore[assignment]
+	autotune_config_set[create_autotune_key()] = autotune_config
+	create_directory(os.path.dirname(get_autotune_path()))
+	return write_json(get_autotune_path(), autotune_config_set) #type:ignore[arg-type]
+
+
+def conditional_apply_autotune() -> None:
+	autotune_config = get_autotune_config()
+
+	if autotune_config:
+		for key, value in autotune_config.items():
+			if not is_explicit_item(key):
+				state_manager.init_item(key, value) #type:ignore[arg-type]
+				logger.debug(wording.get('applying_autotune').format(key = key, value = value), __name__)
+
+
+def is_explicit_item(key : str) -> bool:
+	argument_name = '--' + key.replace('_', '-')
+	return bool(config.get_str_value('execution.' + key)) or any(argument.split('=')[0] == argument_name for argument in sys.argv)
@@ -2,7 +2,7 @@ import logging
 from typing import List, Sequence
 
 from facefusion.common_helper import create_float_range, create_int_range
-from facefusion.typing import Angle, DownloadProvider, DownloadProviderSet, DownloadScope, ExecutionProvider, ExecutionProviderSet, FaceDetectorModel, FaceDetectorSet, FaceLandmarkerModel, FaceMaskRegion, FaceMaskRegionSet, FaceMaskType, FaceOccluderModel, FaceParserModel, FaceSelectorMode, FaceSelectorOrder, Gender, JobStatus, LogLevel, LogLevelSet, OutputAudioEncoder, OutputVideoEncoder, OutputVideoPreset, Race, Score, TempFrameFormat, UiWorkflow, VideoMemoryStrategy
+from facefusion.typing import Angle, DownloadProvider, DownloadProviderSet, DownloadScope, ExecutionBackend, ExecutionGraphOptimization, ExecutionProvider, ExecutionProviderSet, ExecutionQuantization, FaceDetectorModel, FaceDetectorSet, FaceLandmarkerModel, FaceMaskRegion, FaceMaskRegionSet, FaceMaskType, FaceOccluderModel, FaceParserModel, FaceSelectorMode, FaceSelectorOrder, FramePipeline, Gender, JobStatus, LogLevel, LogLevelSet, OutputAudioEncoder, OutputVideoEncoder, OutputVideoPreset, Race, Score, TempFrameFormat, UiWorkflow, VideoMemoryStrategy
 
 face_detector_set : FaceDetectorSet =\
 {
@@ -34,7 +34,8 @@ face_mask_region_set : FaceMaskRegionSet =\
 	'lower-lip': 13
 }
 face_mask_regions : List[FaceMaskRegion] = list(face_mask_region_set.keys())
-temp_frame_formats : List[TempFrameFormat] = [ 'bmp', 'jpg', 'png' ]
+temp_frame_formats : List[TempFrameFormat] = [ 'bmp', 'jpg', 'png', 'raw' ]
+frame_pipelines : List[FramePipeline] = [ 'temp', 'fused', 'stream' ]
 output_audio_encoders : List[OutputAudioEncoder] = [ 'aac', 'libmp3lame', 'libopus', 'libvorbis' ]
 output_video_encoders : List[OutputVideoEncoder] = [ 'libx264', 'libx265', 'libvpx-vp9', 'h264_nvenc', 'hevc_nvenc', 'h264_amf', 'hevc_amf', 'h264_qsv', 'hevc_qsv', 'h264_videotoolbox', 'hevc_videotoolbox' ]
 output_video_presets : List[OutputVideoPreset] = [ 'ultrafast', 'superfast', 'veryfast', 'faster', 'fast', 'medium', 'slow', 'slower', 'veryslow' ]
@@ -53,6 +54,9 @@ execution_provider_set : ExecutionProviderSet =\
 	'tensorrt': 'TensorrtExecutionProvider'
 }
 execution_providers : List[ExecutionProvider] = list(execution_provider_set.keys())
+execution_backends : List[ExecutionBackend] = [ 'thread', 'process' ]
+execution_graph_optimizations : List[ExecutionGraphOptimization] = [ 'disable', 'basic', 'extended', 'all' ]
+execution_quantizations : List[ExecutionQuantization] = [ 'none', 'int8' ]
 download_provider_set : DownloadProviderSet =\
 {
 	'github':
@@ -87,10 +91,20 @@ job_statuses : List[JobStatus] = [ 'drafted', 'queued', 'completed', 'failed' ]
 
 execution_thread_count_range : Sequence[int] = create_int_range(1, 32, 1)
 execution_queue_count_range : Sequence[int] = create_int_range(1, 4, 1)
+execution_batch_size_range : Sequence[int] = create_int_range(1, 64, 1)
+execution_batch_wait_range : Sequence[int] = create_int_range(0, 100, 1)
+execution_session_count_range : Sequence[int] = create_int_range(1, 8, 1)
+execution_concurrency_limit_range : Sequence[int] = create_int_range(0, 32, 1)
+execution_op_thread_count_range : Sequence[int] = create_int_range(0, 64, 1)
 system_memory_limit_range : Sequence[int] = create_int_range(0, 128, 4)
+video_segment_count_range : Sequence[int] = create_int_range(1, 16, 1)
+face_store_memory_limit_range : Sequence[int] = create_int_range(0, 4096, 64)
+inference_pool_memory_limit_range : Sequence[int] = create_int_range(0, 65536, 256)
 face_detector_angles : Sequence[Angle] = create_int_range(0, 270, 90)
 face_detector_score_range : Sequence[Score] = create_float_range(0.0, 1.0, 0.05)
 face_landmarker_score_range : Sequence[Score] = create_float_range(0.0, 1.0, 0.05)
+face_tracker_interval_range : Sequence[int] = create_int_range(1, 60, 1)
+face_tracker_score_range : Sequence[Score] = create_float_range(0.0, 1.0, 0.05)
 face_mask_blur_range : Sequence[float] = create_float_range(0.0, 1.0, 0.05)
 face_mask_padding_range : Sequence[int] = create_int_range(0, 100, 1)
 face_selector_age_range : Sequence[int] = create_int_range(0, 100, 1)
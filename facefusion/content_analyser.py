@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import List
 
 import cv2
 import numpy
@@ -7,12 +8,13 @@ from tqdm import tqdm
 from facefusion import inference_manager, state_manager, wording
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.filesystem import resolve_relative_path
-from facefusion.thread_helper import conditional_thread_semaphore
-from facefusion.typing import DownloadScope, Fps, InferencePool, ModelOptions, ModelSet, VisionFrame
-from facefusion.vision import detect_video_fps, get_video_frame, read_image
+from facefusion.inference_batcher import run_inference_batch
+from facefusion.typing import DownloadScope, Fps, InferencePool, ModelOptions, ModelSet, VisionFrame, VisionFrameBatch
+from facefusion.vision import detect_video_fps, read_image, sample_video_frames
 
 PROBABILITY_LIMIT = 0.80
 RATE_LIMIT = 10
+ANALYSE_BATCH_SIZE = 8
 STREAM_COUNTER = 0
 
 
@@ -71,22 +73,24 @@ def analyse_stream(vision_frame : VisionFrame, video_fps : Fps) -> bool:
 
 
 def analyse_frame(vision_frame : VisionFrame) -> bool:
-	vision_frame = prepare_frame(vision_frame)
-	probability = forward(vision_frame)
+	return analyse_frames([ vision_frame ])[0]
 
-	return probability > PROBABILITY_LIMIT
 
+def analyse_frames(vision_frames : List[VisionFrame]) -> List[bool]:
+	vision_frame_batch = numpy.concatenate([ prepare_frame(vision_frame) for vision_frame in vision_frames ])
+	probabilities = forward(vision_frame_batch)
 
-def forward(vision_frame : VisionFrame) -> float:
-	content_analyser = get_inference_pool().get('content_analyser')
+	return [ probability > PROBABILITY_LIMIT for probability in probabilities ]
 
-	with conditional_thread_semaphore():
-		probability = content_analyser.run(None,
-		{
-			'input': vision_frame
-		})[0][0][1]
 
-	return probability
+def forward(vision_frame_batch : VisionFrameBatch) -> List[float]:
+	content_analyser = get_inference_pool().get('content_analyser')
+	probabilities = run_inference_batch(content_analyser,
+	{
+		'input': vision_frame_batch
+	})[:, 1]
+
+	return probabilities.tolist()
 
 
 def prepare_frame(vision_frame : VisionFrame) -> VisionFrame:
@@ -108,16 +112,24 @@ def analyse_image(image_path : str) -> bool:
 def analyse_video(video_path : str, trim_frame_start : int, trim_frame_end : int) -> bool:
 	video_fps = detect_video_fps(video_path)
 	frame_range = range(trim_frame_start, trim_frame_end)
+	vision_frames = []
 	rate = 0.0
 	counter = 0
 
 	with tqdm(total = len(frame_range), desc = wording.get('analysing'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
-		for frame_number in frame_range:
-			if frame_number % int(video_fps) == 0:
-				vision_frame = get_video_frame(video_path, frame_number)
-				if analyse_frame(vision_frame):
-					counter += 1
+		for frame_number, vision_frame in sample_video_frames(video_path, trim_frame_start, trim_frame_end, int(video_fps)):
+			vision_frames.append(vision_frame)
+			if len(vision_frames) == ANALYSE_BATCH_SIZE:
+				counter += analyse_frames(vision_frames).count(True)
+				rate = counter * int(video_fps) / len(frame_range) * 100
+				vision_frames.clear()
+				progress.update(frame_number - trim_frame_start + 1 - progress.n)
+				progress.set_postfix(rate = rate)
+				if rate > RATE_LIMIT:
+					break
+		if vision_frames and rate <= RATE_LIMIT:
+			counter += analyse_frames(vision_frames).count(True)
 			rate = counter * int(video_fps) / len(frame_range) * 100
-			progress.update()
-			progress.set_postfix(rate = rate)
+		progress.update(len(frame_range) - progress.n)
+		progress.set_postfix(rate = rate)
 	return rate > RATE_LIMIT
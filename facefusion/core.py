@@ -2,31 +2,39 @@ import itertools
 import shutil
 import signal
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from time import time
+from types import ModuleType
+from typing import Iterator, List
 
 import numpy
+from tqdm import tqdm
 
-from facefusion import content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, logger, process_manager, state_manager, voice_extractor, wording
+from facefusion import content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, inference_manager, logger, process_manager, state_manager, voice_extractor, wording
 from facefusion.args import apply_args, collect_job_args, reduce_job_args, reduce_step_args
+from facefusion.autotuner import autotune, conditional_apply_autotune
 from facefusion.common_helper import get_first
 from facefusion.content_analyser import analyse_image, analyse_video
 from facefusion.download import conditional_download_hashes, conditional_download_sources
 from facefusion.exit_helper import conditional_exit, graceful_exit, hard_exit
-from facefusion.face_analyser import get_average_face, get_many_faces, get_one_face
+from facefusion.face_analyser import detect_many_faces, get_average_face, get_face_analyses, get_one_face, get_source_face_analyses
 from facefusion.face_selector import sort_and_filter_faces
 from facefusion.face_store import append_reference_face, clear_reference_faces, get_reference_faces
-from facefusion.ffmpeg import copy_image, extract_frames, finalize_image, merge_video, replace_audio, restore_audio
+from facefusion.ffmpeg import concat_video, copy_image, detect_video_keyframes, extract_frames, finalize_image, merge_video, replace_audio, restore_audio, stream_video, stream_video_segment
 from facefusion.filesystem import filter_audio_paths, is_image, is_video, list_directory, resolve_file_pattern
+from facefusion.inference_profiler import conditional_log_inference_profiles
 from facefusion.jobs import job_helper, job_manager, job_runner
 from facefusion.jobs.job_list import compose_job_list
 from facefusion.memory import limit_system_memory
-from facefusion.processors.core import get_processors_modules
+from facefusion.processors.core import get_processors_modules, has_face_processors, multi_process_chain_frames, multi_process_stream
 from facefusion.program import create_program
 from facefusion.program_helper import validate_args
 from facefusion.statistics import conditional_log_statistics
-from facefusion.temp_helper import clear_temp_directory, create_temp_directory, get_temp_file_path, get_temp_frame_paths, move_temp_file
-from facefusion.typing import Args, ErrorCode
-from facefusion.vision import get_video_frame, pack_resolution, read_image, read_static_images, restrict_image_resolution, restrict_trim_frame, restrict_video_fps, restrict_video_resolution, unpack_resolution
+from facefusion.temp_helper import clear_temp_directory, create_temp_directory, get_temp_file_path, get_temp_frame_format, get_temp_frame_paths, get_temp_segment_path, move_temp_file
+from facefusion.thread_helper import split_thread_count
+from facefusion.typing import Args, ErrorCode, Fps, UpdateProgress, VideoSegment, VisionFrame
+from facefusion.vision import calc_video_segments, detect_video_fps, get_video_frame, pack_resolution, read_image, read_static_images, restrict_image_resolution, restrict_trim_frame, restrict_video_fps, restrict_video_resolution, unpack_resolution
 
 
 def cli() -> None:
@@ -60,6 +68,14 @@ def route(args : Args) -> None:
 		hard_exit(error_code)
 	if not pre_check():
 		return conditional_exit(2)
+	if state_manager.get_item('command') == 'autotune':
+		if not common_pre_check() or not processors_pre_check():
+			return conditional_exit(2)
+		error_code = run_autotune()
+		hard_exit(error_code)
+	if state_manager.get_item('command') in [ 'run', 'headless-run', 'batch-run' ]:
+		conditional_apply_autotune()
+		warm_up()
 	if state_manager.get_item('command') == 'run':
 		import facefusion.uis.core as ui
 
@@ -127,6 +143,39 @@ def processors_pre_check() -> bool:
 	return True
 
 
+def warm_up() -> None:
+	inference_manager.warm_up_inference_pools(collect_warm_up_modules())
+
+
+def collect_warm_up_modules() -> List[ModuleType]:
+	processors = state_manager.get_item('processors')
+	face_mask_types = state_manager.get_item('face_mask_types') or []
+	model_modules : List[ModuleType] = [ content_analyser ]
+
+	if has_face_processors(processors):
+		model_modules.extend([ face_detector, face_landmarker ])
+		if 'face_swapper' in processors or 'recognizer' in get_face_analyses():
+			model_modules.append(face_recognizer)
+		if 'classifier' in get_face_analyses():
+			model_modules.append(face_classifier)
+		if 'occlusion' in face_mask_types or 'region' in face_mask_types:
+			model_modules.append(face_masker)
+	if 'lip_syncer' in processors or filter_audio_paths(state_manager.get_item('source_paths')):
+		model_modules.append(voice_extractor)
+	model_modules.extend(get_processors_modules(processors))
+	return model_modules
+
+
+def run_autotune() -> ErrorCode:
+	autotune_config = autotune(state_manager.get_item('source_paths'), state_manager.get_item('target_path'))
+
+	if autotune_config:
+		logger.info(wording.get('autotuning_succeed').format(thread_count = autotune_config.get('execution_thread_count'), queue_count = autotune_config.get('execution_queue_count'), batch_size = autotune_config.get('execution_batch_size'), intra_op_thread_count = autotune_config.get('execution_intra_op_thread_count')), __name__)
+		return 0
+	logger.error(wording.get('autotuning_failed'), __name__)
+	return 1
+
+
 def force_download() -> ErrorCode:
 	common_modules =\
 	[
@@ -319,33 +368,41 @@ def conditional_process() -> ErrorCode:
 		if not processor_module.pre_process('output'):
 			return 2
 	conditional_append_reference_faces()
+	error_code : ErrorCode = 0
 	if is_image(state_manager.get_item('target_path')):
-		return process_image(start_time)
+		error_code = process_image(start_time)
 	if is_video(state_manager.get_item('target_path')):
-		return process_video(start_time)
-	return 0
+		error_code = process_video(start_time)
+	conditional_log_inference_profiles()
+	return error_code
 
 
 def conditional_append_reference_faces() -> None:
 	if 'reference' in state_manager.get_item('face_selector_mode') and not get_reference_faces():
 		source_frames = read_static_images(state_manager.get_item('source_paths'))
-		source_faces = get_many_faces(source_frames)
-		source_face = get_average_face(source_faces)
 		if is_video(state_manager.get_item('target_path')):
 			reference_frame = get_video_frame(state_manager.get_item('target_path'), state_manager.get_item('reference_frame_number'))
 		else:
 			reference_frame = read_image(state_manager.get_item('target_path'))
-		reference_faces = sort_and_filter_faces(get_many_faces([ reference_frame ]))
+		many_faces = detect_many_faces(source_frames + [ reference_frame ], get_source_face_analyses())
+		source_face = get_average_face([ face for faces in many_faces[:-1] for face in faces ])
+		reference_faces = sort_and_filter_faces(many_faces[-1])
 		reference_face = get_one_face(reference_faces, state_manager.get_item('reference_face_position'))
 		append_reference_face('origin', reference_face)
 
 		if source_face and reference_face:
+			abstract_processor_names = []
+			abstract_reference_frames = []
+
 			for processor_module in get_processors_modules(state_manager.get_item('processors')):
 				abstract_reference_frame = processor_module.get_reference_frame(source_face, reference_face, reference_frame)
 				if numpy.any(abstract_reference_frame):
-					abstract_reference_faces = sort_and_filter_faces(get_many_faces([ abstract_reference_frame ]))
-					abstract_reference_face = get_one_face(abstract_reference_faces, state_manager.get_item('reference_face_position'))
-					append_reference_face(processor_module.__name__, abstract_reference_face)
+					abstract_processor_names.append(processor_module.__name__)
+					abstract_reference_frames.append(abstract_reference_frame)
+
+			for processor_name, abstract_reference_faces in zip(abstract_processor_names, detect_many_faces(abstract_reference_frames)):
+				abstract_reference_face = get_one_face(sort_and_filter_faces(abstract_reference_faces), state_manager.get_item('reference_face_position'))
+				append_reference_face(processor_name, abstract_reference_face)
 
 
 def process_image(start_time : float) -> ErrorCode:
@@ -408,44 +465,15 @@ def process_video(start_time : float) -> ErrorCode:
 	# create temp
 	logger.debug(wording.get('creating_temp'), __name__)
 	create_temp_directory(state_manager.get_item('target_path'))
-	# extract frames
 	process_manager.start()
 	temp_video_resolution = pack_resolution(restrict_video_resolution(state_manager.get_item('target_path'), unpack_resolution(state_manager.get_item('output_video_resolution'))))
 	temp_video_fps = restrict_video_fps(state_manager.get_item('target_path'), state_manager.get_item('output_video_fps'))
-	logger.info(wording.get('extracting_frames').format(resolution = temp_video_resolution, fps = temp_video_fps), __name__)
-	if extract_frames(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end):
-		logger.debug(wording.get('extracting_frames_succeed'), __name__)
-	else:
-		if is_process_stopping():
-			process_manager.end()
-			return 4
-		logger.error(wording.get('extracting_frames_failed'), __name__)
-		process_manager.end()
-		return 1
-	# process frames
-	temp_frame_paths = get_temp_frame_paths(state_manager.get_item('target_path'))
-	if temp_frame_paths:
-		for processor_module in get_processors_modules(state_manager.get_item('processors')):
-			logger.info(wording.get('processing'), processor_module.__name__)
-			processor_module.process_video(state_manager.get_item('source_paths'), temp_frame_paths)
-			processor_module.post_process()
-		if is_process_stopping():
-			return 4
-	else:
-		logger.error(wording.get('temp_frames_not_found'), __name__)
-		process_manager.end()
-		return 1
-	# merge video
-	logger.info(wording.get('merging_video').format(resolution = state_manager.get_item('output_video_resolution'), fps = state_manager.get_item('output_video_fps')), __name__)
-	if merge_video(state_manager.get_item('target_path'), state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps')):
-		logger.debug(wording.get('merging_video_succeed'), __name__)
+	if state_manager.get_item('frame_pipeline') == 'stream':
+		error_code = process_video_stream(temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end)
 	else:
-		if is_process_stopping():
-			process_manager.end()
-			return 4
-		logger.error(wording.get('merging_video_failed'), __name__)
-		process_manager.end()
-		return 1
+		error_code = process_video_frames(temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end)
+	if error_code:
+		return error_code
 	# handle audio
 	if state_manager.get_item('skip_audio'):
 		logger.info(wording.get('skipping_audio'), __name__)
@@ -486,6 +514,110 @@ def process_video(start_time : float) -> ErrorCode:
 	return 0
 
 
+def process_video_frames(temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> ErrorCode:
+	if get_temp_frame_format() != state_manager.get_item('temp_frame_format'):
+		logger.warn(wording.get('temp_frame_format_fallback').format(temp_frame_format = get_temp_frame_format()), __name__)
+	# extract frames
+	logger.info(wording.get('extracting_frames').format(resolution = temp_video_resolution, fps = temp_video_fps), __name__)
+	if extract_frames(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end):
+		logger.debug(wording.get('extracting_frames_succeed'), __name__)
+	else:
+		if is_process_stopping():
+			process_manager.end()
+			return 4
+		logger.error(wording.get('extracting_frames_failed'), __name__)
+		process_manager.end()
+		return 1
+	# process frames
+	temp_frame_paths = get_temp_frame_paths(state_manager.get_item('target_path'))
+	if temp_frame_paths:
+		if state_manager.get_item('frame_pipeline') == 'fused':
+			logger.info(wording.get('processing'), __name__)
+			multi_process_chain_frames(state_manager.get_item('source_paths'), temp_frame_paths)
+			for processor_module in get_processors_modules(state_manager.get_item('processors')):
+				processor_module.post_process()
+		else:
+			for processor_module in get_processors_modules(state_manager.get_item('processors')):
+				logger.info(wording.get('processing'), processor_module.__name__)
+				processor_module.process_video(state_manager.get_item('source_paths'), temp_frame_paths)
+				processor_module.post_process()
+		if is_process_stopping():
+			return 4
+	else:
+		logger.error(wording.get('temp_frames_not_found'), __name__)
+		process_manager.end()
+		return 1
+	# merge video
+	logger.info(wording.get('merging_video').format(resolution = state_manager.get_item('output_video_resolution'), fps = state_manager.get_item('output_video_fps')), __name__)
+	if merge_video(state_manager.get_item('target_path'), state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps')):
+		logger.debug(wording.get('merging_video_succeed'), __name__)
+	else:
+		if is_process_stopping():
+			process_manager.end()
+			return 4
+		logger.error(wording.get('merging_video_failed'), __name__)
+		process_manager.end()
+		return 1
+	return 0
+
+
+def process_video_stream(temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> ErrorCode:
+	video_segments = [ (trim_frame_start, trim_frame_end) ]
+	if state_manager.get_item('video_segment_count') > 1:
+		video_segments = calc_video_segments(detect_video_keyframes(state_manager.get_item('target_path')), trim_frame_start, trim_frame_end, state_manager.get_item('video_segment_count'))
+	# stream video
+	with tqdm(total = trim_frame_end - trim_frame_start, desc = wording.get('processing'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
+		progress.set_postfix(execution_providers = state_manager.get_item('execution_providers'))
+		if len(video_segments) > 1:
+			logger.info(wording.get('streaming_video_segments').format(segment_total = len(video_segments), resolution = temp_video_resolution, fps = temp_video_fps), __name__)
+			is_stream_video = stream_video_segments(video_segments, temp_video_resolution, temp_video_fps, trim_frame_start, progress.update)
+		else:
+			logger.info(wording.get('streaming_video').format(resolution = temp_video_resolution, fps = temp_video_fps), __name__)
+			is_stream_video = stream_video(state_manager.get_item('target_path'), state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'), temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end, partial(process_stream_frames, stream_frame_start = 0, temp_video_fps = temp_video_fps, thread_count = state_manager.get_item('execution_thread_count'), update_progress = progress.update))
+	if is_stream_video:
+		logger.debug(wording.get('streaming_video_succeed'), __name__)
+	else:
+		if is_process_stopping():
+			process_manager.end()
+			return 4
+		logger.error(wording.get('streaming_video_failed'), __name__)
+		process_manager.end()
+		return 1
+	for processor_module in get_processors_modules(state_manager.get_item('processors')):
+		processor_module.post_process()
+	if is_process_stopping():
+		return 4
+	return 0
+
+
+def stream_video_segments(video_segments : List[VideoSegment], temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, update_progress : UpdateProgress) -> bool:
+	video_fps = detect_video_fps(state_manager.get_item('target_path'))
+	temp_segment_paths = [ get_temp_segment_path(state_manager.get_item('target_path'), segment_index) for segment_index, _ in enumerate(video_segments) ]
+	thread_counts = split_thread_count(state_manager.get_item('execution_thread_count'), len(video_segments))
+
+	with ThreadPoolExecutor(max_workers = len(video_segments)) as executor:
+		futures = []
+
+		for temp_segment_path, video_segment, thread_count in zip(temp_segment_paths, video_segments, thread_counts):
+			segment_frame_start, _ = video_segment
+			stream_frame_start = round((segment_frame_start - trim_frame_start) * temp_video_fps / video_fps)
+			future = executor.submit(stream_video_segment, state_manager.get_item('target_path'), temp_segment_path, state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'), temp_video_resolution, temp_video_fps, video_segment, partial(process_stream_frames, stream_frame_start = stream_frame_start, temp_video_fps = temp_video_fps, thread_count = thread_count, update_progress = update_progress))
+			futures.append(future)
+
+		if not all(future.result() for future in futures):
+			return False
+
+	if concat_video(get_temp_file_path(state_manager.get_item('target_path')), temp_segment_paths):
+		logger.debug(wording.get('concatenating_video_succeed'), __name__)
+		return True
+	logger.error(wording.get('concatenating_video_failed'), __name__)
+	return False
+
+
+def process_stream_frames(target_vision_frames : Iterator[VisionFrame], stream_frame_start : int, temp_video_fps : Fps, thread_count : int, update_progress : UpdateProgress) -> Iterator[VisionFrame]:
+	return multi_process_stream(state_manager.get_item('source_paths'), target_vision_frames, stream_frame_start, temp_video_fps, thread_count, update_progress)
+
+
 def is_process_stopping() -> bool:
 	if process_manager.is_stopping():
 		process_manager.end()
@@ -1,66 +1,109 @@
-from typing import List, Optional
+from typing import Any, List, Optional
 
 import numpy
+from numpy.typing import NDArray
 
 from facefusion import state_manager
 from facefusion.common_helper import get_first
-from facefusion.face_classifier import classify_face
-from facefusion.face_detector import detect_faces, detect_rotated_faces
+from facefusion.face_classifier import classify_face_batch
+from facefusion.face_detector import concat_face_detections, detect_faces_batch, detect_rotated_faces_batch
 from facefusion.face_helper import apply_nms, convert_to_face_landmark_5, estimate_face_angle, get_nms_threshold
-from facefusion.face_landmarker import detect_face_landmarks, estimate_face_landmark_68_5
-from facefusion.face_recognizer import calc_embedding
-from facefusion.face_store import get_static_faces, set_static_faces
-from facefusion.typing import BoundingBox, Face, FaceLandmark5, FaceLandmarkSet, FaceScoreSet, Score, VisionFrame
+from facefusion.face_landmarker import detect_face_landmarks_batch, estimate_face_landmark_68_5_batch
+from facefusion.face_recognizer import calc_embedding_batch
+from facefusion.face_store import get_frame_key, get_static_faces, set_static_faces
+from facefusion.typing import BoundingBoxes, Face, FaceAnalysis, FaceDetection, FaceLandmarkSet, FaceLandmarks5, FaceScoreSet, FaceScores, VisionFrame
 
 
-def create_faces(vision_frame : VisionFrame, bounding_boxes : List[BoundingBox], face_scores : List[Score], face_landmarks_5 : List[FaceLandmark5]) -> List[Face]:
-	faces = []
+def create_faces(vision_frame : VisionFrame, bounding_boxes : BoundingBoxes, face_scores : FaceScores, face_landmarks_5 : FaceLandmarks5, face_analyses : List[FaceAnalysis]) -> List[Face]:
+	faces : List[Face] = []
 	nms_threshold = get_nms_threshold(state_manager.get_item('face_detector_model'), state_manager.get_item('face_detector_angles'))
 	keep_indices = apply_nms(bounding_boxes, face_scores, state_manager.get_item('face_detector_score'), nms_threshold)
+	bounding_boxes, face_scores, face_landmarks_5 = bounding_boxes[keep_indices], face_scores[keep_indices], face_landmarks_5[keep_indices]
 
-	for index in keep_indices:
-		bounding_box = bounding_boxes[index]
-		face_score = face_scores[index]
-		face_landmark_5 = face_landmarks_5[index]
-		face_landmark_5_68 = face_landmark_5
-		face_landmark_68_5 = estimate_face_landmark_68_5(face_landmark_5_68)
-		face_landmark_68 = face_landmark_68_5
-		face_landmark_score_68 = 0.0
-		face_angle = estimate_face_angle(face_landmark_68_5)
-
-		if state_manager.get_item('face_landmarker_score') > 0:
-			face_landmark_68, face_landmark_score_68 = detect_face_landmarks(vision_frame, bounding_box, face_angle)
-		if face_landmark_score_68 > state_manager.get_item('face_landmarker_score'):
-			face_landmark_5_68 = convert_to_face_landmark_5(face_landmark_68)
+	if not len(keep_indices):
+		return faces
 
+	face_landmarks_68_5 = estimate_face_landmark_68_5_batch(list(face_landmarks_5))
+	face_angles = [ estimate_face_angle(face_landmark_68_5) for face_landmark_68_5 in face_landmarks_68_5 ]
+	face_landmarks_68 = face_landmarks_68_5
+	face_landmark_scores_68 = [ 0.0 ] * len(keep_indices)
+
+	if state_manager.get_item('face_landmarker_score') > 0:
+		face_landmarks_68, face_landmark_scores_68 = detect_face_landmarks_batch(vision_frame, list(bounding_boxes), face_angles)
+
+	face_landmarks_5_68 = [ convert_to_face_landmark_5(face_landmark_68) if face_landmark_score_68 > state_manager.get_item('face_landmarker_score') else face_landmark_5 for face_landmark_5, face_landmark_68, face_landmark_score_68 in zip(face_landmarks_5, face_landmarks_68, face_landmark_scores_68) ]
+
+	for index, bounding_box in enumerate(bounding_boxes):
 		face_landmark_set : FaceLandmarkSet =\
 		{
-			'5': face_landmark_5,
-			'5/68': face_landmark_5_68,
-			'68': face_landmark_68,
-			'68/5': face_landmark_68_5
+			'5': face_landmarks_5[index],
+			'5/68': face_landmarks_5_68[index],
+			'68': face_landmarks_68[index],
+			'68/5': face_landmarks_68_5[index]
 		}
 		face_score_set : FaceScoreSet =\
 		{
-			'detector': face_score,
-			'landmarker': face_landmark_score_68
+			'detector': face_scores[index],
+			'landmarker': face_landmark_scores_68[index]
 		}
-		embedding, normed_embedding = calc_embedding(vision_frame, face_landmark_set.get('5/68'))
-		gender, age, race = classify_face(vision_frame, face_landmark_set.get('5/68'))
 		faces.append(Face(
 			bounding_box = bounding_box,
 			score_set = face_score_set,
 			landmark_set = face_landmark_set,
-			angle = face_angle,
-			embedding = embedding,
-			normed_embedding = normed_embedding,
-			gender = gender,
-			age = age,
-			race = race
+			angle = face_angles[index],
+			embedding = None,
+			normed_embedding = None,
+			gender = None,
+			age = None,
+			race = None
 		))
+	return analyse_faces(vision_frame, faces, face_analyses)
+
+
+def analyse_faces(vision_frame : VisionFrame, faces : List[Face], face_analyses : List[FaceAnalysis]) -> List[Face]:
+	face_landmarks_5_68 = [ face.landmark_set.get('5/68') for face in faces ]
+
+	if faces and 'recognizer' in face_analyses:
+		embeddings, normed_embeddings = calc_embedding_batch(vision_frame, face_landmarks_5_68)
+		faces = [ face._replace(embedding = embedding, normed_embedding = normed_embedding) for face, embedding, normed_embedding in zip(faces, embeddings, normed_embeddings) ]
+	if faces and 'classifier' in face_analyses:
+		genders, ages, races = classify_face_batch(vision_frame, face_landmarks_5_68)
+		faces = [ face._replace(gender = gender, age = age, race = race) for face, gender, age, race in zip(faces, genders, ages, races) ]
 	return faces
 
 
+def get_face_analyses() -> List[FaceAnalysis]:
+	face_analyses : List[FaceAnalysis] = []
+	processors = state_manager.get_item('processors') or []
+	face_debugger_items = state_manager.get_item('face_debugger_items') or []
+
+	if state_manager.get_item('face_selector_mode') == 'reference':
+		face_analyses.append('recognizer')
+	if state_manager.get_item('face_selector_gender') or state_manager.get_item('face_selector_race') or state_manager.get_item('face_selector_age_start') or state_manager.get_item('face_selector_age_end'):
+		face_analyses.append('classifier')
+	elif 'face_debugger' in processors and set(face_debugger_items) & { 'age', 'gender', 'race' }:
+		face_analyses.append('classifier')
+	return face_analyses
+
+
+def get_source_face_analyses() -> List[FaceAnalysis]:
+	source_face_analyses : List[FaceAnalysis] = [ 'recognizer' ]
+
+	for face_analysis in get_face_analyses():
+		if face_analysis not in source_face_analyses:
+			source_face_analyses.append(face_analysis)
+	return source_face_analyses
+
+
+def has_face_analyses(faces : List[Face], face_analyses : List[FaceAnalysis]) -> bool:
+	for face in faces:
+		if 'recognizer' in face_analyses and face.embedding is None:
+			return False
+		if 'classifier' in face_analyses and face.gender is None:
+			return False
+	return True
+
+
 def get_one_face(faces : List[Face], position : int = 0) -> Optional[Face]:
 	if faces:
 		position = min(position, len(faces) - 1)
@@ -76,16 +119,17 @@ def get_average_face(faces : List[Face]) -> Optional[Face]:
 		first_face = get_first(faces)
 
 		for face in faces:
-			embeddings.append(face.embedding)
-			normed_embeddings.append(face.normed_embedding)
+			if face.embedding is not None:
+				embeddings.append(face.embedding)
+				normed_embeddings.append(face.normed_embedding)
 
 		return Face(
 			bounding_box = first_face.bounding_box,
 			score_set = first_face.score_set,
 			landmark_set = first_face.landmark_set,
 			angle = first_face.angle,
-			embedding = numpy.mean(embeddings, axis = 0),
-			normed_embedding = numpy.mean(normed_embeddings, axis = 0),
+			embedding = numpy.mean(embeddings, axis = 0) if embeddings else None,
+			normed_embedding = numpy.mean(normed_embeddings, axis = 0) if normed_embeddings else None,
 			gender = first_face.gender,
 			age = first_face.age,
 			race = first_face.race
@@ -93,32 +137,78 @@ def get_average_face(faces : List[Face]) -> Optional[Face]:
 	return None
 
 
-def get_many_faces(vision_frames : List[VisionFrame]) -> List[Face]:
+def scale_face(face : Face, frame_scale : NDArray[Any]) -> Face:
+	bounding_box = face.bounding_box * numpy.tile(frame_scale, 2)
+	landmark_set : FaceLandmarkSet =\
+	{
+		'5': face.landmark_set.get('5') * frame_scale,
+		'5/68': face.landmark_set.get('5/68') * frame_scale,
+		'68': face.landmark_set.get('68') * frame_scale,
+		'68/5': face.landmark_set.get('68/5') * frame_scale
+	}
+	return Face(
+		bounding_box = bounding_box,
+		score_set = face.score_set,
+		landmark_set = landmark_set,
+		angle = face.angle,
+		embedding = face.embedding,
+		normed_embedding = face.normed_embedding,
+		gender = face.gender,
+		age = face.age,
+		race = face.race
+	)
+
+
+def carry_static_faces(source_vision_frame : VisionFrame, target_vision_frame : VisionFrame) -> None:
+	static_faces = get_static_faces(source_vision_frame)
+
+	if static_faces and target_vision_frame is not source_vision_frame:
+		source_frame_height, source_frame_width = source_vision_frame.shape[:2]
+		target_frame_height, target_frame_width = target_vision_frame.shape[:2]
+		frame_scale = numpy.array([ target_frame_width / source_frame_width, target_frame_height / source_frame_height ])
+		set_static_faces(target_vision_frame, [ scale_face(static_face, frame_scale) for static_face in static_faces ])
+
+
+def get_many_faces(vision_frames : List[VisionFrame], face_analyses : Optional[List[FaceAnalysis]] = None) -> List[Face]:
 	many_faces : List[Face] = []
 
-	for vision_frame in vision_frames:
-		if numpy.any(vision_frame):
+	for faces in detect_many_faces(vision_frames, face_analyses):
+		many_faces.extend(faces)
+	return many_faces
+
+
+def detect_many_faces(vision_frames : List[VisionFrame], face_analyses : Optional[List[FaceAnalysis]] = None) -> List[List[Face]]:
+	many_faces : List[List[Face]] = [ [] for _ in vision_frames ]
+	detect_indices = []
+	detect_batch_size = max(state_manager.get_item('execution_batch_size') or 1, 1)
+	face_analyses = get_face_analyses() if face_analyses is None else face_analyses
+
+	for index, vision_frame in enumerate(vision_frames):
+		if get_frame_key(vision_frame):
 			static_faces = get_static_faces(vision_frame)
-			if static_faces:
-				many_faces.extend(static_faces)
+			if static_faces is not None and has_face_analyses(static_faces, face_analyses):
+				many_faces[index] = static_faces
 			else:
-				all_bounding_boxes = []
-				all_face_scores = []
-				all_face_landmarks_5 = []
-
-				for face_detector_angle in state_manager.get_item('face_detector_angles'):
-					if face_detector_angle == 0:
-						bounding_boxes, face_scores, face_landmarks_5 = detect_faces(vision_frame)
-					else:
-						bounding_boxes, face_scores, face_landmarks_5 = detect_rotated_faces(vision_frame, face_detector_angle)
-					all_bounding_boxes.extend(bounding_boxes)
-					all_face_scores.extend(face_scores)
-					all_face_landmarks_5.extend(face_landmarks_5)
-
-				if all_bounding_boxes and all_face_scores and all_face_landmarks_5 and state_manager.get_item('face_detector_score') > 0:
-					faces = create_faces(vision_frame, all_bounding_boxes, all_face_scores, all_face_landmarks_5)
-
-					if faces:
-						many_faces.extend(faces)
-						set_static_faces(vision_frame, faces)
+				detect_indices.append(index)
+
+	for batch_start in range(0, len(detect_indices), detect_batch_size):
+		batch_indices = detect_indices[batch_start:batch_start + detect_batch_size]
+		batch_vision_frames = [ vision_frames[index] for index in batch_indices ]
+
+		for index, vision_frame, (all_bounding_boxes, all_face_scores, all_face_landmarks_5) in zip(batch_indices, batch_vision_frames, detect_faces_by_angles(batch_vision_frames)):
+			if numpy.any(all_face_scores) and state_manager.get_item('face_detector_score') > 0:
+				many_faces[index] = create_faces(vision_frame, all_bounding_boxes, all_face_scores, all_face_landmarks_5, face_analyses)
+			set_static_faces(vision_frame, many_faces[index])
 	return many_faces
+
+
+def detect_faces_by_angles(vision_frames : List[VisionFrame]) -> List[FaceDetection]:
+	angle_face_detections = []
+
+	for face_detector_angle in state_manager.get_item('face_detector_angles'):
+		if face_detector_angle == 0:
+			angle_face_detections.append(detect_faces_batch(vision_frames))
+		else:
+			angle_face_detections.append(detect_rotated_faces_batch(vision_frames, face_detector_angle))
+
+	return [ concat_face_detections(frame_face_detections) for frame_face_detections in zip(*angle_face_detections) ]
@@ -1,15 +1,17 @@
-from typing import List, Tuple
+from functools import lru_cache
+from typing import List, Sequence, Tuple
 
 import cv2
 import numpy
-from charset_normalizer.md import lru_cache
+from onnxruntime import InferenceSession
 
 from facefusion import inference_manager, state_manager
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
-from facefusion.face_helper import create_rotated_matrix_and_size, create_static_anchors, distance_to_bounding_box, distance_to_face_landmark_5, normalize_bounding_box, transform_bounding_box, transform_points
+from facefusion.face_helper import create_rotated_matrix_and_size, create_static_anchors, distance_to_bounding_box, distance_to_face_landmark_5, normalize_bounding_boxes, transform_bounding_boxes, transform_points
 from facefusion.filesystem import resolve_relative_path
-from facefusion.thread_helper import thread_semaphore
-from facefusion.typing import Angle, BoundingBox, Detection, DownloadScope, DownloadSet, FaceLandmark5, InferencePool, ModelSet, Score, VisionFrame
+from facefusion.inference_batcher import has_dynamic_batch
+from facefusion.thread_helper import inference_semaphore
+from facefusion.typing import Angle, Detection, DownloadScope, DownloadSet, FaceDetection, InferencePool, ModelSet, VisionFrame
 from facefusion.vision import resize_frame_resolution, unpack_resolution
 
 
@@ -110,203 +112,182 @@ def pre_check() -> bool:
 	return True
 
 
-def detect_faces(vision_frame : VisionFrame) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	all_bounding_boxes : List[BoundingBox] = []
-	all_face_scores : List[Score] = []
-	all_face_landmarks_5 : List[FaceLandmark5] = []
+def detect_faces(vision_frame : VisionFrame) -> FaceDetection:
+	return detect_faces_batch([ vision_frame ])[0]
+
+
+def detect_faces_batch(vision_frames : List[VisionFrame]) -> List[FaceDetection]:
+	model_face_detections = []
+	face_detections = []
 
 	if state_manager.get_item('face_detector_model') in [ 'many', 'retinaface' ]:
-		bounding_boxes, face_scores, face_landmarks_5 = detect_with_retinaface(vision_frame, state_manager.get_item('face_detector_size'))
-		all_bounding_boxes.extend(bounding_boxes)
-		all_face_scores.extend(face_scores)
-		all_face_landmarks_5.extend(face_landmarks_5)
+		model_face_detections.append(detect_with_retinaface(vision_frames, state_manager.get_item('face_detector_size')))
 
 	if state_manager.get_item('face_detector_model') in [ 'many', 'scrfd' ]:
-		bounding_boxes, face_scores, face_landmarks_5 = detect_with_scrfd(vision_frame, state_manager.get_item('face_detector_size'))
-		all_bounding_boxes.extend(bounding_boxes)
-		all_face_scores.extend(face_scores)
-		all_face_landmarks_5.extend(face_landmarks_5)
+		model_face_detections.append(detect_with_scrfd(vision_frames, state_manager.get_item('face_detector_size')))
 
 	if state_manager.get_item('face_detector_model') in [ 'many', 'yoloface' ]:
-		bounding_boxes, face_scores, face_landmarks_5 = detect_with_yoloface(vision_frame, state_manager.get_item('face_detector_size'))
-		all_bounding_boxes.extend(bounding_boxes)
-		all_face_scores.extend(face_scores)
-		all_face_landmarks_5.extend(face_landmarks_5)
-
-	all_bounding_boxes = [ normalize_bounding_box(all_bounding_box) for all_bounding_box in all_bounding_boxes ]
-	return all_bounding_boxes, all_face_scores, all_face_landmarks_5
-
-
-def detect_rotated_faces(vision_frame : VisionFrame, angle : Angle) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	rotated_matrix, rotated_size = create_rotated_matrix_and_size(angle, vision_frame.shape[:2][::-1])
-	rotated_vision_frame = cv2.warpAffine(vision_frame, rotated_matrix, rotated_size)
-	rotated_inverse_matrix = cv2.invertAffineTransform(rotated_matrix)
-	bounding_boxes, face_scores, face_landmarks_5 = detect_faces(rotated_vision_frame)
-	bounding_boxes = [ transform_bounding_box(bounding_box, rotated_inverse_matrix) for bounding_box in bounding_boxes ]
-	face_landmarks_5 = [ transform_points(face_landmark_5, rotated_inverse_matrix) for face_landmark_5 in face_landmarks_5 ]
-	return bounding_boxes, face_scores, face_landmarks_5
+		model_face_detections.append(detect_with_yoloface(vision_frames, state_manager.get_item('face_detector_size')))
 
+	for frame_face_detections in zip(*model_face_detections):
+		bounding_boxes, face_scores, face_landmarks_5 = concat_face_detections(frame_face_detections)
+		face_detections.append((normalize_bounding_boxes(bounding_boxes), face_scores, face_landmarks_5))
+	return face_detections
 
-def detect_with_retinaface(vision_frame : VisionFrame, face_detector_size : str) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	bounding_boxes = []
-	face_scores = []
-	face_landmarks_5 = []
-	feature_strides = [ 8, 16, 32 ]
-	feature_map_channel = 3
-	anchor_total = 2
-	face_detector_width, face_detector_height = unpack_resolution(face_detector_size)
-	temp_vision_frame = resize_frame_resolution(vision_frame, (face_detector_width, face_detector_height))
-	ratio_height = vision_frame.shape[0] / temp_vision_frame.shape[0]
-	ratio_width = vision_frame.shape[1] / temp_vision_frame.shape[1]
-	detect_vision_frame = prepare_detect_frame(temp_vision_frame, face_detector_size)
-	detection = forward_with_retinaface(detect_vision_frame)
 
-	for index, feature_stride in enumerate(feature_strides):
-		keep_indices = numpy.where(detection[index] >= state_manager.get_item('face_detector_score'))[0]
+def detect_rotated_faces(vision_frame : VisionFrame, angle : Angle) -> FaceDetection:
+	return detect_rotated_faces_batch([ vision_frame ], angle)[0]
 
-		if numpy.any(keep_indices):
-			stride_height = face_detector_height // feature_stride
-			stride_width = face_detector_width // feature_stride
-			anchors = create_static_anchors(feature_stride, anchor_total, stride_height, stride_width)
-			bounding_box_raw = detection[index + feature_map_channel] * feature_stride
-			face_landmark_5_raw = detection[index + feature_map_channel * 2] * feature_stride
 
-			for bounding_box in distance_to_bounding_box(anchors, bounding_box_raw)[keep_indices]:
-				bounding_boxes.append(numpy.array(
-				[
-					bounding_box[0] * ratio_width,
-					bounding_box[1] * ratio_height,
-					bounding_box[2] * ratio_width,
-					bounding_box[3] * ratio_height,
-				]))
+def detect_rotated_faces_batch(vision_frames : List[VisionFrame], angle : Angle) -> List[FaceDetection]:
+	rotated_vision_frames = []
+	rotated_inverse_matrices = []
+	face_detections = []
 
-			for score in detection[index][keep_indices]:
-				face_scores.append(score[0])
+	for vision_frame in vision_frames:
+		rotated_matrix, rotated_size = create_rotated_matrix_and_size(angle, vision_frame.shape[:2][::-1])
+		rotated_vision_frames.append(cv2.warpAffine(vision_frame, rotated_matrix, rotated_size))
+		rotated_inverse_matrices.append(cv2.invertAffineTransform(rotated_matrix))
 
-			for face_landmark_5 in distance_to_face_landmark_5(anchors, face_landmark_5_raw)[keep_indices]:
-				face_landmarks_5.append(face_landmark_5 * [ ratio_width, ratio_height ])
+	for rotated_inverse_matrix, (bounding_boxes, face_scores, face_landmarks_5) in zip(rotated_inverse_matrices, detect_faces_batch(rotated_vision_frames)):
+		bounding_boxes = transform_bounding_boxes(bounding_boxes, rotated_inverse_matrix)
+		face_landmarks_5 = transform_points(face_landmarks_5, rotated_inverse_matrix).reshape(-1, 5, 2)
+		face_detections.append((bounding_boxes, face_scores, face_landmarks_5))
+	return face_detections
 
+
+def concat_face_detections(face_detections : Sequence[FaceDetection]) -> FaceDetection:
+	bounding_boxes = numpy.concatenate([ numpy.empty((0, 4)) ] + [ face_detection[0] for face_detection in face_detections ])
+	face_scores = numpy.concatenate([ numpy.empty(0) ] + [ face_detection[1] for face_detection in face_detections ])
+	face_landmarks_5 = numpy.concatenate([ numpy.empty((0, 5, 2)) ] + [ face_detection[2] for face_detection in face_detections ])
 	return bounding_boxes, face_scores, face_landmarks_5
 
 
-def detect_with_scrfd(vision_frame : VisionFrame, face_detector_size : str) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	bounding_boxes = []
-	face_scores = []
-	face_landmarks_5 = []
+def detect_with_retinaface(vision_frames : List[VisionFrame], face_detector_size : str) -> List[FaceDetection]:
+	detect_vision_frames, detect_ratios = prepare_detect_frames(vision_frames, face_detector_size)
+	detections = forward_with_retinaface(detect_vision_frames)
+	return [ decode_with_retinaface(detection, detect_ratio, face_detector_size) for detection, detect_ratio in zip(detections, detect_ratios) ]
+
+
+def decode_with_retinaface(detection : List[Detection], detect_ratio : Tuple[float, float], face_detector_size : str) -> FaceDetection:
+	face_detections = []
 	feature_strides = [ 8, 16, 32 ]
 	feature_map_channel = 3
 	anchor_total = 2
 	face_detector_width, face_detector_height = unpack_resolution(face_detector_size)
-	temp_vision_frame = resize_frame_resolution(vision_frame, (face_detector_width, face_detector_height))
-	ratio_height = vision_frame.shape[0] / temp_vision_frame.shape[0]
-	ratio_width = vision_frame.shape[1] / temp_vision_frame.shape[1]
-	detect_vision_frame = prepare_detect_frame(temp_vision_frame, face_detector_size)
-	detection = forward_with_scrfd(detect_vision_frame)
+	ratio_height, ratio_width = detect_ratio
 
 	for index, feature_stride in enumerate(feature_strides):
 		keep_indices = numpy.where(detection[index] >= state_manager.get_item('face_detector_score'))[0]
+		stride_height = face_detector_height // feature_stride
+		stride_width = face_detector_width // feature_stride
+		anchors = create_static_anchors(feature_stride, anchor_total, stride_height, stride_width)[keep_indices]
+		bounding_box_raw = detection[index + feature_map_channel][keep_indices] * feature_stride
+		face_landmark_5_raw = detection[index + feature_map_channel * 2][keep_indices] * feature_stride
+		bounding_boxes = distance_to_bounding_box(anchors, bounding_box_raw) * [ ratio_width, ratio_height, ratio_width, ratio_height ]
+		face_scores = detection[index][keep_indices].ravel()
+		face_landmarks_5 = distance_to_face_landmark_5(anchors, face_landmark_5_raw) * [ ratio_width, ratio_height ]
+		face_detections.append((bounding_boxes, face_scores, face_landmarks_5))
 
-		if numpy.any(keep_indices):
-			stride_height = face_detector_height // feature_stride
-			stride_width = face_detector_width // feature_stride
-			anchors = create_static_anchors(feature_stride, anchor_total, stride_height, stride_width)
-			bounding_box_raw = detection[index + feature_map_channel] * feature_stride
-			face_landmark_5_raw = detection[index + feature_map_channel * 2] * feature_stride
+	return concat_face_detections(face_detections)
 
-			for bounding_box in distance_to_bounding_box(anchors, bounding_box_raw)[keep_indices]:
-				bounding_boxes.append(numpy.array(
-				[
-					bounding_box[0] * ratio_width,
-					bounding_box[1] * ratio_height,
-					bounding_box[2] * ratio_width,
-					bounding_box[3] * ratio_height,
-				]))
 
-			for score in detection[index][keep_indices]:
-				face_scores.append(score[0])
+def detect_with_scrfd(vision_frames : List[VisionFrame], face_detector_size : str) -> List[FaceDetection]:
+	detect_vision_frames, detect_ratios = prepare_detect_frames(vision_frames, face_detector_size)
+	detections = forward_with_scrfd(detect_vision_frames)
+	return [ decode_with_scrfd(detection, detect_ratio, face_detector_size) for detection, detect_ratio in zip(detections, detect_ratios) ]
 
-			for face_landmark_5 in distance_to_face_landmark_5(anchors, face_landmark_5_raw)[keep_indices]:
-				face_landmarks_5.append(face_landmark_5 * [ ratio_width, ratio_height ])
-
-	return bounding_boxes, face_scores, face_landmarks_5
 
-
-def detect_with_yoloface(vision_frame : VisionFrame, face_detector_size : str) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	bounding_boxes = []
-	face_scores = []
-	face_landmarks_5 = []
+def decode_with_scrfd(detection : List[Detection], detect_ratio : Tuple[float, float], face_detector_size : str) -> FaceDetection:
+	face_detections = []
+	feature_strides = [ 8, 16, 32 ]
+	feature_map_channel = 3
+	anchor_total = 2
 	face_detector_width, face_detector_height = unpack_resolution(face_detector_size)
-	temp_vision_frame = resize_frame_resolution(vision_frame, (face_detector_width, face_detector_height))
-	ratio_height = vision_frame.shape[0] / temp_vision_frame.shape[0]
-	ratio_width = vision_frame.shape[1] / temp_vision_frame.shape[1]
-	detect_vision_frame = prepare_detect_frame(temp_vision_frame, face_detector_size)
-	detection = forward_with_yoloface(detect_vision_frame)
-	detection = numpy.squeeze(detection).T
-	bounding_box_raw, score_raw, face_landmark_5_raw = numpy.split(detection, [ 4, 5 ], axis = 1)
-	keep_indices = numpy.where(score_raw > state_manager.get_item('face_detector_score'))[0]
+	ratio_height, ratio_width = detect_ratio
 
-	if numpy.any(keep_indices):
-		bounding_box_raw, face_landmark_5_raw, score_raw = bounding_box_raw[keep_indices], face_landmark_5_raw[keep_indices], score_raw[keep_indices]
+	for index, feature_stride in enumerate(feature_strides):
+		keep_indices = numpy.where(detection[index] >= state_manager.get_item('face_detector_score'))[0]
+		stride_height = face_detector_height // feature_stride
+		stride_width = face_detector_width // feature_stride
+		anchors = create_static_anchors(feature_stride, anchor_total, stride_height, stride_width)[keep_indices]
+		bounding_box_raw = detection[index + feature_map_channel][keep_indices] * feature_stride
+		face_landmark_5_raw = detection[index + feature_map_channel * 2][keep_indices] * feature_stride
+		bounding_boxes = distance_to_bounding_box(anchors, bounding_box_raw) * [ ratio_width, ratio_height, ratio_width, ratio_height ]
+		face_scores = detection[index][keep_indices].ravel()
+		face_landmarks_5 = distance_to_face_landmark_5(anchors, face_landmark_5_raw) * [ ratio_width, ratio_height ]
+		face_detections.append((bounding_boxes, face_scores, face_landmarks_5))
 
-		for bounding_box in bounding_box_raw:
-			bounding_boxes.append(numpy.array(
-			[
-				(bounding_box[0] - bounding_box[2] / 2) * ratio_width,
-				(bounding_box[1] - bounding_box[3] / 2) * ratio_height,
-				(bounding_box[0] + bounding_box[2] / 2) * ratio_width,
-				(bounding_box[1] + bounding_box[3] / 2) * ratio_height,
-			]))
+	return concat_face_detections(face_detections)
 
-		face_scores = score_raw.ravel().tolist()
-		face_landmark_5_raw[:, 0::3] = (face_landmark_5_raw[:, 0::3]) * ratio_width
-		face_landmark_5_raw[:, 1::3] = (face_landmark_5_raw[:, 1::3]) * ratio_height
 
-		for face_landmark_5 in face_landmark_5_raw:
-			face_landmarks_5.append(numpy.array(face_landmark_5.reshape(-1, 3)[:, :2]))
+def detect_with_yoloface(vision_frames : List[VisionFrame], face_detector_size : str) -> List[FaceDetection]:
+	detect_vision_frames, detect_ratios = prepare_detect_frames(vision_frames, face_detector_size)
+	detections = forward_with_yoloface(detect_vision_frames)
+	return [ decode_with_yoloface(detection, detect_ratio) for detection, detect_ratio in zip(detections, detect_ratios) ]
 
+
+def decode_with_yoloface(detection : List[Detection], detect_ratio : Tuple[float, float]) -> FaceDetection:
+	ratio_height, ratio_width = detect_ratio
+	yoloface_detection = numpy.squeeze(detection).T
+	bounding_box_raw, score_raw, face_landmark_5_raw = numpy.split(yoloface_detection, [ 4, 5 ], axis = 1)
+	keep_indices = numpy.where(score_raw > state_manager.get_item('face_detector_score'))[0]
+	bounding_box_raw, score_raw, face_landmark_5_raw = bounding_box_raw[keep_indices], score_raw[keep_indices], face_landmark_5_raw[keep_indices]
+	bounding_boxes = numpy.concatenate([ bounding_box_raw[:, :2] - bounding_box_raw[:, 2:] / 2, bounding_box_raw[:, :2] + bounding_box_raw[:, 2:] / 2 ], axis = 1) * [ ratio_width, ratio_height, ratio_width, ratio_height ]
+	face_scores = score_raw.ravel()
+	face_landmarks_5 = face_landmark_5_raw.reshape(-1, 5, 3)[:, :, :2] * [ ratio_width, ratio_height ]
 	return bounding_boxes, face_scores, face_landmarks_5
 
 
-def forward_with_retinaface(detect_vision_frame : VisionFrame) -> Detection:
+def forward_with_retinaface(detect_vision_frames : VisionFrame) -> List[List[Detection]]:
 	face_detector = get_inference_pool().get('retinaface')
+	return forward_detect_frames(face_detector, detect_vision_frames)
 
-	with thread_semaphore():
-		detection = face_detector.run(None,
-		{
-			'input': detect_vision_frame
-		})
-
-	return detection
 
-
-def forward_with_scrfd(detect_vision_frame : VisionFrame) -> Detection:
+def forward_with_scrfd(detect_vision_frames : VisionFrame) -> List[List[Detection]]:
 	face_detector = get_inference_pool().get('scrfd')
+	return forward_detect_frames(face_detector, detect_vision_frames)
 
-	with thread_semaphore():
-		detection = face_detector.run(None,
-		{
-			'input': detect_vision_frame
-		})
 
-	return detection
+def forward_with_yoloface(detect_vision_frames : VisionFrame) -> List[List[Detection]]:
+	face_detector = get_inference_pool().get('yoloface')
+	return forward_detect_frames(face_detector, detect_vision_frames)
 
 
-def forward_with_yoloface(detect_vision_frame : VisionFrame) -> Detection:
-	face_detector = get_inference_pool().get('yoloface')
+def forward_detect_frames(face_detector : InferenceSession, detect_vision_frames : VisionFrame) -> List[List[Detection]]:
+	detections : List[List[Detection]] = []
 
-	with thread_semaphore():
-		detection = face_detector.run(None,
-		{
-			'input': detect_vision_frame
-		})
+	if has_dynamic_batch(face_detector):
+		with inference_semaphore(face_detector):
+			detection = face_detector.run(None,
+			{
+				'input': detect_vision_frames
+			})
 
-	return detection
+		for batch_index in range(len(detect_vision_frames)):
+			detections.append([ detection_output[batch_index] for detection_output in detection ])
+		return detections
+
+	for detect_vision_frame in detect_vision_frames:
+		with inference_semaphore(face_detector):
+			detection = face_detector.run(None,
+			{
+				'input': numpy.expand_dims(detect_vision_frame, axis = 0)
+			})
+		detections.append(detection)
+	return detections
 
 
-def prepare_detect_frame(temp_vision_frame : VisionFrame, face_detector_size : str) -> VisionFrame:
+def prepare_detect_frames(vision_frames : List[VisionFrame], face_detector_size : str) -> Tuple[VisionFrame, List[Tuple[float, float]]]:
 	face_detector_width, face_detector_height = unpack_resolution(face_detector_size)
-	detect_vision_frame = numpy.zeros((face_detector_height, face_detector_width, 3))
-	detect_vision_frame[:temp_vision_frame.shape[0], :temp_vision_frame.shape[1], :] = temp_vision_frame
-	detect_vision_frame = (detect_vision_frame - 127.5) / 128.0
-	detect_vision_frame = numpy.expand_dims(detect_vision_frame.transpose(2, 0, 1), axis = 0).astype(numpy.float32)
-	return detect_vision_frame
+	detect_vision_frames = numpy.zeros((len(vision_frames), face_detector_height, face_detector_width, 3), dtype = numpy.float32)
+	detect_ratios = []
+
+	for detect_vision_frame, vision_frame in zip(detect_vision_frames, vision_frames):
+		temp_vision_frame = resize_frame_resolution(vision_frame, (face_detector_width, face_detector_height))
+		detect_vision_frame[:temp_vision_frame.shape[0], :temp_vision_frame.shape[1], :] = temp_vision_frame
+		detect_ratios.append((vision_frame.shape[0] / temp_vision_frame.shape[0], vision_frame.shape[1] / temp_vision_frame.shape[1]))
+
+	detect_vision_frames = (detect_vision_frames - 127.5) / 128.0
+	detect_vision_frames = numpy.ascontiguousarray(detect_vision_frames.transpose(0, 3, 1, 2))
+	return detect_vision_frames, detect_ratios
@@ -1,11 +1,12 @@
 from functools import lru_cache
-from typing import List, Sequence, Tuple
+from typing import Any, List, Tuple
 
 import cv2
 import numpy
 from cv2.typing import Size
+from numpy.typing import NDArray
 
-from facefusion.typing import Anchors, Angle, BoundingBox, Distance, FaceDetectorModel, FaceLandmark5, FaceLandmark68, Mask, Matrix, Points, Scale, Score, Translation, VisionFrame, WarpTemplate, WarpTemplateSet
+from facefusion.typing import Anchors, Angle, BoundingBox, BoundingBoxes, Distance, FaceDetectorModel, FaceLandmark5, FaceLandmark68, FaceScores, Mask, Matrix, Points, Scale, Translation, VisionFrame, WarpTemplate, WarpTemplateSet
 
 WARP_TEMPLATES : WarpTemplateSet =\
 {
@@ -99,15 +100,31 @@ def warp_face_by_translation(temp_vision_frame : VisionFrame, translation : Tran
 
 
 def paste_back(temp_vision_frame : VisionFrame, crop_vision_frame : VisionFrame, crop_mask : Mask, affine_matrix : Matrix) -> VisionFrame:
+	paste_bounding_box, paste_matrix = calc_paste_area(temp_vision_frame, crop_vision_frame, affine_matrix)
+	x1, y1, x2, y2 = paste_bounding_box
+	paste_size = (x2 - x1, y2 - y1)
+
+	if x2 > x1 and y2 > y1:
+		inverse_mask = cv2.warpAffine(crop_mask, paste_matrix, paste_size).clip(0, 1)
+		inverse_mask = numpy.expand_dims(inverse_mask, axis = -1)
+		inverse_vision_frame = cv2.warpAffine(crop_vision_frame, paste_matrix, paste_size, borderMode = cv2.BORDER_REPLICATE)
+		temp_paste_frame = temp_vision_frame[y1:y2, x1:x2].astype(numpy.float32)
+		temp_vision_frame[y1:y2, x1:x2] = inverse_mask * inverse_vision_frame + (1 - inverse_mask) * temp_paste_frame
+	return temp_vision_frame
+
+
+def calc_paste_area(temp_vision_frame : VisionFrame, crop_vision_frame : VisionFrame, affine_matrix : Matrix) -> Tuple[BoundingBox, Matrix]:
+	crop_height, crop_width = crop_vision_frame.shape[:2]
+	temp_height, temp_width = temp_vision_frame.shape[:2]
 	inverse_matrix = cv2.invertAffineTransform(affine_matrix)
-	temp_size = temp_vision_frame.shape[:2][::-1]
-	inverse_mask = cv2.warpAffine(crop_mask, inverse_matrix, temp_size).clip(0, 1)
-	inverse_vision_frame = cv2.warpAffine(crop_vision_frame, inverse_matrix, temp_size, borderMode = cv2.BORDER_REPLICATE)
-	paste_vision_frame = temp_vision_frame.copy()
-	paste_vision_frame[:, :, 0] = inverse_mask * inverse_vision_frame[:, :, 0] + (1 - inverse_mask) * temp_vision_frame[:, :, 0]
-	paste_vision_frame[:, :, 1] = inverse_mask * inverse_vision_frame[:, :, 1] + (1 - inverse_mask) * temp_vision_frame[:, :, 1]
-	paste_vision_frame[:, :, 2] = inverse_mask * inverse_vision_frame[:, :, 2] + (1 - inverse_mask) * temp_vision_frame[:, :, 2]
-	return paste_vision_frame
+	crop_points = numpy.array([ [ -1, -1 ], [ crop_width, -1 ], [ crop_width, crop_height ], [ -1, crop_height ] ]).astype(numpy.float32)
+	paste_points = cv2.transform(crop_points.reshape(1, -1, 2), inverse_matrix).reshape(-1, 2)
+	x1, y1 = numpy.floor(paste_points.min(axis = 0)).astype(int)
+	x2, y2 = numpy.ceil(paste_points.max(axis = 0)).astype(int) + 1
+	paste_bounding_box = numpy.array([ max(x1, 0), max(y1, 0), min(x2, temp_width), min(y2, temp_height) ])
+	paste_matrix = inverse_matrix.copy()
+	paste_matrix[:, 2] -= paste_bounding_box[:2]
+	return paste_bounding_box, paste_matrix
 
 
 @lru_cache(maxsize = None)
@@ -141,7 +158,13 @@ def normalize_bounding_box(bounding_box : BoundingBox) -> BoundingBox:
 	return numpy.array([ x1, y1, x2, y2 ])
 
 
+def normalize_bounding_boxes(bounding_boxes : BoundingBoxes) -> BoundingBoxes:
+	return numpy.concatenate([ numpy.minimum(bounding_boxes[:, :2], bounding_boxes[:, 2:]), numpy.maximum(bounding_boxes[:, :2], bounding_boxes[:, 2:]) ], axis = 1)
+
+
 def transform_points(points : Points, matrix : Matrix) -> Points:
+	if not points.size:
+		return points.reshape(-1, 2)
 	points = points.reshape(-1, 1, 2)
 	points = cv2.transform(points, matrix) #type:ignore[assignment]
 	points = points.reshape(-1, 2)
@@ -162,6 +185,12 @@ def transform_bounding_box(bounding_box : BoundingBox, matrix : Matrix) -> Bound
 	return normalize_bounding_box(numpy.array([ x1, y1, x2, y2 ]))
 
 
+def transform_bounding_boxes(bounding_boxes : BoundingBoxes, matrix : Matrix) -> BoundingBoxes:
+	points = bounding_boxes[:, [ 0, 1, 2, 1, 2, 3, 0, 3 ]].reshape(-1, 4, 2)
+	points = transform_points(points, matrix).reshape(-1, 4, 2)
+	return numpy.concatenate([ numpy.min(points, axis = 1), numpy.max(points, axis = 1) ], axis = 1)
+
+
 def distance_to_bounding_box(points : Points, distance : Distance) -> BoundingBox:
 	x1 = points[:, 0] - distance[:, 0]
 	y1 = points[:, 1] - distance[:, 1]
@@ -208,10 +237,10 @@ def estimate_face_angle(face_landmark_68 : FaceLandmark68) -> Angle:
 	return face_angle
 
 
-def apply_nms(bounding_boxes : List[BoundingBox], face_scores : List[Score], score_threshold : float, nms_threshold : float) -> Sequence[int]:
-	normed_bounding_boxes = [ (x1, y1, x2 - x1, y2 - y1) for (x1, y1, x2, y2) in bounding_boxes ]
-	keep_indices = cv2.dnn.NMSBoxes(normed_bounding_boxes, face_scores, score_threshold = score_threshold, nms_threshold = nms_threshold)
-	return keep_indices
+def apply_nms(bounding_boxes : BoundingBoxes, face_scores : FaceScores, score_threshold : float, nms_threshold : float) -> NDArray[Any]:
+	normed_bounding_boxes = numpy.concatenate([ bounding_boxes[:, :2], bounding_boxes[:, 2:] - bounding_boxes[:, :2] ], axis = 1)
+	keep_indices = cv2.dnn.NMSBoxes(normed_bounding_boxes.tolist(), face_scores.tolist(), score_threshold = score_threshold, nms_threshold = nms_threshold)
+	return numpy.ravel(keep_indices).astype(int)
 
 
 def get_nms_threshold(face_detector_model : FaceDetectorModel, face_detector_angles : List[Angle]) -> float:
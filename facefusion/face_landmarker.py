@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import Tuple
+from typing import List, Optional, Tuple
 
 import cv2
 import numpy
@@ -8,8 +8,8 @@ from facefusion import inference_manager, state_manager
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.face_helper import create_rotated_matrix_and_size, estimate_matrix_by_face_landmark_5, transform_points, warp_face_by_translation
 from facefusion.filesystem import resolve_relative_path
-from facefusion.thread_helper import conditional_thread_semaphore
-from facefusion.typing import Angle, BoundingBox, DownloadScope, DownloadSet, FaceLandmark5, FaceLandmark68, InferencePool, ModelSet, Prediction, Score, VisionFrame
+from facefusion.inference_batcher import run_inference_stack
+from facefusion.typing import Angle, BoundingBox, DownloadScope, DownloadSet, FaceLandmark5, FaceLandmark68, InferencePool, Matrix, ModelSet, Points, Prediction, Score, VisionFrame
 
 
 @lru_cache(maxsize = None)
@@ -114,58 +114,84 @@ def pre_check() -> bool:
 
 
 def detect_face_landmarks(vision_frame : VisionFrame, bounding_box : BoundingBox, face_angle : Angle) -> Tuple[FaceLandmark68, Score]:
-	face_landmark_2dfan4 = None
-	face_landmark_peppa_wutz = None
-	face_landmark_score_2dfan4 = 0.0
-	face_landmark_score_peppa_wutz = 0.0
+	face_landmarks_68, face_landmark_scores_68 = detect_face_landmarks_batch(vision_frame, [ bounding_box ], [ face_angle ])
+	return face_landmarks_68[0], face_landmark_scores_68[0]
+
+
+def detect_face_landmarks_batch(vision_frame : VisionFrame, bounding_boxes : List[BoundingBox], face_angles : List[Angle]) -> Tuple[List[FaceLandmark68], List[Score]]:
+	face_landmarks_2dfan4 : List[Optional[FaceLandmark68]] = [ None ] * len(bounding_boxes)
+	face_landmarks_peppa_wutz : List[Optional[FaceLandmark68]] = [ None ] * len(bounding_boxes)
+	face_landmark_scores_2dfan4 : List[Score] = [ 0.0 ] * len(bounding_boxes)
+	face_landmark_scores_peppa_wutz : List[Score] = [ 0.0 ] * len(bounding_boxes)
+	face_landmarks_68 = []
+	face_landmark_scores_68 = []
+	crop_vision_frames, crop_matrices = prepare_crop_frames(vision_frame, bounding_boxes, face_angles)
 
 	if state_manager.get_item('face_landmarker_model') in [ 'many', '2dfan4' ]:
-		face_landmark_2dfan4, face_landmark_score_2dfan4 = detect_with_2dfan4(vision_frame, bounding_box, face_angle)
+		face_landmarks_2dfan4, face_landmark_scores_2dfan4 = detect_with_2dfan4(crop_vision_frames, crop_matrices)
 
 	if state_manager.get_item('face_landmarker_model') in [ 'many', 'peppa_wutz' ]:
-		face_landmark_peppa_wutz, face_landmark_score_peppa_wutz = detect_with_peppa_wutz(vision_frame, bounding_box, face_angle)
+		face_landmarks_peppa_wutz, face_landmark_scores_peppa_wutz = detect_with_peppa_wutz(crop_vision_frames, crop_matrices)
 
-	if face_landmark_score_2dfan4 > face_landmark_score_peppa_wutz - 0.2:
-		return face_landmark_2dfan4, face_landmark_score_2dfan4
-	return face_landmark_peppa_wutz, face_landmark_score_peppa_wutz
+	for face_landmark_2dfan4, face_landmark_score_2dfan4, face_landmark_peppa_wutz, face_landmark_score_peppa_wutz in zip(face_landmarks_2dfan4, face_landmark_scores_2dfan4, face_landmarks_peppa_wutz, face_landmark_scores_peppa_wutz):
+		if face_landmark_score_2dfan4 > face_landmark_score_peppa_wutz - 0.2:
+			face_landmarks_68.append(face_landmark_2dfan4)
+			face_landmark_scores_68.append(face_landmark_score_2dfan4)
+		else:
+			face_landmarks_68.append(face_landmark_peppa_wutz)
+			face_landmark_scores_68.append(face_landmark_score_peppa_wutz)
+	return face_landmarks_68, face_landmark_scores_68
 
 
-def detect_with_2dfan4(temp_vision_frame: VisionFrame, bounding_box: BoundingBox, face_angle: Angle) -> Tuple[FaceLandmark68, Score]:
+def prepare_crop_frames(vision_frame : VisionFrame, bounding_boxes : List[BoundingBox], face_angles : List[Angle]) -> Tuple[VisionFrame, List[Tuple[Matrix, Matrix]]]:
 	model_size = create_static_model_set('full').get('2dfan4').get('size')
-	scale = 195 / numpy.subtract(bounding_box[2:], bounding_box[:2]).max().clip(1, None)
-	translation = (model_size[0] - numpy.add(bounding_box[2:], bounding_box[:2]) * scale) * 0.5
-	rotated_matrix, rotated_size = create_rotated_matrix_and_size(face_angle, model_size)
-	crop_vision_frame, affine_matrix = warp_face_by_translation(temp_vision_frame, translation, scale, model_size)
-	crop_vision_frame = cv2.warpAffine(crop_vision_frame, rotated_matrix, rotated_size)
-	crop_vision_frame = conditional_optimize_contrast(crop_vision_frame)
-	crop_vision_frame = crop_vision_frame.transpose(2, 0, 1).astype(numpy.float32) / 255.0
-	face_landmark_68, face_heatmap = forward_with_2dfan4(crop_vision_frame)
-	face_landmark_68 = face_landmark_68[:, :, :2][0] / 64 * 256
+	crop_vision_frames = []
+	crop_matrices = []
+
+	for bounding_box, face_angle in zip(bounding_boxes, face_angles):
+		scale = 195 / numpy.subtract(bounding_box[2:], bounding_box[:2]).max().clip(1, None)
+		translation = (model_size[0] - numpy.add(bounding_box[2:], bounding_box[:2]) * scale) * 0.5
+		rotated_matrix, rotated_size = create_rotated_matrix_and_size(face_angle, model_size)
+		crop_vision_frame, affine_matrix = warp_face_by_translation(vision_frame, translation, scale, model_size)
+		crop_vision_frame = cv2.warpAffine(crop_vision_frame, rotated_matrix, rotated_size)
+		crop_vision_frame = conditional_optimize_contrast(crop_vision_frame)
+		crop_vision_frames.append(crop_vision_frame.transpose(2, 0, 1).astype(numpy.float32) / 255.0)
+		crop_matrices.append((rotated_matrix, affine_matrix))
+	return numpy.stack(crop_vision_frames), crop_matrices
+
+
+def restore_face_landmark_68(face_landmark_68 : FaceLandmark68, crop_matrix : Tuple[Matrix, Matrix]) -> FaceLandmark68:
+	rotated_matrix, affine_matrix = crop_matrix
 	face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(rotated_matrix))
 	face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(affine_matrix))
-	face_landmark_score_68 = numpy.amax(face_heatmap, axis = (2, 3))
-	face_landmark_score_68 = numpy.mean(face_landmark_score_68)
-	face_landmark_score_68 = numpy.interp(face_landmark_score_68, [ 0, 0.9 ], [ 0, 1 ])
-	return face_landmark_68, face_landmark_score_68
+	return face_landmark_68
+
+
+def detect_with_2dfan4(crop_vision_frames : VisionFrame, crop_matrices : List[Tuple[Matrix, Matrix]]) -> Tuple[List[FaceLandmark68], List[Score]]:
+	face_landmarks_68 = []
+	face_landmark_scores_68 = []
+	predictions, face_heatmaps = forward_with_2dfan4(crop_vision_frames)
+
+	for prediction, face_heatmap, crop_matrix in zip(predictions, face_heatmaps, crop_matrices):
+		face_landmark_68 = prediction[:, :2] / 64 * 256
+		face_landmarks_68.append(restore_face_landmark_68(face_landmark_68, crop_matrix))
+		face_landmark_score_68 = numpy.mean(numpy.amax(face_heatmap, axis = (1, 2)))
+		face_landmark_scores_68.append(numpy.interp(face_landmark_score_68, [ 0, 0.9 ], [ 0, 1 ]))
+	return face_landmarks_68, face_landmark_scores_68
 
 
-def detect_with_peppa_wutz(temp_vision_frame : VisionFrame, bounding_box : BoundingBox, face_angle : Angle) -> Tuple[FaceLandmark68, Score]:
+def detect_with_peppa_wutz(crop_vision_frames : VisionFrame, crop_matrices : List[Tuple[Matrix, Matrix]]) -> Tuple[List[FaceLandmark68], List[Score]]:
 	model_size = create_static_model_set('full').get('peppa_wutz').get('size')
-	scale = 195 / numpy.subtract(bounding_box[2:], bounding_box[:2]).max().clip(1, None)
-	translation = (model_size[0] - numpy.add(bounding_box[2:], bounding_box[:2]) * scale) * 0.5
-	rotated_matrix, rotated_size = create_rotated_matrix_and_size(face_angle, model_size)
-	crop_vision_frame, affine_matrix = warp_face_by_translation(temp_vision_frame, translation, scale, model_size)
-	crop_vision_frame = cv2.warpAffine(crop_vision_frame, rotated_matrix, rotated_size)
-	crop_vision_frame = conditional_optimize_contrast(crop_vision_frame)
-	crop_vision_frame = crop_vision_frame.transpose(2, 0, 1).astype(numpy.float32) / 255.0
-	crop_vision_frame = numpy.expand_dims(crop_vision_frame, axis = 0)
-	prediction = forward_with_peppa_wutz(crop_vision_frame)
-	face_landmark_68 = prediction.reshape(-1, 3)[:, :2] / 64 * model_size[0]
-	face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(rotated_matrix))
-	face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(affine_matrix))
-	face_landmark_score_68 = prediction.reshape(-1, 3)[:, 2].mean()
-	face_landmark_score_68 = numpy.interp(face_landmark_score_68, [ 0, 0.95 ], [ 0, 1 ])
-	return face_landmark_68, face_landmark_score_68
+	face_landmarks_68 = []
+	face_landmark_scores_68 = []
+	predictions = forward_with_peppa_wutz(crop_vision_frames)
+
+	for prediction, crop_matrix in zip(predictions, crop_matrices):
+		face_landmark_68 = prediction.reshape(-1, 3)[:, :2] / 64 * model_size[0]
+		face_landmarks_68.append(restore_face_landmark_68(face_landmark_68, crop_matrix))
+		face_landmark_score_68 = prediction.reshape(-1, 3)[:, 2].mean()
+		face_landmark_scores_68.append(numpy.interp(face_landmark_score_68, [ 0, 0.95 ], [ 0, 1 ]))
+	return face_landmarks_68, face_landmark_scores_68
 
 
 def conditional_optimize_contrast(crop_vision_frame : VisionFrame) -> VisionFrame:
@@ -177,44 +203,38 @@ def conditional_optimize_contrast(crop_vision_frame : VisionFrame) -> VisionFram
 
 
 def estimate_face_landmark_68_5(face_landmark_5 : FaceLandmark5) -> FaceLandmark68:
-	affine_matrix = estimate_matrix_by_face_landmark_5(face_landmark_5, 'ffhq_512', (1, 1))
-	face_landmark_5 = cv2.transform(face_landmark_5.reshape(1, -1, 2), affine_matrix).reshape(-1, 2)
-	face_landmark_68_5 = forward_fan_68_5(face_landmark_5)
-	face_landmark_68_5 = cv2.transform(face_landmark_68_5.reshape(1, -1, 2), cv2.invertAffineTransform(affine_matrix)).reshape(-1, 2)
-	return face_landmark_68_5
+	return estimate_face_landmark_68_5_batch([ face_landmark_5 ])[0]
 
 
-def forward_with_2dfan4(crop_vision_frame : VisionFrame) -> Tuple[Prediction, Prediction]:
-	face_landmarker = get_inference_pool().get('2dfan4')
+def estimate_face_landmark_68_5_batch(face_landmarks_5 : List[FaceLandmark5]) -> List[FaceLandmark68]:
+	affine_matrices = [ estimate_matrix_by_face_landmark_5(face_landmark_5, 'ffhq_512', (1, 1)) for face_landmark_5 in face_landmarks_5 ]
+	face_landmarks_5 = [ cv2.transform(face_landmark_5.reshape(1, -1, 2), affine_matrix).reshape(-1, 2) for face_landmark_5, affine_matrix in zip(face_landmarks_5, affine_matrices) ]
+	face_landmarks_68_5 = forward_fan_68_5(numpy.stack(face_landmarks_5))
+	return [ cv2.transform(face_landmark_68_5.reshape(1, -1, 2), cv2.invertAffineTransform(affine_matrix)).reshape(-1, 2) for face_landmark_68_5, affine_matrix in zip(face_landmarks_68_5, affine_matrices) ]
 
-	with conditional_thread_semaphore():
-		prediction = face_landmarker.run(None,
-		{
-			'input': [ crop_vision_frame ]
-		})
 
-	return prediction
+def forward_with_2dfan4(crop_vision_frames : VisionFrame) -> Tuple[Prediction, Prediction]:
+	face_landmarker = get_inference_pool().get('2dfan4')
+	predictions, face_heatmaps = run_inference_stack(face_landmarker,
+	{
+		'input': crop_vision_frames
+	})
+	return predictions, face_heatmaps
 
 
-def forward_with_peppa_wutz(crop_vision_frame : VisionFrame) -> Prediction:
+def forward_with_peppa_wutz(crop_vision_frames : VisionFrame) -> Prediction:
 	face_landmarker = get_inference_pool().get('peppa_wutz')
-
-	with conditional_thread_semaphore():
-		prediction = face_landmarker.run(None,
-		{
-			'input': crop_vision_frame
-		})[0]
-
-	return prediction
+	predictions = run_inference_stack(face_landmarker,
+	{
+		'input': crop_vision_frames
+	})[0]
+	return predictions
 
 
-def forward_fan_68_5(face_landmark_5 : FaceLandmark5) -> FaceLandmark68:
+def forward_fan_68_5(face_landmarks_5 : Points) -> Prediction:
 	face_landmarker = get_inference_pool().get('fan_68_5')
-
-	with conditional_thread_semaphore():
-		face_landmark_68_5 = face_landmarker.run(None,
-		{
-			'input': [ face_landmark_5 ]
-		})[0][0]
-
-	return face_landmark_68_5
+	face_landmarks_68_5 = run_inference_stack(face_landmarker,
+	{
+		'input': face_landmarks_5
+	})[0]
+	return face_landmarks_68_5
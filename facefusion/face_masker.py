@@ -9,7 +9,7 @@ import facefusion.choices
 from facefusion import inference_manager, state_manager
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.filesystem import resolve_relative_path
-from facefusion.thread_helper import conditional_thread_semaphore
+from facefusion.thread_helper import inference_semaphore
 from facefusion.typing import DownloadScope, DownloadSet, FaceLandmark68, FaceMaskRegion, InferencePool, Mask, ModelSet, Padding, VisionFrame
 
 
@@ -193,7 +193,7 @@ def forward_occlude_face(prepare_vision_frame : VisionFrame) -> Mask:
 	face_occluder_model = state_manager.get_item('face_occluder_model')
 	face_occluder = get_inference_pool().get(face_occluder_model)
 
-	with conditional_thread_semaphore():
+	with inference_semaphore(face_occluder):
 		occlusion_mask : Mask = face_occluder.run(None,
 		{
 			'input': prepare_vision_frame
@@ -206,7 +206,7 @@ def forward_parse_face(prepare_vision_frame : VisionFrame) -> Mask:
 	face_parser_model = state_manager.get_item('face_parser_model')
 	face_parser = get_inference_pool().get(face_parser_model)
 
-	with conditional_thread_semaphore():
+	with inference_semaphore(face_parser):
 		region_mask : Mask = face_parser.run(None,
 		{
 			'input': prepare_vision_frame
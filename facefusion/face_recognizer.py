@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import Tuple
+from typing import List, Tuple
 
 import numpy
 
@@ -7,7 +7,7 @@ from facefusion import inference_manager
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.face_helper import warp_face_by_face_landmark_5
 from facefusion.filesystem import resolve_relative_path
-from facefusion.thread_helper import conditional_thread_semaphore
+from facefusion.inference_batcher import run_inference_stack
 from facefusion.typing import DownloadScope, Embedding, FaceLandmark5, InferencePool, ModelOptions, ModelSet, VisionFrame
 
 
@@ -57,25 +57,29 @@ def pre_check() -> bool:
 
 
 def calc_embedding(temp_vision_frame : VisionFrame, face_landmark_5 : FaceLandmark5) -> Tuple[Embedding, Embedding]:
+	embeddings, normed_embeddings = calc_embedding_batch(temp_vision_frame, [ face_landmark_5 ])
+	return embeddings[0], normed_embeddings[0]
+
+
+def calc_embedding_batch(temp_vision_frame : VisionFrame, face_landmarks_5 : List[FaceLandmark5]) -> Tuple[List[Embedding], List[Embedding]]:
 	model_template = get_model_options().get('template')
 	model_size = get_model_options().get('size')
-	crop_vision_frame, matrix = warp_face_by_face_landmark_5(temp_vision_frame, face_landmark_5, model_template, model_size)
-	crop_vision_frame = crop_vision_frame / 127.5 - 1
-	crop_vision_frame = crop_vision_frame[:, :, ::-1].transpose(2, 0, 1).astype(numpy.float32)
-	crop_vision_frame = numpy.expand_dims(crop_vision_frame, axis = 0)
-	embedding = forward(crop_vision_frame)
-	embedding = embedding.ravel()
-	normed_embedding = embedding / numpy.linalg.norm(embedding)
-	return embedding, normed_embedding
+	crop_vision_frames = []
 
+	for face_landmark_5 in face_landmarks_5:
+		crop_vision_frame, _ = warp_face_by_face_landmark_5(temp_vision_frame, face_landmark_5, model_template, model_size)
+		crop_vision_frame = crop_vision_frame / 127.5 - 1
+		crop_vision_frames.append(crop_vision_frame[:, :, ::-1].transpose(2, 0, 1).astype(numpy.float32))
 
-def forward(crop_vision_frame : VisionFrame) -> Embedding:
-	face_recognizer = get_inference_pool().get('face_recognizer')
+	embeddings = forward(numpy.stack(crop_vision_frames)).reshape(len(crop_vision_frames), -1)
+	normed_embeddings = embeddings / numpy.linalg.norm(embeddings, axis = 1, keepdims = True)
+	return list(embeddings), list(normed_embeddings)
 
-	with conditional_thread_semaphore():
-		embedding = face_recognizer.run(None,
-		{
-			'input': crop_vision_frame
-		})[0]
 
-	return embedding
+def forward(crop_vision_frames : VisionFrame) -> Embedding:
+	face_recognizer = get_inference_pool().get('face_recognizer')
+	embeddings = run_inference_stack(face_recognizer,
+	{
+		'input': crop_vision_frames
+	})[0]
+	return embeddings
@@ -25,7 +25,7 @@ def compare_faces(face : Face, reference_face : Face, face_distance : float) ->
 
 
 def calc_face_distance(face : Face, reference_face : Face) -> float:
-	if hasattr(face, 'normed_embedding') and hasattr(reference_face, 'normed_embedding'):
+	if face.normed_embedding is not None and reference_face.normed_embedding is not None:
 		return 1 - numpy.dot(face.normed_embedding, reference_face.normed_embedding)
 	return 0
 
@@ -1,15 +1,26 @@
 import hashlib
-from typing import List, Optional
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, List, Optional
 
+import cv2
 import numpy
 
-from facefusion.typing import Face, FaceSet, FaceStore, VisionFrame
+from facefusion import state_manager
+from facefusion.typing import Face, FaceSet, FaceStore, Fps, VisionFrame
 
 FACE_STORE : FaceStore =\
 {
-	'static_faces': {},
+	'static_faces': OrderedDict(),
+	'static_face_memory': 0,
+	'static_face_hits': 0,
+	'static_face_misses': 0,
 	'reference_faces': {}
 }
+FACE_STORE_LOCK : threading.Lock = threading.Lock()
+FRAME_KEYS : Dict[int, Optional[str]] = {}
+FRAME_KEY_SCALE = 16
 
 
 def get_face_store() -> FaceStore:
@@ -17,24 +28,87 @@ def get_face_store() -> FaceStore:
 
 
 def get_static_faces(vision_frame : VisionFrame) -> Optional[List[Face]]:
-	frame_hash = create_frame_hash(vision_frame)
-	if frame_hash in FACE_STORE['static_faces']:
-		return FACE_STORE['static_faces'][frame_hash]
+	frame_key = get_frame_key(vision_frame)
+
+	with FACE_STORE_LOCK:
+		if frame_key in FACE_STORE['static_faces']:
+			FACE_STORE['static_faces'].move_to_end(frame_key)
+			FACE_STORE['static_face_hits'] += 1
+			return FACE_STORE['static_faces'][frame_key]
+		FACE_STORE['static_face_misses'] += 1
 	return None
 
 
 def set_static_faces(vision_frame : VisionFrame, faces : List[Face]) -> None:
-	frame_hash = create_frame_hash(vision_frame)
-	if frame_hash:
-		FACE_STORE['static_faces'][frame_hash] = faces
+	frame_key = get_frame_key(vision_frame)
+	face_store_memory_limit = state_manager.get_item('face_store_memory_limit')
+
+	if frame_key:
+		with FACE_STORE_LOCK:
+			if frame_key in FACE_STORE['static_faces']:
+				FACE_STORE['static_face_memory'] -= estimate_faces_memory(FACE_STORE['static_faces'].pop(frame_key))
+			FACE_STORE['static_faces'][frame_key] = faces
+			FACE_STORE['static_face_memory'] += estimate_faces_memory(faces)
+
+			if face_store_memory_limit:
+				while len(FACE_STORE['static_faces']) > 1 and FACE_STORE['static_face_memory'] > face_store_memory_limit * 1024 * 1024:
+					_, evict_faces = FACE_STORE['static_faces'].popitem(last = False)
+					FACE_STORE['static_face_memory'] -= estimate_faces_memory(evict_faces)
 
 
 def clear_static_faces() -> None:
-	FACE_STORE['static_faces'] = {}
+	with FACE_STORE_LOCK:
+		FACE_STORE['static_faces'] = OrderedDict()
+		FACE_STORE['static_face_memory'] = 0
+		FACE_STORE['static_face_hits'] = 0
+		FACE_STORE['static_face_misses'] = 0
+
+
+def get_frame_key(vision_frame : VisionFrame) -> Optional[str]:
+	frame_id = id(vision_frame)
+
+	with FACE_STORE_LOCK:
+		if frame_id in FRAME_KEYS:
+			return FRAME_KEYS[frame_id]
+	frame_key = create_frame_key(vision_frame)
+	set_frame_key(vision_frame, frame_key)
+	return frame_key
+
+
+def set_frame_key(vision_frame : VisionFrame, frame_key : Optional[str]) -> None:
+	frame_id = id(vision_frame)
+
+	with FACE_STORE_LOCK:
+		if frame_id not in FRAME_KEYS:
+			weakref.finalize(vision_frame, FRAME_KEYS.pop, frame_id, None)
+		FRAME_KEYS[frame_id] = frame_key
+
+
+def create_frame_key(vision_frame : VisionFrame) -> Optional[str]:
+	frame_height, frame_width = vision_frame.shape[:2]
+	thumbnail_height = max(frame_height // FRAME_KEY_SCALE, 1)
+	thumbnail_width = max(frame_width // FRAME_KEY_SCALE, 1)
+	crop_vision_frame = vision_frame[:thumbnail_height * FRAME_KEY_SCALE, :thumbnail_width * FRAME_KEY_SCALE]
+	thumbnail_vision_frame = cv2.resize(crop_vision_frame, (thumbnail_width, thumbnail_height), interpolation = cv2.INTER_AREA)
+
+	if numpy.any(thumbnail_vision_frame):
+		frame_hash = hashlib.sha1(str(vision_frame.shape).encode())
+		frame_hash.update(numpy.ascontiguousarray(thumbnail_vision_frame).data)
+		return frame_hash.hexdigest()
+	return None
+
+
+def create_frame_number_key(vision_frame : VisionFrame, frame_number : int, fps : Fps) -> str:
+	return '|'.join([ state_manager.get_item('target_path'), str(fps), str(frame_number), str(vision_frame.shape) ])
+
 
+def estimate_faces_memory(faces : List[Face]) -> int:
+	faces_memory = 0
 
-def create_frame_hash(vision_frame : VisionFrame) -> Optional[str]:
-	return hashlib.sha1(vision_frame.tobytes()).hexdigest() if numpy.any(vision_frame) else None
+	for face in faces:
+		face_arrays = [ face.bounding_box, face.embedding, face.normed_embedding ] + list(face.landmark_set.values())
+		faces_memory += sum(face_array.nbytes for face_array in face_arrays if isinstance(face_array, numpy.ndarray))
+	return faces_memory
 
 
 def get_reference_faces() -> Optional[FaceSet]:
@@ -0,0 +1,175 @@
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy
+from numpy.typing import NDArray
+
+from facefusion import state_manager
+from facefusion.common_helper import get_first
+from facefusion.face_analyser import analyse_faces, detect_many_faces, get_face_analyses, has_face_analyses
+from facefusion.face_helper import estimate_face_angle, transform_bounding_box, transform_points
+from facefusion.face_store import get_frame_key, get_static_faces, set_static_faces
+from facefusion.typing import BoundingBox, Face, FaceAnalysis, FaceLandmarkSet, FaceTracker, Points, Score, VisionFrame
+
+TRACK_ERROR_LIMIT = 1.0
+TRACK_IOU_LIMIT = 0.5
+
+
+def create_face_tracker() -> FaceTracker:
+	face_tracker : FaceTracker =\
+	{
+		'track_vision_frame': None,
+		'faces': [],
+		'track_ids': [],
+		'track_total': 0,
+		'frame_count': 0
+	}
+	return face_tracker
+
+
+def track_many_faces(face_tracker : FaceTracker, vision_frames : List[VisionFrame]) -> List[List[Face]]:
+	return [ track_faces(face_tracker, vision_frame) for vision_frame in vision_frames ]
+
+
+def track_faces(face_tracker : FaceTracker, vision_frame : VisionFrame) -> List[Face]:
+	if not get_frame_key(vision_frame):
+		return []
+
+	track_vision_frame = cv2.cvtColor(vision_frame, cv2.COLOR_BGR2GRAY)
+	face_analyses = get_face_analyses()
+	faces = get_static_faces(vision_frame)
+
+	if faces is not None and has_face_analyses(faces, face_analyses):
+		face_tracker['track_ids'] = match_track_ids(face_tracker, faces)
+	else:
+		faces = None
+
+		if face_tracker.get('frame_count') < state_manager.get_item('face_tracker_interval'):
+			faces = propagate_faces(face_tracker, track_vision_frame)
+		if faces is None:
+			faces = redetect_faces(face_tracker, vision_frame, face_analyses)
+			face_tracker['frame_count'] = 0
+		set_static_faces(vision_frame, faces)
+
+	face_tracker['track_vision_frame'] = track_vision_frame
+	face_tracker['faces'] = faces
+	face_tracker['frame_count'] += 1
+	return faces
+
+
+def propagate_faces(face_tracker : FaceTracker, track_vision_frame : VisionFrame) -> Optional[List[Face]]:
+	previous_vision_frame = face_tracker.get('track_vision_frame')
+	previous_faces = face_tracker.get('faces')
+	faces : List[Face] = []
+
+	if previous_vision_frame is None or previous_vision_frame.shape != track_vision_frame.shape:
+		return None
+	if not previous_faces:
+		return faces
+
+	face_points = [ numpy.concatenate([ face.landmark_set.get('5'), face.landmark_set.get('5/68'), face.landmark_set.get('68'), face.landmark_set.get('68/5') ]) for face in previous_faces ]
+	track_points, track_mask = calc_track_points(previous_vision_frame, track_vision_frame, numpy.concatenate(face_points))
+	point_index = 0
+
+	for face, points in zip(previous_faces, face_points):
+		point_total = len(points)
+		face = transform_face(face, points, track_points[point_index:point_index + point_total], track_mask[point_index:point_index + point_total])
+		point_index += point_total
+
+		if face is None:
+			return None
+		faces.append(face)
+	return faces
+
+
+def calc_track_points(previous_vision_frame : VisionFrame, track_vision_frame : VisionFrame, points : Points) -> Tuple[Points, NDArray[numpy.bool_]]:
+	points = points.reshape(-1, 1, 2).astype(numpy.float32)
+	track_points, track_status, _ = cv2.calcOpticalFlowPyrLK(previous_vision_frame, track_vision_frame, points, None, winSize = (21, 21), maxLevel = 3) #type:ignore[call-overload]
+	back_points, back_status, _ = cv2.calcOpticalFlowPyrLK(track_vision_frame, previous_vision_frame, track_points, None, winSize = (21, 21), maxLevel = 3) #type:ignore[call-overload]
+	track_error = numpy.linalg.norm(back_points - points, axis = -1).ravel()
+	track_mask = (track_status.ravel() == 1) & (back_status.ravel() == 1) & (track_error < TRACK_ERROR_LIMIT)
+	return track_points.reshape(-1, 2), track_mask
+
+
+def transform_face(face : Face, points : Points, track_points : Points, track_mask : NDArray[numpy.bool_]) -> Optional[Face]:
+	track_score : Score = float(numpy.mean(track_mask))
+
+	if track_score < state_manager.get_item('face_tracker_score') or numpy.sum(track_mask) < 2:
+		return None
+
+	affine_matrix, _ = cv2.estimateAffinePartial2D(points[track_mask], track_points[track_mask])
+
+	if affine_matrix is None:
+		return None
+	if not numpy.all(track_mask):
+		track_points = track_points.copy()
+		track_points[~track_mask] = transform_points(points[~track_mask], affine_matrix)
+
+	face_landmark_5, face_landmark_5_68, face_landmark_68, face_landmark_68_5 = numpy.split(track_points, numpy.cumsum([ len(face.landmark_set.get('5')), len(face.landmark_set.get('5/68')), len(face.landmark_set.get('68')) ]))
+	landmark_set : FaceLandmarkSet =\
+	{
+		'5': face_landmark_5,
+		'5/68': face_landmark_5_68,
+		'68': face_landmark_68,
+		'68/5': face_landmark_68_5
+	}
+	return face._replace(
+		bounding_box = transform_bounding_box(face.bounding_box, affine_matrix),
+		landmark_set = landmark_set,
+		angle = estimate_face_angle(landmark_set.get('68/5'))
+	)
+
+
+def redetect_faces(face_tracker : FaceTracker, vision_frame : VisionFrame, face_analyses : List[FaceAnalysis]) -> List[Face]:
+	faces = get_first(detect_many_faces([ vision_frame ], []))
+	track_ids = match_track_ids(face_tracker, faces)
+	faces = carry_track_faces(face_tracker, faces, track_ids)
+	analyse_indices = [ index for index, face in enumerate(faces) if not has_face_analyses([ face ], face_analyses) ]
+
+	for index, face in zip(analyse_indices, analyse_faces(vision_frame, [ faces[index] for index in analyse_indices ], face_analyses)):
+		faces[index] = face
+	face_tracker['track_ids'] = track_ids
+	return faces
+
+
+def carry_track_faces(face_tracker : FaceTracker, faces : List[Face], track_ids : List[int]) -> List[Face]:
+	previous_faces = dict(zip(face_tracker.get('track_ids'), face_tracker.get('faces')))
+	track_faces = []
+
+	for face, track_id in zip(faces, track_ids):
+		previous_face = previous_faces.get(track_id)
+		if previous_face is not None:
+			face = face._replace(
+				embedding = previous_face.embedding,
+				normed_embedding = previous_face.normed_embedding,
+				gender = previous_face.gender,
+				age = previous_face.age,
+				race = previous_face.race
+			)
+		track_faces.append(face)
+	return track_faces
+
+
+def match_track_ids(face_tracker : FaceTracker, faces : List[Face]) -> List[int]:
+	previous_faces = face_tracker.get('faces')
+	previous_track_ids = face_tracker.get('track_ids')
+	track_ids : List[int] = []
+
+	for face in faces:
+		track_ious = [ calc_bounding_box_iou(face.bounding_box, previous_face.bounding_box) for previous_face in previous_faces ]
+		track_index = int(numpy.argmax(track_ious)) if track_ious else -1
+
+		if track_index > -1 and track_ious[track_index] > TRACK_IOU_LIMIT and previous_track_ids[track_index] not in track_ids:
+			track_ids.append(previous_track_ids[track_index])
+		else:
+			track_ids.append(face_tracker.get('track_total'))
+			face_tracker['track_total'] += 1
+	return track_ids
+
+
+def calc_bounding_box_iou(bounding_box : BoundingBox, previous_bounding_box : BoundingBox) -> float:
+	x1, y1 = numpy.maximum(bounding_box[:2], previous_bounding_box[:2])
+	x2, y2 = numpy.minimum(bounding_box[2:], previous_bounding_box[2:])
+	intersection_area = max(x2 - x1, 0) * max(y2 - y1, 0)
+	union_area = numpy.prod(bounding_box[2:] - bounding_box[:2]) + numpy.prod(previous_bounding_box[2:] - previous_bounding_box[:2]) - intersection_area
+	return float(intersection_area / union_area) if union_area > 0 else 0.0
@@ -1,17 +1,20 @@
+import json
 import os
 import shutil
 import subprocess
 import tempfile
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 import filetype
+import numpy
 from tqdm import tqdm
 
 from facefusion import logger, process_manager, state_manager, wording
+from facefusion.common_helper import get_first
 from facefusion.filesystem import remove_file
-from facefusion.temp_helper import get_temp_file_path, get_temp_frame_paths, get_temp_frames_pattern
-from facefusion.typing import AudioBuffer, Fps, OutputVideoPreset, UpdateProgress
-from facefusion.vision import count_trim_frame_total, detect_video_duration, restrict_video_fps
+from facefusion.temp_helper import get_temp_file_path, get_temp_frame_format, get_temp_frame_paths, get_temp_frame_store_path, get_temp_frames_pattern
+from facefusion.typing import AudioBuffer, Fps, OutputVideoPreset, ProcessStream, UpdateProgress, VideoSegment, VisionFrame
+from facefusion.vision import count_trim_frame_total, detect_frame_store_resolution, detect_video_duration, detect_video_fps, detect_video_info, pack_resolution, restrict_video_fps, unpack_resolution, write_frame_store_resolution
 
 
 def run_ffmpeg_with_progress(args: List[str], update_progress : UpdateProgress) -> subprocess.Popen[bytes]:
@@ -79,16 +82,13 @@ def extract_frames(target_path : str, temp_video_resolution : str, temp_video_fp
 	extract_frame_total = count_trim_frame_total(target_path, trim_frame_start, trim_frame_end)
 	temp_frames_pattern = get_temp_frames_pattern(target_path, '%08d')
 	commands = [ '-i', target_path, '-s', str(temp_video_resolution), '-q:v', '0' ]
-
-	if isinstance(trim_frame_start, int) and isinstance(trim_frame_end, int):
-		commands.extend([ '-vf', 'trim=start_frame=' + str(trim_frame_start) + ':end_frame=' + str(trim_frame_end) + ',fps=' + str(temp_video_fps) ])
-	elif isinstance(trim_frame_start, int):
-		commands.extend([ '-vf', 'trim=start_frame=' + str(trim_frame_start) + ',fps=' + str(temp_video_fps) ])
-	elif isinstance(trim_frame_end, int):
-		commands.extend([ '-vf', 'trim=end_frame=' + str(trim_frame_end) + ',fps=' + str(temp_video_fps) ])
+	commands.extend(collect_extract_filter_args(temp_video_fps, trim_frame_start, trim_frame_end))
+	if get_temp_frame_format() == 'raw':
+		temp_frame_store_path = get_temp_frame_store_path(target_path)
+		write_frame_store_resolution(temp_frame_store_path, unpack_resolution(temp_video_resolution))
+		commands.extend([ '-vsync', '0', '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-y', temp_frame_store_path ])
 	else:
-		commands.extend([ '-vf', 'fps=' + str(temp_video_fps) ])
-	commands.extend([ '-vsync', '0', temp_frames_pattern ])
+		commands.extend([ '-vsync', '0', temp_frames_pattern ])
 
 	with tqdm(total = extract_frame_total, desc = wording.get('extracting'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
 		process = run_ffmpeg_with_progress(commands, lambda frame_number: progress.update(frame_number - progress.n))
@@ -96,18 +96,109 @@ def extract_frames(target_path : str, temp_video_resolution : str, temp_video_fp
 
 
 def merge_video(target_path : str, output_video_resolution : str, output_video_fps: Fps) -> bool:
-	output_video_encoder = state_manager.get_item('output_video_encoder')
-	output_video_quality = state_manager.get_item('output_video_quality')
-	output_video_preset = state_manager.get_item('output_video_preset')
-	merge_frame_total = len(get_temp_frame_paths(target_path))
+	temp_frame_paths = get_temp_frame_paths(target_path)
+	merge_frame_total = len(temp_frame_paths)
 	temp_video_fps = restrict_video_fps(target_path, output_video_fps)
 	temp_file_path = get_temp_file_path(target_path)
 	temp_frames_pattern = get_temp_frames_pattern(target_path, '%08d')
+
+	if get_temp_frame_format() == 'raw':
+		temp_frame_store_path = get_first(temp_frame_paths)
+		temp_frame_store_resolution = detect_frame_store_resolution(temp_frame_store_path)
+		commands = [ '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', pack_resolution(temp_frame_store_resolution), '-r', str(temp_video_fps), '-i', temp_frame_store_path, '-s', str(output_video_resolution) ]
+	else:
+		commands = [ '-r', str(temp_video_fps), '-i', temp_frames_pattern, '-s', str(output_video_resolution) ]
+	commands.extend(collect_merge_encoder_args(target_path))
+	commands.extend([ '-vf', 'framerate=fps=' + str(output_video_fps), '-pix_fmt', 'yuv420p', '-colorspace', 'bt709', '-y', temp_file_path ])
+
+	with tqdm(total = merge_frame_total, desc = wording.get('merging'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
+		process = run_ffmpeg_with_progress(commands, lambda frame_number: progress.update(frame_number - progress.n))
+		return process.returncode == 0
+
+
+def stream_video(target_path : str, output_video_resolution : str, output_video_fps : Fps, temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int, process_stream : ProcessStream) -> bool:
+	temp_file_path = get_temp_file_path(target_path)
+	commands = [ '-i', target_path, '-s', str(temp_video_resolution) ]
+	commands.extend(collect_extract_filter_args(temp_video_fps, trim_frame_start, trim_frame_end))
+	return pipe_video(commands, target_path, temp_file_path, output_video_resolution, output_video_fps, temp_video_resolution, temp_video_fps, process_stream)
+
+
+def stream_video_segment(target_path : str, temp_segment_path : str, output_video_resolution : str, output_video_fps : Fps, temp_video_resolution : str, temp_video_fps : Fps, video_segment : VideoSegment, process_stream : ProcessStream) -> bool:
+	segment_frame_start, segment_frame_end = video_segment
+	segment_start_time = max(segment_frame_start - 0.5, 0) / detect_video_fps(target_path)
+	commands = [ '-ss', str(segment_start_time), '-i', target_path, '-s', str(temp_video_resolution) ]
+	commands.extend(collect_extract_filter_args(temp_video_fps, None, segment_frame_end - segment_frame_start))
+	return pipe_video(commands, target_path, temp_segment_path, output_video_resolution, output_video_fps, temp_video_resolution, temp_video_fps, process_stream)
+
+
+def pipe_video(decode_commands : List[str], target_path : str, output_path : str, output_video_resolution : str, output_video_fps : Fps, temp_video_resolution : str, temp_video_fps : Fps, process_stream : ProcessStream) -> bool:
+	decode_commands.extend([ '-vsync', '0', '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-' ])
+	decode_process = open_ffmpeg(decode_commands)
+	encode_process = None
+	is_completed = False
+
+	try:
+		for output_vision_frame in process_stream(read_stream_frames(decode_process, temp_video_resolution)):
+			if not encode_process:
+				output_frame_height, output_frame_width = output_vision_frame.shape[:2]
+				encode_commands = [ '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', pack_resolution((output_frame_width, output_frame_height)), '-r', str(temp_video_fps), '-i', '-', '-s', str(output_video_resolution) ]
+				encode_commands.extend(collect_merge_encoder_args(target_path))
+				encode_commands.extend([ '-vf', 'framerate=fps=' + str(output_video_fps), '-pix_fmt', 'yuv420p', '-colorspace', 'bt709', '-y', output_path ])
+				encode_process = open_ffmpeg(encode_commands)
+			try:
+				encode_process.stdin.write(output_vision_frame.tobytes())
+			except BrokenPipeError:
+				break
+		is_completed = True
+	finally:
+		if not is_completed or not process_manager.is_processing():
+			decode_process.terminate()
+		decode_process.stdout.close()
+		decode_process.wait()
+		if encode_process:
+			if not is_completed:
+				encode_process.kill()
+			try:
+				encode_process.stdin.close()
+			except BrokenPipeError:
+				pass
+			encode_process.wait()
+
+	if encode_process:
+		return decode_process.returncode == 0 and encode_process.returncode == 0
+	return False
+
+
+def read_stream_frames(process : subprocess.Popen[bytes], temp_video_resolution : str) -> Iterator[VisionFrame]:
+	temp_frame_width, temp_frame_height = unpack_resolution(temp_video_resolution)
+	temp_frame_size = temp_frame_width * temp_frame_height * 3
+
+	while process_manager.is_processing():
+		frame_buffer = process.stdout.read(temp_frame_size)
+		if len(frame_buffer) < temp_frame_size:
+			break
+		yield numpy.frombuffer(frame_buffer, dtype = numpy.uint8).reshape(temp_frame_height, temp_frame_width, 3).copy()
+
+
+def collect_extract_filter_args(temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> List[str]:
+	if isinstance(trim_frame_start, int) and isinstance(trim_frame_end, int):
+		return [ '-vf', 'trim=start_frame=' + str(trim_frame_start) + ':end_frame=' + str(trim_frame_end) + ',fps=' + str(temp_video_fps) ]
+	if isinstance(trim_frame_start, int):
+		return [ '-vf', 'trim=start_frame=' + str(trim_frame_start) + ',fps=' + str(temp_video_fps) ]
+	if isinstance(trim_frame_end, int):
+		return [ '-vf', 'trim=end_frame=' + str(trim_frame_end) + ',fps=' + str(temp_video_fps) ]
+	return [ '-vf', 'fps=' + str(temp_video_fps) ]
+
+
+def collect_merge_encoder_args(target_path : str) -> List[str]:
+	output_video_encoder = state_manager.get_item('output_video_encoder')
+	output_video_quality = state_manager.get_item('output_video_quality')
+	output_video_preset = state_manager.get_item('output_video_preset')
 	is_webm = filetype.guess_mime(target_path) == 'video/webm'
 
 	if is_webm:
 		output_video_encoder = 'libvpx-vp9'
-	commands = [ '-r', str(temp_video_fps), '-i', temp_frames_pattern, '-s', str(output_video_resolution), '-c:v', output_video_encoder ]
+	commands = [ '-c:v', output_video_encoder ]
 	if output_video_encoder in [ 'libx264', 'libx265' ]:
 		output_video_compression = round(51 - (output_video_quality * 0.51))
 		commands.extend([ '-crf', str(output_video_compression), '-preset', output_video_preset ])
@@ -122,11 +213,7 @@ def merge_video(target_path : str, output_video_resolution : str, output_video_f
 		commands.extend([ '-qp_i', str(output_video_compression), '-qp_p', str(output_video_compression), '-quality', map_amf_preset(output_video_preset) ])
 	if output_video_encoder in [ 'h264_videotoolbox', 'hevc_videotoolbox' ]:
 		commands.extend([ '-q:v', str(output_video_quality) ])
-	commands.extend([ '-vf', 'framerate=fps=' + str(output_video_fps), '-pix_fmt', 'yuv420p', '-colorspace', 'bt709', '-y', temp_file_path ])
-
-	with tqdm(total = merge_frame_total, desc = wording.get('merging'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
-		process = run_ffmpeg_with_progress(commands, lambda frame_number: progress.update(frame_number - progress.n))
-		return process.returncode == 0
+	return commands
 
 
 def concat_video(output_path : str, temp_output_paths : List[str]) -> bool:
@@ -145,6 +232,31 @@ def concat_video(output_path : str, temp_output_paths : List[str]) -> bool:
 	return process.returncode == 0
 
 
+def detect_video_keyframes(target_path : str) -> List[int]:
+	video_info = detect_video_info(target_path)
+
+	if video_info and video_info.get('keyframes') is None:
+		video_info['keyframes'] = probe_video_keyframes(target_path, video_info.get('fps'))
+	if video_info:
+		return video_info.get('keyframes')
+	return []
+
+
+def probe_video_keyframes(target_path : str, video_fps : Fps) -> List[int]:
+	commands = [ shutil.which('ffprobe'), '-v', 'error', '-select_streams', 'v:0', '-skip_frame', 'nokey', '-show_entries', 'stream=start_time:frame=pts_time', '-of', 'json', target_path ]
+	process = subprocess.run(commands, stdout = subprocess.PIPE, stderr = subprocess.PIPE)
+	video_keyframes = []
+
+	if process.returncode == 0:
+		probe_result = json.loads(process.stdout.decode())
+		video_start_time = float(get_first(probe_result.get('streams')).get('start_time', 0))
+
+		for probe_frame in probe_result.get('frames'):
+			if 'pts_time' in probe_frame:
+				video_keyframes.append(round((float(probe_frame.get('pts_time')) - video_start_time) * video_fps))
+	return video_keyframes
+
+
 def copy_image(target_path : str, temp_image_resolution : str) -> bool:
 	temp_file_path = get_temp_file_path(target_path)
 	temp_image_compression = calc_image_compression(target_path, 100)
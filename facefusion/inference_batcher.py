@@ -0,0 +1,126 @@
+import threading
+from typing import Any, Dict, List
+
+import numpy
+from numpy.typing import NDArray
+from onnxruntime import InferenceSession
+
+from facefusion import state_manager
+from facefusion.inference_binder import run_inference_binding
+from facefusion.inference_manager import map_input_dtype
+from facefusion.thread_helper import inference_semaphore
+from facefusion.typing import InferenceBatch, InferenceInputs
+
+INFERENCE_BATCH_LOCK : threading.Lock = threading.Lock()
+INFERENCE_BATCHES : Dict[int, List[InferenceBatch]] = {}
+
+
+def run_inference_batch(inference_session : InferenceSession, inference_inputs : InferenceInputs) -> NDArray[Any]:
+	execution_batch_size = state_manager.get_item('execution_batch_size')
+	execution_batch_wait = state_manager.get_item('execution_batch_wait')
+
+	if not has_dynamic_batch(inference_session):
+		return forward_static_batch(inference_session, inference_inputs)
+	if not execution_batch_size or execution_batch_size < 2:
+		return run_inference_binding(inference_session, inference_inputs)[0]
+
+	inference_batch : InferenceBatch =\
+	{
+		'inference_inputs': inference_inputs,
+		'inference_output': None,
+		'inference_error': None,
+		'inference_event': threading.Event()
+	}
+	inference_batches = []
+
+	with INFERENCE_BATCH_LOCK:
+		pending_batches = INFERENCE_BATCHES.setdefault(id(inference_session), [])
+		pending_batches.append(inference_batch)
+		if sum(count_batch_size(pending_batch.get('inference_inputs')) for pending_batch in pending_batches) >= execution_batch_size:
+			inference_batches = pop_pending_batches(inference_session)
+	if inference_batches:
+		forward_inference_batches(inference_session, inference_batches)
+
+	if not inference_batch.get('inference_event').wait(execution_batch_wait / 1000):
+		with INFERENCE_BATCH_LOCK:
+			pending_batches = INFERENCE_BATCHES.get(id(inference_session), [])
+			if any(pending_batch is inference_batch for pending_batch in pending_batches):
+				inference_batches = pop_pending_batches(inference_session)
+		if inference_batches:
+			forward_inference_batches(inference_session, inference_batches)
+		inference_batch.get('inference_event').wait()
+
+	if inference_batch.get('inference_error'):
+		raise inference_batch.get('inference_error')
+	return inference_batch.get('inference_output')
+
+
+def forward_static_batch(inference_session : InferenceSession, inference_inputs : InferenceInputs) -> NDArray[Any]:
+	inference_outputs = []
+
+	for batch_index in range(count_batch_size(inference_inputs)):
+		with inference_semaphore(inference_session):
+			inference_output = inference_session.run(None,
+			{
+				input_name: input_value[batch_index:batch_index + 1] for input_name, input_value in inference_inputs.items()
+			})[0]
+		inference_outputs.append(inference_output)
+	return numpy.concatenate(inference_outputs)
+
+
+def run_inference_stack(inference_session : InferenceSession, inference_inputs : InferenceInputs) -> List[NDArray[Any]]:
+	inference_inputs = cast_inference_inputs(inference_session, inference_inputs)
+	inference_outputs = []
+
+	if has_dynamic_batch(inference_session):
+		with inference_semaphore(inference_session):
+			return inference_session.run(None, inference_inputs)
+
+	for batch_index in range(count_batch_size(inference_inputs)):
+		with inference_semaphore(inference_session):
+			inference_output = inference_session.run(None,
+			{
+				input_name: input_value[batch_index:batch_index + 1] for input_name, input_value in inference_inputs.items()
+			})
+		inference_outputs.append(inference_output)
+	return [ numpy.concatenate(batch_outputs) for batch_outputs in zip(*inference_outputs) ]
+
+
+def cast_inference_inputs(inference_session : InferenceSession, inference_inputs : InferenceInputs) -> InferenceInputs:
+	input_dtypes = { session_input.name: map_input_dtype(session_input.type) for session_input in inference_session.get_inputs() }
+	return { input_name: numpy.asarray(input_value, dtype = input_dtypes.get(input_name)) for input_name, input_value in inference_inputs.items() }
+
+
+def pop_pending_batches(inference_session : InferenceSession) -> List[InferenceBatch]:
+	return INFERENCE_BATCHES.pop(id(inference_session), [])
+
+
+def forward_inference_batches(inference_session : InferenceSession, inference_batches : List[InferenceBatch]) -> None:
+	batch_sizes = [ count_batch_size(inference_batch.get('inference_inputs')) for inference_batch in inference_batches ]
+	inference_inputs = {}
+
+	try:
+		for input_name in inference_batches[0].get('inference_inputs').keys():
+			inference_inputs[input_name] = numpy.concatenate([ inference_batch.get('inference_inputs').get(input_name) for inference_batch in inference_batches ])
+
+		with inference_semaphore(inference_session):
+			inference_output = inference_session.run(None, inference_inputs)[0]
+		inference_outputs = numpy.split(inference_output, numpy.cumsum(batch_sizes)[:-1])
+
+		for inference_batch, batch_output in zip(inference_batches, inference_outputs):
+			inference_batch['inference_output'] = batch_output
+	except Exception as exception:
+		for inference_batch in inference_batches:
+			inference_batch['inference_error'] = exception
+	finally:
+		for inference_batch in inference_batches:
+			inference_batch.get('inference_event').set()
+
+
+def count_batch_size(inference_inputs : InferenceInputs) -> int:
+	inference_input = next(iter(inference_inputs.values()))
+	return inference_input.shape[0]
+
+
+def has_dynamic_batch(inference_session : InferenceSession) -> bool:
+	return all(not isinstance(session_input.shape[0], int) for session_input in inference_session.get_inputs())
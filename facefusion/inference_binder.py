@@ -0,0 +1,87 @@
+import threading
+from typing import Any, List, Tuple
+from weakref import WeakKeyDictionary
+
+import numpy
+from numpy.typing import NDArray
+from onnxruntime import InferenceSession
+
+from facefusion.inference_manager import map_input_dtype
+from facefusion.thread_helper import inference_semaphore
+from facefusion.typing import InferenceBinding, InferenceBindingKey, InferenceInputs
+
+INFERENCE_BINDING_STORE : threading.local = threading.local()
+
+
+def get_inference_bindings() -> 'WeakKeyDictionary[InferenceSession, InferenceBinding]':
+	if not hasattr(INFERENCE_BINDING_STORE, 'inference_bindings'):
+		INFERENCE_BINDING_STORE.inference_bindings = WeakKeyDictionary()
+	return INFERENCE_BINDING_STORE.inference_bindings
+
+
+def get_inference_binding(inference_session : InferenceSession) -> InferenceBinding:
+	inference_bindings = get_inference_bindings()
+
+	if inference_session not in inference_bindings:
+		inference_bindings[inference_session] =\
+		{
+			'io_binding': inference_session.io_binding(),
+			'binding_key': None,
+			'input_buffers': {},
+			'output_buffers': {}
+		}
+	return inference_bindings.get(inference_session)
+
+
+def get_input_buffer(inference_session : InferenceSession, input_name : str, input_shape : Tuple[int, ...]) -> NDArray[Any]:
+	input_buffers = get_inference_binding(inference_session).get('input_buffers')
+	input_key = (input_name, tuple(input_shape))
+
+	if input_key not in input_buffers:
+		session_input = next(session_input for session_input in inference_session.get_inputs() if session_input.name == input_name)
+		input_dtype = map_input_dtype(session_input.type) or numpy.dtype(numpy.float32)
+		input_buffers[input_key] = numpy.empty(input_shape, dtype = input_dtype)
+	return input_buffers.get(input_key)
+
+
+def run_inference_binding(inference_session : InferenceSession, inference_inputs : InferenceInputs) -> List[NDArray[Any]]:
+	inference_binding = get_inference_binding(inference_session)
+	io_binding = inference_binding.get('io_binding')
+	output_buffers = inference_binding.get('output_buffers')
+	binding_key = create_binding_key(inference_inputs)
+	binding_inputs = { input_name: numpy.ascontiguousarray(input_value) for input_name, input_value in inference_inputs.items() }
+
+	for input_name, input_value in binding_inputs.items():
+		io_binding.bind_cpu_input(input_name, input_value)
+
+	if binding_key in output_buffers:
+		if inference_binding.get('binding_key') != binding_key:
+			bind_output_buffers(inference_session, output_buffers.get(binding_key))
+			inference_binding['binding_key'] = binding_key
+
+		with inference_semaphore(inference_session):
+			inference_session.run_with_iobinding(io_binding)
+		return output_buffers.get(binding_key)
+
+	io_binding.clear_binding_outputs()
+	for session_output in inference_session.get_outputs():
+		io_binding.bind_output(session_output.name)
+
+	with inference_semaphore(inference_session):
+		inference_session.run_with_iobinding(io_binding)
+	output_buffers[binding_key] = io_binding.copy_outputs_to_cpu()
+	bind_output_buffers(inference_session, output_buffers.get(binding_key))
+	inference_binding['binding_key'] = binding_key
+	return output_buffers.get(binding_key)
+
+
+def bind_output_buffers(inference_session : InferenceSession, output_buffers : List[NDArray[Any]]) -> None:
+	io_binding = get_inference_binding(inference_session).get('io_binding')
+	io_binding.clear_binding_outputs()
+
+	for session_output, output_buffer in zip(inference_session.get_outputs(), output_buffers):
+		io_binding.bind_output(session_output.name, 'cpu', 0, output_buffer.dtype.type, list(output_buffer.shape), output_buffer.ctypes.data)
+
+
+def create_binding_key(inference_inputs : InferenceInputs) -> InferenceBindingKey:
+	return tuple((input_name, tuple(input_value.shape)) for input_name, input_value in inference_inputs.items())
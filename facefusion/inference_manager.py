@@ -1,22 +1,48 @@
+import itertools
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from time import sleep
-from typing import List
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Optional, Set
 
-from onnxruntime import InferenceSession
+import numpy
+import onnxruntime
+import psutil
+from onnxruntime import ExecutionMode, GraphOptimizationLevel, InferenceSession, SessionOptions
 
-from facefusion import process_manager, state_manager
+from facefusion import logger, process_manager, state_manager, wording
 from facefusion.app_context import detect_app_context
 from facefusion.execution import create_inference_execution_providers
-from facefusion.thread_helper import thread_lock
-from facefusion.typing import DownloadSet, ExecutionProvider, InferencePool, InferencePoolSet
+from facefusion.filesystem import create_directory, get_file_size, is_file, remove_file
+from facefusion.hash_helper import create_hash, get_hash_path
+from facefusion.inference_profiler import conditional_profile_inference_session
+from facefusion.model_quantizer import conditional_quantize_model
+from facefusion.thread_helper import inference_semaphore, thread_lock
+from facefusion.typing import AppContext, DownloadSet, ExecutionGraphOptimization, ExecutionProvider, InferenceInputs, InferencePool, InferencePoolSet, InferencePoolUsage, InferenceSessionOptions
 
 INFERENCE_POOLS : InferencePoolSet =\
 {
 	'cli': {}, #type:ignore[typeddict-item]
 	'ui': {} #type:ignore[typeddict-item]
 }
+INFERENCE_FUTURES : Dict[str, Future[List[InferencePool]]] = {}
+INFERENCE_POOL_USAGES : OrderedDict[str, InferencePoolUsage] = OrderedDict()
+INFERENCE_POOL_EVICTIONS : Set[str] = set()
+INFERENCE_POOL_EVICTION_HALTED : bool = False
+INFERENCE_MEMORY_LOCK : threading.Lock = threading.Lock()
+INFERENCE_SESSION_SLOT : threading.local = threading.local()
+INFERENCE_SESSION_COUNTER : Iterator[int] = itertools.count()
 
 
-def get_inference_pool(model_context : str, model_sources : DownloadSet) -> InferencePool:
+def get_inference_pool(model_context : str, model_sources : DownloadSet, inference_session_options : Optional[InferenceSessionOptions] = None) -> InferencePool:
+	inference_pools = resolve_inference_pools(model_context, model_sources, inference_session_options)
+	return inference_pools[get_inference_session_index() % len(inference_pools)]
+
+
+def resolve_inference_pools(model_context : str, model_sources : DownloadSet, inference_session_options : Optional[InferenceSessionOptions]) -> List[InferencePool]:
 	global INFERENCE_POOLS
 
 	with thread_lock():
@@ -25,38 +51,320 @@ def get_inference_pool(model_context : str, model_sources : DownloadSet) -> Infe
 		app_context = detect_app_context()
 		inference_context = get_inference_context(model_context)
 
-		if app_context == 'cli' and INFERENCE_POOLS.get('ui').get(inference_context):
-			INFERENCE_POOLS['cli'][inference_context] = INFERENCE_POOLS.get('ui').get(inference_context)
-		if app_context == 'ui' and INFERENCE_POOLS.get('cli').get(inference_context):
-			INFERENCE_POOLS['ui'][inference_context] = INFERENCE_POOLS.get('cli').get(inference_context)
-		if not INFERENCE_POOLS.get(app_context).get(inference_context):
-			INFERENCE_POOLS[app_context][inference_context] = create_inference_pool(model_sources, state_manager.get_item('execution_device_id'), state_manager.get_item('execution_providers'))
+		share_inference_pools(app_context, inference_context)
+		if INFERENCE_POOLS.get(app_context).get(inference_context) and has_inference_pool_changed(inference_context, model_sources):
+			remove_inference_pools(inference_context)
+		if INFERENCE_POOLS.get(app_context).get(inference_context):
+			if inference_context in INFERENCE_POOL_USAGES:
+				INFERENCE_POOL_USAGES.move_to_end(inference_context)
+			return INFERENCE_POOLS.get(app_context).get(inference_context)
+		inference_future = INFERENCE_FUTURES.get(inference_context)
+		is_creator = inference_future is None
+		if is_creator:
+			inference_future = Future()
+			INFERENCE_FUTURES[inference_context] = inference_future
+
+	if is_creator:
+		try:
+			inference_session_options = inference_session_options or create_inference_session_options()
+			with INFERENCE_MEMORY_LOCK:
+				inference_pools = [ create_inference_pool(model_sources, state_manager.get_item('execution_device_id'), state_manager.get_item('execution_providers'), inference_session_options) for _ in range(get_inference_session_count()) ]
+				inference_memory_growth = warm_up_inference_sessions(model_context, inference_pools)
+		except Exception as exception:
+			with thread_lock():
+				INFERENCE_FUTURES.pop(inference_context, None)
+			inference_future.set_exception(exception)
+			raise
+		inference_pool_usage : InferencePoolUsage =\
+		{
+			'model_paths': collect_model_paths(model_sources),
+			'memory_size': estimate_inference_pool_memory(model_sources, len(inference_pools), inference_memory_growth)
+		}
+		with thread_lock():
+			INFERENCE_POOLS[app_context][inference_context] = inference_pools
+			INFERENCE_POOL_USAGES[inference_context] = inference_pool_usage
+			INFERENCE_FUTURES.pop(inference_context, None)
+			conditional_evict_inference_pools(inference_context)
+		inference_future.set_result(inference_pools)
+		return inference_pools
 
-		return INFERENCE_POOLS.get(app_context).get(inference_context)
+	if inference_future.exception():
+		return resolve_inference_pools(model_context, model_sources, inference_session_options)
+	return inference_future.result()
 
 
-def create_inference_pool(model_sources : DownloadSet, execution_device_id : str, execution_providers : List[ExecutionProvider]) -> InferencePool:
+def create_inference_pool(model_sources : DownloadSet, execution_device_id : str, execution_providers : List[ExecutionProvider], inference_session_options : InferenceSessionOptions) -> InferencePool:
 	inference_pool : InferencePool = {}
 
 	for model_name in model_sources.keys():
 		print(f'******* inference_manager: create_inference_pool: model_name: {model_name}')
-		inference_pool[model_name] = create_inference_session(model_sources.get(model_name).get('path'), execution_device_id, execution_providers)
+		model_path = model_sources.get(model_name).get('path')
+		inference_session = create_inference_session(model_path, execution_device_id, execution_providers, inference_session_options)
+		inference_pool[model_name] = conditional_profile_inference_session(inference_session, os.path.splitext(os.path.basename(model_path))[0])
 	return inference_pool
 
 
+def share_inference_pools(app_context : AppContext, inference_context : str) -> None:
+	if app_context == 'cli' and INFERENCE_POOLS.get('ui').get(inference_context):
+		INFERENCE_POOLS['cli'][inference_context] = INFERENCE_POOLS.get('ui').get(inference_context)
+	if app_context == 'ui' and INFERENCE_POOLS.get('cli').get(inference_context):
+		INFERENCE_POOLS['ui'][inference_context] = INFERENCE_POOLS.get('cli').get(inference_context)
+
+
 def clear_inference_pool(model_context : str) -> None:
 	global INFERENCE_POOLS
 
 	app_context = detect_app_context()
 	inference_context = get_inference_context(model_context)
 
+	if state_manager.get_item('inference_pool_memory_limit') and not is_inference_pool_memory_exceeded():
+		return
 	if INFERENCE_POOLS.get(app_context).get(inference_context):
 		del INFERENCE_POOLS[app_context][inference_context]
+		INFERENCE_POOL_USAGES.pop(inference_context, None)
+
+
+def clear_inference_pools() -> None:
+	global INFERENCE_POOL_EVICTION_HALTED
+
+	with thread_lock():
+		INFERENCE_POOL_EVICTIONS.clear()
+		INFERENCE_POOL_EVICTION_HALTED = False
+		for inference_context in list(INFERENCE_POOL_USAGES.keys()):
+			remove_inference_pools(inference_context)
+		for app_context in INFERENCE_POOLS.keys():
+			INFERENCE_POOLS[app_context].clear()
+
+
+def conditional_evict_inference_pools(keep_inference_context : str) -> None:
+	global INFERENCE_POOL_EVICTION_HALTED
+
+	inference_pool_memory_limit = state_manager.get_item('inference_pool_memory_limit')
+
+	if inference_pool_memory_limit and not INFERENCE_POOL_EVICTION_HALTED:
+		if keep_inference_context in INFERENCE_POOL_EVICTIONS:
+			INFERENCE_POOL_EVICTION_HALTED = True
+			logger.warn(wording.get('inference_pool_memory_limit_exceeded').format(inference_pool_memory_limit = inference_pool_memory_limit, inference_pool_memory = calc_inference_pool_memory() // (1024 * 1024)), __name__)
+			return
+		for inference_context in list(INFERENCE_POOL_USAGES.keys()):
+			if not is_inference_pool_memory_exceeded():
+				break
+			if inference_context != keep_inference_context:
+				remove_inference_pools(inference_context)
+				INFERENCE_POOL_EVICTIONS.add(inference_context)
+
+
+def remove_inference_pools(inference_context : str) -> None:
+	for app_context in INFERENCE_POOLS.keys():
+		INFERENCE_POOLS[app_context].pop(inference_context, None)
+	INFERENCE_POOL_USAGES.pop(inference_context, None)
+
+
+def has_inference_pool_changed(inference_context : str, model_sources : DownloadSet) -> bool:
+	inference_pool_usage = INFERENCE_POOL_USAGES.get(inference_context)
+	return bool(inference_pool_usage) and inference_pool_usage.get('model_paths') != collect_model_paths(model_sources)
 
 
-def create_inference_session(model_path : str, execution_device_id : str, execution_providers : List[ExecutionProvider]) -> InferenceSession:
+def is_inference_pool_memory_exceeded() -> bool:
+	return calc_inference_pool_memory() > state_manager.get_item('inference_pool_memory_limit') * 1024 * 1024
+
+
+def calc_inference_pool_memory() -> int:
+	return sum(inference_pool_usage.get('memory_size') for inference_pool_usage in INFERENCE_POOL_USAGES.values())
+
+
+def estimate_inference_pool_memory(model_sources : DownloadSet, inference_session_count : int, inference_memory_growth : int) -> int:
+	model_size = sum(get_file_size(model_path) for model_path in collect_model_paths(model_sources))
+	return model_size * inference_session_count + inference_memory_growth
+
+
+def collect_model_paths(model_sources : DownloadSet) -> List[str]:
+	return [ model_sources.get(model_name).get('path') for model_name in model_sources.keys() ]
+
+
+def create_inference_session(model_path : str, execution_device_id : str, execution_providers : List[ExecutionProvider], inference_session_options : InferenceSessionOptions) -> InferenceSession:
 	inference_execution_providers = create_inference_execution_providers(execution_device_id, execution_providers)
-	return InferenceSession(model_path, providers = inference_execution_providers)
+	session_options = create_session_options(inference_session_options)
+	model_path = resolve_quantized_model_path(model_path, execution_providers, inference_session_options)
+	optimized_model_path = resolve_optimized_model_path(model_path, execution_providers, inference_session_options)
+
+	if optimized_model_path and not is_file(optimized_model_path) and create_directory(os.path.dirname(optimized_model_path)):
+		save_optimized_model(model_path, optimized_model_path, inference_execution_providers, inference_session_options)
+	if is_file(optimized_model_path):
+		session_options.graph_optimization_level = GraphOptimizationLevel.ORT_ENABLE_ALL if inference_session_options.get('graph_optimization') == 'all' else GraphOptimizationLevel.ORT_DISABLE_ALL
+		try:
+			return InferenceSession(optimized_model_path, sess_options = session_options, providers = inference_execution_providers)
+		except Exception:
+			remove_file(optimized_model_path)
+			session_options = create_session_options(inference_session_options)
+	return InferenceSession(model_path, sess_options = session_options, providers = inference_execution_providers)
+
+
+def save_optimized_model(model_path : str, optimized_model_path : str, inference_execution_providers : List[Any], inference_session_options : InferenceSessionOptions) -> None:
+	temp_model_path = optimized_model_path + '.' + str(os.getpid()) + '.' + str(threading.get_ident()) + '.tmp'
+	session_options = create_session_options(inference_session_options)
+	session_options.graph_optimization_level = map_graph_optimization_level(resolve_saved_graph_optimization(inference_session_options.get('graph_optimization')))
+	session_options.optimized_model_filepath = temp_model_path
+
+	try:
+		InferenceSession(model_path, sess_options = session_options, providers = inference_execution_providers)
+	except Exception:
+		remove_file(temp_model_path)
+		return
+	if is_file(temp_model_path):
+		os.replace(temp_model_path, optimized_model_path)
+
+
+def create_session_options(inference_session_options : InferenceSessionOptions) -> SessionOptions:
+	session_options = SessionOptions()
+	session_options.intra_op_num_threads = inference_session_options.get('intra_op_thread_count')
+	session_options.inter_op_num_threads = inference_session_options.get('inter_op_thread_count')
+	session_options.execution_mode = ExecutionMode.ORT_PARALLEL if inference_session_options.get('inter_op_thread_count') > 1 else ExecutionMode.ORT_SEQUENTIAL
+	session_options.graph_optimization_level = map_graph_optimization_level(inference_session_options.get('graph_optimization'))
+	session_options.enable_cpu_mem_arena = inference_session_options.get('memory_arena')
+	session_options.enable_mem_pattern = inference_session_options.get('memory_pattern')
+	return session_options
+
+
+def resolve_optimized_model_path(model_path : str, execution_providers : List[ExecutionProvider], inference_session_options : InferenceSessionOptions) -> Optional[str]:
+	if is_file(model_path) and execution_providers == [ 'cpu' ] and inference_session_options.get('graph_optimization') != 'disable':
+		model_name, _ = os.path.splitext(os.path.basename(model_path))
+		model_hash = resolve_model_hash(model_path)
+		return os.path.join('.caches', model_name + '-' + model_hash + '-ort' + onnxruntime.__version__ + '-' + '_'.join(execution_providers) + '-' + resolve_saved_graph_optimization(inference_session_options.get('graph_optimization')) + '.onnx')
+	return None
+
+
+def resolve_quantized_model_path(model_path : str, execution_providers : List[ExecutionProvider], inference_session_options : InferenceSessionOptions) -> str:
+	if is_file(model_path) and execution_providers == [ 'cpu' ] and inference_session_options.get('quantization') == 'int8':
+		model_name, _ = os.path.splitext(os.path.basename(model_path))
+		quantized_model_path = os.path.join('.caches', model_name + '-' + resolve_model_hash(model_path) + '-int8.onnx')
+		if create_directory(os.path.dirname(quantized_model_path)) and conditional_quantize_model(model_path, quantized_model_path):
+			return quantized_model_path
+	return model_path
+
+
+def resolve_model_hash(model_path : str) -> str:
+	hash_path = get_hash_path(model_path)
+
+	if is_file(hash_path):
+		with open(hash_path, 'r') as hash_file:
+			return hash_file.read().strip()
+	model_stat = os.stat(model_path)
+	return create_static_model_hash(model_path, model_stat.st_mtime_ns, model_stat.st_size)
+
+
+@lru_cache(maxsize = None)
+def create_static_model_hash(model_path : str, model_modified_time : int, model_size : int) -> str:
+	with open(model_path, 'rb') as model_file:
+		return create_hash(model_file.read())
+
+
+def create_inference_session_options() -> InferenceSessionOptions:
+	execution_session_count = get_inference_session_count()
+	intra_op_thread_count = state_manager.get_item('execution_intra_op_thread_count') or 0
+	inter_op_thread_count = state_manager.get_item('execution_inter_op_thread_count') or 0
+	system_memory_limit = state_manager.get_item('system_memory_limit') or 0
+
+	if not intra_op_thread_count and execution_session_count > 1:
+		intra_op_thread_count = max((os.cpu_count() or 1) // execution_session_count, 1)
+	inference_session_options : InferenceSessionOptions =\
+	{
+		'intra_op_thread_count': intra_op_thread_count,
+		'inter_op_thread_count': inter_op_thread_count,
+		'graph_optimization': state_manager.get_item('execution_graph_optimization') or 'all',
+		'quantization': state_manager.get_item('execution_quantization') or 'none',
+		'memory_arena': system_memory_limit == 0,
+		'memory_pattern': system_memory_limit == 0
+	}
+	return inference_session_options
+
+
+def resolve_saved_graph_optimization(graph_optimization : ExecutionGraphOptimization) -> ExecutionGraphOptimization:
+	if graph_optimization == 'all':
+		return 'extended'
+	return graph_optimization
+
+
+def map_graph_optimization_level(graph_optimization : ExecutionGraphOptimization) -> GraphOptimizationLevel:
+	if graph_optimization == 'disable':
+		return GraphOptimizationLevel.ORT_DISABLE_ALL
+	if graph_optimization == 'basic':
+		return GraphOptimizationLevel.ORT_ENABLE_BASIC
+	if graph_optimization == 'extended':
+		return GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+	return GraphOptimizationLevel.ORT_ENABLE_ALL
+
+
+def warm_up_inference_pools(model_modules : List[ModuleType]) -> None:
+	app_context = detect_app_context()
+	executor = ThreadPoolExecutor(max_workers = max(len(model_modules), 1))
+
+	for model_module in model_modules:
+		executor.submit(warm_up_inference_pool, model_module, app_context)
+	executor.shutdown(wait = False)
+
+
+def warm_up_inference_pool(model_module : ModuleType, app_context : AppContext) -> None:
+	try:
+		model_module.get_inference_pool()
+	except Exception as exception:
+		logger.warn(wording.get('inference_pool_not_warmed_up').format(model_module = model_module.__name__, exception = exception), __name__)
+		return
+	inference_context = get_inference_context(model_module.__name__)
+
+	with thread_lock():
+		share_inference_pools(app_context, inference_context)
+
+
+def warm_up_inference_sessions(model_context : str, inference_pools : List[InferencePool]) -> int:
+	inference_memory_growth = 0
+
+	for inference_pool in inference_pools:
+		for inference_session in inference_pool.values():
+			inference_inputs = create_dummy_inputs(inference_session)
+			if inference_inputs:
+				process_memory_size = psutil.Process().memory_info().rss
+				try:
+					with inference_semaphore(inference_session):
+						inference_session.run(None, inference_inputs)
+				except Exception as exception:
+					logger.debug(wording.get('inference_pool_not_warmed_up').format(model_module = model_context, exception = exception), __name__)
+				inference_memory_growth += max(psutil.Process().memory_info().rss - process_memory_size, 0)
+	return inference_memory_growth
+
+
+def create_dummy_inputs(inference_session : InferenceSession) -> Optional[InferenceInputs]:
+	inference_inputs = {}
+
+	for session_input in inference_session.get_inputs():
+		input_shape = [ 1 if index == 0 and not isinstance(input_dimension, int) else input_dimension for index, input_dimension in enumerate(session_input.shape) ]
+		input_dtype = map_input_dtype(session_input.type)
+		if input_dtype is None or not all(isinstance(input_dimension, int) for input_dimension in input_shape):
+			return None
+		inference_inputs[session_input.name] = numpy.zeros(input_shape, dtype = input_dtype)
+	return inference_inputs
+
+
+def map_input_dtype(input_type : str) -> Optional[numpy.dtype]:
+	if input_type == 'tensor(float)':
+		return numpy.dtype(numpy.float32)
+	if input_type == 'tensor(float16)':
+		return numpy.dtype(numpy.float16)
+	if input_type == 'tensor(int64)':
+		return numpy.dtype(numpy.int64)
+	if input_type == 'tensor(int32)':
+		return numpy.dtype(numpy.int32)
+	return None
+
+
+def get_inference_session_count() -> int:
+	return state_manager.get_item('execution_session_count') or 1
+
+
+def get_inference_session_index() -> int:
+	if not hasattr(INFERENCE_SESSION_SLOT, 'index'):
+		INFERENCE_SESSION_SLOT.index = next(INFERENCE_SESSION_COUNTER)
+	return INFERENCE_SESSION_SLOT.index
 
 
 def get_inference_context(model_context : str) -> str:
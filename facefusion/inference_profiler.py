@@ -0,0 +1,126 @@
+import random
+import threading
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
+from weakref import WeakSet
+
+import numpy
+from onnxruntime import InferenceSession, RunOptions
+
+from facefusion import logger, state_manager
+from facefusion.common_helper import get_first
+from facefusion.json import write_json
+from facefusion.typing import InferenceInputs, InferenceProfile, InferenceProfileRecord
+
+INFERENCE_PROFILE_RECORDS : Dict[Tuple[str, str], InferenceProfileRecord] = {}
+INFERENCE_PROFILE_WARM_SESSIONS : 'WeakSet[InferenceSession]' = WeakSet()
+INFERENCE_PROFILE_LOCK : threading.Lock = threading.Lock()
+INFERENCE_PROFILE_SAMPLE_TOTAL = 1024
+
+
+def is_inference_profiling() -> bool:
+	return bool(state_manager.get_item('log_inference_profile') or state_manager.get_item('inference_profile_path'))
+
+
+def conditional_profile_inference_session(inference_session : InferenceSession, model_name : str) -> InferenceSession:
+	if is_inference_profiling():
+		execution_provider = get_first(inference_session.get_providers())
+		inference_run = inference_session.run
+		inference_run_with_iobinding = inference_session.run_with_iobinding
+		inference_session.run = lambda output_names, input_feed, run_options = None: profile_inference_run(inference_session, inference_run, model_name, execution_provider, output_names, input_feed, run_options) #type:ignore[method-assign]
+		inference_session.run_with_iobinding = lambda io_binding, run_options = None: profile_inference_run_with_iobinding(inference_session, inference_run_with_iobinding, model_name, execution_provider, io_binding, run_options) #type:ignore[method-assign]
+	return inference_session
+
+
+def profile_inference_run(inference_session : InferenceSession, inference_run : Any, model_name : str, execution_provider : str, output_names : Optional[List[str]], inference_inputs : InferenceInputs, run_options : Optional[RunOptions]) -> List[Any]:
+	start_time = perf_counter()
+	outputs = inference_run(output_names, inference_inputs, run_options)
+	batch_size = get_first([ numpy.shape(inference_input)[0] for inference_input in inference_inputs.values() if numpy.ndim(inference_input) ]) or 1
+	if warm_inference_session(inference_session):
+		record_inference_run(model_name, execution_provider, batch_size, perf_counter() - start_time)
+	return outputs
+
+
+def profile_inference_run_with_iobinding(inference_session : InferenceSession, inference_run_with_iobinding : Any, model_name : str, execution_provider : str, io_binding : Any, run_options : Optional[RunOptions]) -> None:
+	start_time = perf_counter()
+	inference_run_with_iobinding(io_binding, run_options)
+	batch_size = get_first([ output.shape()[0] for output in io_binding.get_outputs() if output.shape() ]) or 1
+	if warm_inference_session(inference_session):
+		record_inference_run(model_name, execution_provider, batch_size, perf_counter() - start_time)
+
+
+def warm_inference_session(inference_session : InferenceSession) -> bool:
+	with INFERENCE_PROFILE_LOCK:
+		if inference_session in INFERENCE_PROFILE_WARM_SESSIONS:
+			return True
+		INFERENCE_PROFILE_WARM_SESSIONS.add(inference_session)
+	return False
+
+
+def record_inference_run(model_name : str, execution_provider : str, batch_size : int, duration : float) -> None:
+	with INFERENCE_PROFILE_LOCK:
+		inference_profile_record = INFERENCE_PROFILE_RECORDS.setdefault((model_name, execution_provider),
+		{
+			'call_total': 0,
+			'batch_total': 0,
+			'total_duration': 0.0,
+			'durations': []
+		})
+		inference_profile_record['call_total'] += 1
+		inference_profile_record['batch_total'] += batch_size
+		inference_profile_record['total_duration'] += duration
+		durations = inference_profile_record.get('durations')
+
+		if len(durations) < INFERENCE_PROFILE_SAMPLE_TOTAL:
+			durations.append(duration)
+		else:
+			duration_index = random.randrange(inference_profile_record.get('call_total'))
+			if duration_index < INFERENCE_PROFILE_SAMPLE_TOTAL:
+				durations[duration_index] = duration
+
+
+def create_inference_profiles() -> List[InferenceProfile]:
+	inference_profiles = []
+
+	with INFERENCE_PROFILE_LOCK:
+		for (model_name, execution_provider), inference_profile_record in INFERENCE_PROFILE_RECORDS.items():
+			durations = numpy.array(inference_profile_record.get('durations')) * 1000
+			inference_profile : InferenceProfile =\
+			{
+				'model_name': model_name,
+				'execution_provider': execution_provider,
+				'call_total': inference_profile_record.get('call_total'),
+				'batch_total': inference_profile_record.get('batch_total'),
+				'total_duration': round(inference_profile_record.get('total_duration') * 1000, 2),
+				'p50_duration': round(float(numpy.percentile(durations, 50)), 2),
+				'p95_duration': round(float(numpy.percentile(durations, 95)), 2),
+				'p99_duration': round(float(numpy.percentile(durations, 99)), 2)
+			}
+			inference_profiles.append(inference_profile)
+	return sorted(inference_profiles, key = lambda inference_profile: inference_profile.get('total_duration'), reverse = True)
+
+
+def clear_inference_profiles() -> None:
+	with INFERENCE_PROFILE_LOCK:
+		INFERENCE_PROFILE_RECORDS.clear()
+
+
+def conditional_log_inference_profiles() -> None:
+	if is_inference_profiling():
+		inference_profiles = create_inference_profiles()
+		inference_profile_path = state_manager.get_item('inference_profile_path')
+
+		if state_manager.get_item('log_inference_profile'):
+			for inference_profile_row in format_inference_profiles(inference_profiles):
+				logger.info(inference_profile_row, __name__)
+		if inference_profile_path:
+			write_json(inference_profile_path, inference_profiles) #type:ignore[arg-type]
+		clear_inference_profiles()
+
+
+def format_inference_profiles(inference_profiles : List[InferenceProfile]) -> List[str]:
+	inference_profile_rows = [ 'model'.ljust(32) + 'provider'.ljust(28) + 'calls'.rjust(8) + 'batch'.rjust(8) + 'total ms'.rjust(12) + 'p50 ms'.rjust(10) + 'p95 ms'.rjust(10) + 'p99 ms'.rjust(10) ]
+
+	for inference_profile in inference_profiles:
+		inference_profile_rows.append(inference_profile.get('model_name').ljust(32) + inference_profile.get('execution_provider').ljust(28) + str(inference_profile.get('call_total')).rjust(8) + str(inference_profile.get('batch_total')).rjust(8) + str(inference_profile.get('total_duration')).rjust(12) + str(inference_profile.get('p50_duration')).rjust(10) + str(inference_profile.get('p95_duration')).rjust(10) + str(inference_profile.get('p99_duration')).rjust(10))
+	return inference_profile_rows
@@ -0,0 +1,153 @@
+import os
+import threading
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy
+from onnxruntime import InferenceSession
+from onnxruntime.quantization import QuantType, quantize_dynamic
+
+from facefusion import logger, state_manager, wording
+from facefusion.filesystem import is_file, is_image, is_video, remove_file
+from facefusion.typing import InferenceInputs, QuantizationMetric, VisionFrame
+from facefusion.vision import count_video_frame_total, read_static_image, sample_video_frames
+
+QUANTIZATION_OP_TYPES = [ 'MatMul', 'Attention', 'Gather' ]
+QUANTIZATION_METRICS : Dict[str, QuantizationMetric] =\
+{
+	'arcface': 'similarity',
+	'2dfan4': 'landmark'
+}
+QUANTIZATION_ERROR_LIMIT = 0.05
+QUANTIZATION_SIMILARITY_LIMIT = 0.99
+QUANTIZATION_LANDMARK_LIMIT = 0.5
+QUANTIZATION_SAMPLE_TOTAL = 4
+
+
+def conditional_quantize_model(model_path : str, quantized_model_path : str) -> bool:
+	model_name, _ = os.path.splitext(os.path.basename(model_path))
+	rejected_model_path = quantized_model_path + '.rejected'
+
+	if is_file(quantized_model_path):
+		return True
+	if is_file(rejected_model_path):
+		return False
+	sample_vision_frames = collect_sample_vision_frames()
+
+	if not sample_vision_frames:
+		logger.debug(wording.get('quantizing_model_skipped').format(model_name = model_name), __name__)
+		return False
+	temp_model_path = quantized_model_path + '.' + str(os.getpid()) + '.' + str(threading.get_ident()) + '.tmp'
+
+	if quantize_model(model_path, temp_model_path) and validate_quantized_model(model_path, temp_model_path, sample_vision_frames):
+		os.replace(temp_model_path, quantized_model_path)
+		logger.debug(wording.get('quantizing_model_succeed').format(model_name = model_name), __name__)
+		return True
+	remove_file(temp_model_path)
+	open(rejected_model_path, 'w').close()
+	logger.debug(wording.get('quantizing_model_rejected').format(model_name = model_name), __name__)
+	return False
+
+
+def quantize_model(model_path : str, quantized_model_path : str) -> bool:
+	try:
+		quantize_dynamic(model_path, quantized_model_path, op_types_to_quantize = QUANTIZATION_OP_TYPES, weight_type = QuantType.QUInt8)
+	except Exception:
+		return False
+	return is_file(quantized_model_path)
+
+
+def collect_sample_vision_frames() -> List[VisionFrame]:
+	target_path = state_manager.get_item('target_path')
+
+	if is_image(target_path):
+		return [ read_static_image(target_path) ]
+	if is_video(target_path):
+		video_frame_total = count_video_frame_total(target_path)
+		frame_step = max(video_frame_total // QUANTIZATION_SAMPLE_TOTAL, 1)
+		return [ vision_frame for _, vision_frame in sample_video_frames(target_path, 0, video_frame_total, frame_step) ][:QUANTIZATION_SAMPLE_TOTAL]
+	return []
+
+
+def validate_quantized_model(model_path : str, quantized_model_path : str, sample_vision_frames : List[VisionFrame]) -> bool:
+	model_name, _ = os.path.splitext(os.path.basename(model_path))
+	quantization_metric = resolve_quantization_metric(model_name)
+	inference_session = InferenceSession(model_path, providers = [ 'CPUExecutionProvider' ])
+	quantized_inference_session = InferenceSession(quantized_model_path, providers = [ 'CPUExecutionProvider' ])
+	inference_duration = 0.0
+	quantized_inference_duration = 0.0
+
+	for sample_vision_frame in sample_vision_frames:
+		inference_inputs = create_sample_inputs(inference_session, sample_vision_frame)
+		if not inference_inputs:
+			return False
+		outputs, duration = measure_inference(inference_session, inference_inputs)
+		quantized_outputs, quantized_duration = measure_inference(quantized_inference_session, inference_inputs)
+		inference_duration += duration
+		quantized_inference_duration += quantized_duration
+		if not validate_outputs(outputs, quantized_outputs, quantization_metric):
+			return False
+	return quantized_inference_duration < inference_duration
+
+
+def validate_outputs(outputs : List[numpy.ndarray], quantized_outputs : List[numpy.ndarray], quantization_metric : QuantizationMetric) -> bool:
+	if quantization_metric == 'similarity':
+		return min(calc_output_similarities(outputs, quantized_outputs)) >= QUANTIZATION_SIMILARITY_LIMIT
+	if quantization_metric == 'landmark':
+		return calc_landmark_error(outputs[0], quantized_outputs[0]) <= QUANTIZATION_LANDMARK_LIMIT
+	return max(calc_output_errors(outputs, quantized_outputs)) <= QUANTIZATION_ERROR_LIMIT
+
+
+def resolve_quantization_metric(model_name : str) -> QuantizationMetric:
+	for model_prefix, quantization_metric in QUANTIZATION_METRICS.items():
+		if model_name.startswith(model_prefix):
+			return quantization_metric
+	return 'error'
+
+
+def measure_inference(inference_session : InferenceSession, inference_inputs : InferenceInputs) -> Tuple[List[numpy.ndarray], float]:
+	inference_session.run(None, inference_inputs)
+	start_time = perf_counter()
+	outputs = inference_session.run(None, inference_inputs)
+	return outputs, perf_counter() - start_time
+
+
+def create_sample_inputs(inference_session : InferenceSession, sample_vision_frame : VisionFrame) -> InferenceInputs:
+	inference_inputs = {}
+
+	for session_input in inference_session.get_inputs():
+		input_shape = [ 1 if index == 0 and not isinstance(input_dimension, int) else input_dimension for index, input_dimension in enumerate(session_input.shape) ]
+		if session_input.type != 'tensor(float)' or len(input_shape) != 4 or not all(isinstance(input_dimension, int) for input_dimension in input_shape):
+			return {}
+		if input_shape[1] == 3:
+			input_vision_frame = cv2.resize(sample_vision_frame, (input_shape[3], input_shape[2])).transpose(2, 0, 1)
+		elif input_shape[3] == 3:
+			input_vision_frame = cv2.resize(sample_vision_frame, (input_shape[2], input_shape[1]))
+		else:
+			return {}
+		input_vision_frame = input_vision_frame[::-1] if input_shape[1] == 3 else input_vision_frame[:, :, ::-1]
+		inference_inputs[session_input.name] = numpy.repeat(numpy.expand_dims(input_vision_frame, axis = 0), input_shape[0], axis = 0).astype(numpy.float32) / 127.5 - 1
+	return inference_inputs
+
+
+def calc_output_errors(outputs : List[numpy.ndarray], quantized_outputs : List[numpy.ndarray]) -> List[float]:
+	output_errors = []
+
+	for output, quantized_output in zip(outputs, quantized_outputs):
+		output_norm = max(float(numpy.linalg.norm(output)), 1e-6)
+		output_errors.append(float(numpy.linalg.norm(output - quantized_output)) / output_norm)
+	return output_errors
+
+
+def calc_output_similarities(outputs : List[numpy.ndarray], quantized_outputs : List[numpy.ndarray]) -> List[float]:
+	output_similarities = []
+
+	for output, quantized_output in zip(outputs, quantized_outputs):
+		output_norm = max(float(numpy.linalg.norm(output) * numpy.linalg.norm(quantized_output)), 1e-6)
+		output_similarities.append(float(numpy.dot(output.ravel(), quantized_output.ravel())) / output_norm)
+	return output_similarities
+
+
+def calc_landmark_error(output : numpy.ndarray, quantized_output : numpy.ndarray) -> float:
+	return float(numpy.mean(numpy.linalg.norm(output[..., :2] - quantized_output[..., :2], axis = -1)))
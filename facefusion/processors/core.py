@@ -1,16 +1,30 @@
 import importlib
+import itertools
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from queue import Queue
 from types import ModuleType
-from typing import Any, List
+from typing import Any, Deque, Iterable, Iterator, List, Optional, Tuple
 
+import numpy
 from tqdm import tqdm
 
-from facefusion import logger, state_manager, wording
+from facefusion import logger, process_manager, state_manager, wording
+from facefusion.audio import create_empty_audio_frame, get_voice_frame, read_static_voice
+from facefusion.common_helper import get_first
 from facefusion.exit_helper import hard_exit
-from facefusion.typing import ProcessFrames, QueuePayload
-
+from facefusion.face_analyser import carry_static_faces, detect_many_faces, get_average_face, get_source_face_analyses
+from facefusion.face_selector import sort_faces_by_order
+from facefusion.face_store import create_frame_number_key, get_reference_faces, set_frame_key
+from facefusion.face_tracker import create_face_tracker, track_faces, track_many_faces
+from facefusion.filesystem import filter_audio_paths
+from facefusion.processors.process_pool import multi_process_frames_in_pool
+from facefusion.temp_helper import get_temp_frame_format
+from facefusion.typing import AudioFrame, Face, FaceSet, Fps, ProcessFrames, QueuePayload, UpdateProgress, VisionFrame
+from facefusion.vision import read_frame_store_frame, read_image, read_static_images, restrict_video_fps, write_frame_store_frame, write_image
+
+FACE_ALTERING_PROCESSORS = [ 'age_modifier', 'expression_restorer', 'face_editor', 'lip_syncer' ]
 PROCESSORS_METHODS =\
 [
 	'get_inference_pool',
@@ -57,6 +71,11 @@ def multi_process_frames(source_paths : List[str], temp_frame_paths : List[str],
 	queue_payloads = create_queue_payloads(temp_frame_paths)
 	with tqdm(total = len(queue_payloads), desc = wording.get('processing'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
 		progress.set_postfix(execution_providers = state_manager.get_item('execution_providers'))
+		if state_manager.get_item('execution_backend') == 'process':
+			if get_temp_frame_format() == 'raw':
+				multi_process_frames_in_pool(source_paths, queue_payloads, process_frames, progress.update)
+				return
+			logger.warn(wording.get('execution_backend_fallback'), __name__)
 		with ThreadPoolExecutor(max_workers = state_manager.get_item('execution_thread_count')) as executor:
 			futures = []
 			queue : Queue[QueuePayload] = create_queue(queue_payloads)
@@ -70,6 +89,95 @@ def multi_process_frames(source_paths : List[str], temp_frame_paths : List[str],
 				future_done.result()
 
 
+def multi_process_chain_frames(source_paths : List[str], temp_frame_paths : List[str]) -> None:
+	source_audio_path = get_first(filter_audio_paths(source_paths))
+	temp_video_fps = restrict_video_fps(state_manager.get_item('target_path'), state_manager.get_item('output_video_fps'))
+
+	if source_audio_path:
+		read_static_voice(source_audio_path, temp_video_fps)
+	multi_process_frames(source_paths, temp_frame_paths, process_chain_frames)
+
+
+def process_chain_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
+	processor_modules = get_processors_modules(state_manager.get_item('processors'))
+	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
+	source_face = collect_source_face(source_paths)
+	source_audio_path = get_first(filter_audio_paths(source_paths))
+	temp_video_fps = restrict_video_fps(state_manager.get_item('target_path'), state_manager.get_item('output_video_fps'))
+
+	for queue_payload, target_vision_frame in read_chain_temp_frames(process_manager.manage(queue_payloads)):
+		frame_number = queue_payload.get('frame_number')
+		source_audio_frame = get_voice_frame(source_audio_path, temp_video_fps, frame_number) if source_audio_path else None
+		output_vision_frame = process_chain_frame(processor_modules, reference_faces, source_face, source_audio_frame, target_vision_frame)
+		write_temp_frame(queue_payload, output_vision_frame)
+		update_progress(1)
+
+
+def multi_process_stream(source_paths : List[str], target_vision_frames : Iterator[VisionFrame], frame_start : int, temp_video_fps : Fps, thread_count : int, update_progress : UpdateProgress) -> Iterator[VisionFrame]:
+	processor_modules = get_processors_modules(state_manager.get_item('processors'))
+	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
+	source_face = collect_source_face(source_paths)
+	source_audio_path = get_first(filter_audio_paths(source_paths))
+	buffer_limit = thread_count * state_manager.get_item('execution_queue_count')
+	face_tracker = create_face_tracker() if state_manager.get_item('face_tracker') and has_face_processors(state_manager.get_item('processors')) else None
+
+	if source_audio_path:
+		read_static_voice(source_audio_path, temp_video_fps)
+	with ThreadPoolExecutor(max_workers = thread_count) as executor:
+		futures : Deque[Future[VisionFrame]] = deque()
+
+		for frame_number, target_vision_frame in enumerate(target_vision_frames, frame_start):
+			source_audio_frame = get_voice_frame(source_audio_path, temp_video_fps, frame_number) if source_audio_path else None
+			set_frame_key(target_vision_frame, create_frame_number_key(target_vision_frame, frame_number, temp_video_fps))
+			if face_tracker:
+				track_faces(face_tracker, target_vision_frame)
+			future = executor.submit(process_chain_frame, processor_modules, reference_faces, source_face, source_audio_frame, target_vision_frame)
+			futures.append(future)
+
+			while futures and (len(futures) >= buffer_limit or futures[0].done()):
+				yield futures.popleft().result()
+				update_progress(1)
+
+		while futures and process_manager.is_processing():
+			yield futures.popleft().result()
+			update_progress(1)
+
+
+def process_chain_frame(processor_modules : List[ModuleType], reference_faces : FaceSet, source_face : Face, source_audio_frame : Optional[AudioFrame], target_vision_frame : VisionFrame) -> VisionFrame:
+	source_vision_frame = target_vision_frame.copy()
+	if not numpy.any(source_audio_frame):
+		source_audio_frame = create_empty_audio_frame()
+
+	for processor_module in processor_modules:
+		output_vision_frame = processor_module.process_frame(
+		{
+			'reference_faces': reference_faces,
+			'source_face': source_face,
+			'source_audio_frame': source_audio_frame,
+			'source_vision_frame': source_vision_frame,
+			'target_vision_frame': target_vision_frame
+		})
+		if not is_face_altering_processor(processor_module):
+			carry_static_faces(target_vision_frame, output_vision_frame)
+		target_vision_frame = output_vision_frame
+	return target_vision_frame
+
+
+def is_face_altering_processor(processor_module : ModuleType) -> bool:
+	return processor_module.__name__.split('.')[-1] in FACE_ALTERING_PROCESSORS
+
+
+def collect_source_face(source_paths : List[str]) -> Optional[Face]:
+	source_frames = read_static_images(source_paths)
+	source_faces = []
+
+	for temp_faces in detect_many_faces(source_frames, get_source_face_analyses()):
+		temp_faces = sort_faces_by_order(temp_faces, 'large-small')
+		if temp_faces:
+			source_faces.append(get_first(temp_faces))
+	return get_average_face(source_faces)
+
+
 def create_queue(queue_payloads : List[QueuePayload]) -> Queue[QueuePayload]:
 	queue : Queue[QueuePayload] = Queue()
 	for queue_payload in queue_payloads:
@@ -85,6 +193,44 @@ def pick_queue(queue : Queue[QueuePayload], queue_per_future : int) -> List[Queu
 	return queues
 
 
+def read_temp_frame(queue_payload : QueuePayload) -> Optional[VisionFrame]:
+	if get_temp_frame_format() == 'raw':
+		return read_frame_store_frame(queue_payload.get('frame_path'), queue_payload.get('frame_number'))
+	return read_image(queue_payload.get('frame_path'))
+
+
+def read_temp_frames(queue_payloads : Iterable[QueuePayload]) -> Iterator[Tuple[QueuePayload, VisionFrame]]:
+	detect_batch_size = max(state_manager.get_item('execution_batch_size') or 1, 1)
+	queue_payloads = iter(queue_payloads)
+	face_tracker = create_face_tracker() if state_manager.get_item('face_tracker') else None
+	window_payloads = list(itertools.islice(queue_payloads, detect_batch_size))
+
+	while window_payloads:
+		temp_vision_frames = [ read_temp_frame(queue_payload) for queue_payload in window_payloads ]
+		if face_tracker:
+			track_many_faces(face_tracker, temp_vision_frames)
+		else:
+			detect_many_faces(temp_vision_frames)
+		yield from zip(window_payloads, temp_vision_frames)
+		window_payloads = list(itertools.islice(queue_payloads, detect_batch_size))
+
+
+def read_chain_temp_frames(queue_payloads : Iterable[QueuePayload]) -> Iterator[Tuple[QueuePayload, VisionFrame]]:
+	if has_face_processors(state_manager.get_item('processors')):
+		return read_temp_frames(queue_payloads)
+	return ((queue_payload, read_temp_frame(queue_payload)) for queue_payload in queue_payloads)
+
+
+def has_face_processors(processors : List[str]) -> bool:
+	return any(not processor.startswith('frame_') for processor in processors)
+
+
+def write_temp_frame(queue_payload : QueuePayload, vision_frame : VisionFrame) -> bool:
+	if get_temp_frame_format() == 'raw':
+		return write_frame_store_frame(queue_payload.get('frame_path'), queue_payload.get('frame_number'), vision_frame)
+	return write_image(queue_payload.get('frame_path'), vision_frame)
+
+
 def create_queue_payloads(temp_frame_paths : List[str]) -> List[QueuePayload]:
 	queue_payloads = []
 	temp_frame_paths = sorted(temp_frame_paths, key = os.path.basename)
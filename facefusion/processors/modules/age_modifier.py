@@ -22,9 +22,9 @@ from facefusion.filesystem import in_directory, is_image, is_video, resolve_rela
 from facefusion.processors import choices as processors_choices
 from facefusion.processors.typing import AgeModifierDirection, AgeModifierInputs
 from facefusion.program_helper import find_argument_group
-from facefusion.thread_helper import thread_semaphore
+from facefusion.thread_helper import inference_semaphore
 from facefusion.typing import ApplyStateItem, Args, DownloadScope, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from facefusion.vision import match_frame_color, read_image, read_static_image, write_image
+from facefusion.vision import match_frame_color, read_static_image, write_image
 
 
 @lru_cache(maxsize = None)
@@ -168,7 +168,7 @@ def forward(crop_vision_frame : VisionFrame, extend_vision_frame : VisionFrame,
 		if age_modifier_input.name == 'direction':
 			age_modifier_inputs[age_modifier_input.name] = age_modifier_direction
 
-	with thread_semaphore():
+	with inference_semaphore(age_modifier):
 		crop_vision_frame = age_modifier.run(None, age_modifier_inputs)[0][0]
 
 	return crop_vision_frame
@@ -193,7 +193,7 @@ def normalize_extend_frame(extend_vision_frame : VisionFrame) -> VisionFrame:
 
 
 def get_reference_frame(source_face : Face, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
-	return modify_age(target_face, temp_vision_frame)
+	return modify_age(target_face, temp_vision_frame.copy())
 
 
 def process_frame(inputs : AgeModifierInputs) -> VisionFrame:
@@ -201,6 +201,9 @@ def process_frame(inputs : AgeModifierInputs) -> VisionFrame:
 	target_vision_frame = inputs.get('target_vision_frame')
 	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ]))
 
+	if many_faces:
+		target_vision_frame = target_vision_frame.copy()
+
 	if state_manager.get_item('face_selector_mode') == 'many':
 		if many_faces:
 			for target_face in many_faces:
@@ -220,15 +223,13 @@ def process_frame(inputs : AgeModifierInputs) -> VisionFrame:
 def process_frames(source_path : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 
-	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
+	for queue_payload, target_vision_frame in processors.read_temp_frames(process_manager.manage(queue_payloads)):
 		output_vision_frame = process_frame(
 		{
 			'reference_faces': reference_faces,
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		processors.write_temp_frame(queue_payload, output_vision_frame)
 		update_progress(1)
 
 
@@ -22,9 +22,9 @@ from facefusion.processors.live_portrait import create_rotation, limit_expressio
 from facefusion.processors.typing import ExpressionRestorerInputs
 from facefusion.processors.typing import LivePortraitExpression, LivePortraitFeatureVolume, LivePortraitMotionPoints, LivePortraitPitch, LivePortraitRoll, LivePortraitScale, LivePortraitTranslation, LivePortraitYaw
 from facefusion.program_helper import find_argument_group
-from facefusion.thread_helper import conditional_thread_semaphore, thread_semaphore
+from facefusion.thread_helper import inference_semaphore
 from facefusion.typing import ApplyStateItem, Args, DownloadScope, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from facefusion.vision import get_video_frame, read_image, read_static_image, write_image
+from facefusion.vision import get_video_frame, read_static_image, write_image
 
 
 @lru_cache(maxsize = None)
@@ -178,7 +178,7 @@ def apply_restore(source_crop_vision_frame : VisionFrame, target_crop_vision_fra
 def forward_extract_feature(crop_vision_frame : VisionFrame) -> LivePortraitFeatureVolume:
 	feature_extractor = get_inference_pool().get('feature_extractor')
 
-	with conditional_thread_semaphore():
+	with inference_semaphore(feature_extractor):
 		feature_volume = feature_extractor.run(None,
 		{
 			'input': crop_vision_frame
@@ -190,7 +190,7 @@ def forward_extract_feature(crop_vision_frame : VisionFrame) -> LivePortraitFeat
 def forward_extract_motion(crop_vision_frame : VisionFrame) -> Tuple[LivePortraitPitch, LivePortraitYaw, LivePortraitRoll, LivePortraitScale, LivePortraitTranslation, LivePortraitExpression, LivePortraitMotionPoints]:
 	motion_extractor = get_inference_pool().get('motion_extractor')
 
-	with conditional_thread_semaphore():
+	with inference_semaphore(motion_extractor):
 		pitch, yaw, roll, scale, translation, expression, motion_points = motion_extractor.run(None,
 		{
 			'input': crop_vision_frame
@@ -202,7 +202,7 @@ def forward_extract_motion(crop_vision_frame : VisionFrame) -> Tuple[LivePortrai
 def forward_generate_frame(feature_volume : LivePortraitFeatureVolume, source_motion_points : LivePortraitMotionPoints, target_motion_points : LivePortraitMotionPoints) -> VisionFrame:
 	generator = get_inference_pool().get('generator')
 
-	with thread_semaphore():
+	with inference_semaphore(generator):
 		crop_vision_frame = generator.run(None,
 		{
 			'feature_volume': feature_volume,
@@ -239,6 +239,9 @@ def process_frame(inputs : ExpressionRestorerInputs) -> VisionFrame:
 	target_vision_frame = inputs.get('target_vision_frame')
 	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ]))
 
+	if many_faces:
+		target_vision_frame = target_vision_frame.copy()
+
 	if state_manager.get_item('face_selector_mode') == 'many':
 		if many_faces:
 			for target_face in many_faces:
@@ -258,20 +261,18 @@ def process_frame(inputs : ExpressionRestorerInputs) -> VisionFrame:
 def process_frames(source_path : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 
-	for queue_payload in process_manager.manage(queue_payloads):
+	for queue_payload, target_vision_frame in processors.read_temp_frames(process_manager.manage(queue_payloads)):
 		frame_number = queue_payload.get('frame_number')
 		if state_manager.get_item('trim_frame_start'):
 			frame_number += state_manager.get_item('trim_frame_start')
 		source_vision_frame = get_video_frame(state_manager.get_item('target_path'), frame_number)
-		target_vision_path = queue_payload.get('frame_path')
-		target_vision_frame = read_image(target_vision_path)
 		output_vision_frame = process_frame(
 		{
 			'reference_faces': reference_faces,
 			'source_vision_frame': source_vision_frame,
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		processors.write_temp_frame(queue_payload, output_vision_frame)
 		update_progress(1)
 
 
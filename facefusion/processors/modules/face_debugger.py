@@ -18,7 +18,7 @@ from facefusion.processors import choices as processors_choices
 from facefusion.processors.typing import FaceDebuggerInputs
 from facefusion.program_helper import find_argument_group
 from facefusion.typing import ApplyStateItem, Args, Face, InferencePool, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from facefusion.vision import read_image, read_static_image, write_image
+from facefusion.vision import read_static_image, write_image
 
 
 def get_inference_pool() -> InferencePool:
@@ -71,7 +71,6 @@ def debug_face(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFra
 	secondary_color = (0, 255, 0)
 	tertiary_color = (255, 255, 0)
 	bounding_box = target_face.bounding_box.astype(numpy.int32)
-	temp_vision_frame = temp_vision_frame.copy()
 	has_face_landmark_5_fallback = numpy.array_equal(target_face.landmark_set.get('5'), target_face.landmark_set.get('5/68'))
 	has_face_landmark_68_fallback = numpy.array_equal(target_face.landmark_set.get('68'), target_face.landmark_set.get('68/5'))
 	face_debugger_items = state_manager.get_item('face_debugger_items')
@@ -176,6 +175,9 @@ def process_frame(inputs : FaceDebuggerInputs) -> VisionFrame:
 	target_vision_frame = inputs.get('target_vision_frame')
 	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ]))
 
+	if many_faces:
+		target_vision_frame = target_vision_frame.copy()
+
 	if state_manager.get_item('face_selector_mode') == 'many':
 		if many_faces:
 			for target_face in many_faces:
@@ -195,15 +197,13 @@ def process_frame(inputs : FaceDebuggerInputs) -> VisionFrame:
 def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 
-	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
+	for queue_payload, target_vision_frame in processors.read_temp_frames(process_manager.manage(queue_payloads)):
 		output_vision_frame = process_frame(
 		{
 			'reference_faces': reference_faces,
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		processors.write_temp_frame(queue_payload, output_vision_frame)
 		update_progress(1)
 
 
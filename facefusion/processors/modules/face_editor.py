@@ -21,9 +21,9 @@ from facefusion.processors import choices as processors_choices
 from facefusion.processors.live_portrait import create_rotation, limit_euler_angles, limit_expression
 from facefusion.processors.typing import FaceEditorInputs, LivePortraitExpression, LivePortraitFeatureVolume, LivePortraitMotionPoints, LivePortraitPitch, LivePortraitRoll, LivePortraitRotation, LivePortraitScale, LivePortraitTranslation, LivePortraitYaw
 from facefusion.program_helper import find_argument_group
-from facefusion.thread_helper import conditional_thread_semaphore, thread_semaphore
+from facefusion.thread_helper import inference_semaphore
 from facefusion.typing import ApplyStateItem, Args, DownloadScope, Face, FaceLandmark68, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from facefusion.vision import read_image, read_static_image, write_image
+from facefusion.vision import read_static_image, write_image
 
 
 @lru_cache(maxsize = None)
@@ -228,7 +228,7 @@ def apply_edit(crop_vision_frame : VisionFrame, face_landmark_68 : FaceLandmark6
 def forward_extract_feature(crop_vision_frame : VisionFrame) -> LivePortraitFeatureVolume:
 	feature_extractor = get_inference_pool().get('feature_extractor')
 
-	with conditional_thread_semaphore():
+	with inference_semaphore(feature_extractor):
 		feature_volume = feature_extractor.run(None,
 		{
 			'input': crop_vision_frame
@@ -240,7 +240,7 @@ def forward_extract_feature(crop_vision_frame : VisionFrame) -> LivePortraitFeat
 def forward_extract_motion(crop_vision_frame : VisionFrame) -> Tuple[LivePortraitPitch, LivePortraitYaw, LivePortraitRoll, LivePortraitScale, LivePortraitTranslation, LivePortraitExpression, LivePortraitMotionPoints]:
 	motion_extractor = get_inference_pool().get('motion_extractor')
 
-	with conditional_thread_semaphore():
+	with inference_semaphore(motion_extractor):
 		pitch, yaw, roll, scale, translation, expression, motion_points = motion_extractor.run(None,
 		{
 			'input': crop_vision_frame
@@ -252,7 +252,7 @@ def forward_extract_motion(crop_vision_frame : VisionFrame) -> Tuple[LivePortrai
 def forward_retarget_eye(eye_motion_points : LivePortraitMotionPoints) -> LivePortraitMotionPoints:
 	eye_retargeter = get_inference_pool().get('eye_retargeter')
 
-	with conditional_thread_semaphore():
+	with inference_semaphore(eye_retargeter):
 		eye_motion_points = eye_retargeter.run(None,
 		{
 			'input': eye_motion_points
@@ -264,7 +264,7 @@ def forward_retarget_eye(eye_motion_points : LivePortraitMotionPoints) -> LivePo
 def forward_retarget_lip(lip_motion_points : LivePortraitMotionPoints) -> LivePortraitMotionPoints:
 	lip_retargeter = get_inference_pool().get('lip_retargeter')
 
-	with conditional_thread_semaphore():
+	with inference_semaphore(lip_retargeter):
 		lip_motion_points = lip_retargeter.run(None,
 		{
 			'input': lip_motion_points
@@ -276,7 +276,7 @@ def forward_retarget_lip(lip_motion_points : LivePortraitMotionPoints) -> LivePo
 def forward_stitch_motion_points(source_motion_points : LivePortraitMotionPoints, target_motion_points : LivePortraitMotionPoints) -> LivePortraitMotionPoints:
 	stitcher = get_inference_pool().get('stitcher')
 
-	with thread_semaphore():
+	with inference_semaphore(stitcher):
 		motion_points = stitcher.run(None,
 		{
 			'source': source_motion_points,
@@ -289,7 +289,7 @@ def forward_stitch_motion_points(source_motion_points : LivePortraitMotionPoints
 def forward_generate_frame(feature_volume : LivePortraitFeatureVolume, source_motion_points : LivePortraitMotionPoints, target_motion_points : LivePortraitMotionPoints) -> VisionFrame:
 	generator = get_inference_pool().get('generator')
 
-	with thread_semaphore():
+	with inference_semaphore(generator):
 		crop_vision_frame = generator.run(None,
 		{
 			'feature_volume': feature_volume,
@@ -480,6 +480,9 @@ def process_frame(inputs : FaceEditorInputs) -> VisionFrame:
 	target_vision_frame = inputs.get('target_vision_frame')
 	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ]))
 
+	if many_faces:
+		target_vision_frame = target_vision_frame.copy()
+
 	if state_manager.get_item('face_selector_mode') == 'many':
 		if many_faces:
 			for target_face in many_faces:
@@ -499,15 +502,13 @@ def process_frame(inputs : FaceEditorInputs) -> VisionFrame:
 def process_frames(source_path : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 
-	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
+	for queue_payload, target_vision_frame in processors.read_temp_frames(process_manager.manage(queue_payloads)):
 		output_vision_frame = process_frame(
 		{
 			'reference_faces': reference_faces,
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		processors.write_temp_frame(queue_payload, output_vision_frame)
 		update_progress(1)
 
 
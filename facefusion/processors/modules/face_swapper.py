@@ -12,20 +12,22 @@ from facefusion import config, content_analyser, face_classifier, face_detector,
 from facefusion.common_helper import get_first
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.execution import has_execution_provider
-from facefusion.face_analyser import get_average_face, get_many_faces, get_one_face
+from facefusion.face_analyser import detect_many_faces, get_average_face, get_many_faces, get_one_face, get_source_face_analyses
 from facefusion.face_helper import paste_back, warp_face_by_face_landmark_5
 from facefusion.face_masker import create_occlusion_mask, create_region_mask, create_static_box_mask
 from facefusion.face_selector import find_similar_faces, sort_and_filter_faces, sort_faces_by_order
 from facefusion.face_store import get_reference_faces
 from facefusion.filesystem import filter_image_paths, has_image, in_directory, is_image, is_video, resolve_relative_path, same_file_extension
+from facefusion.inference_batcher import run_inference_batch
+from facefusion.inference_binder import get_input_buffer
 from facefusion.model_helper import get_static_model_initializer
 from facefusion.processors import choices as processors_choices
 from facefusion.processors.pixel_boost import explode_pixel_boost, implode_pixel_boost
 from facefusion.processors.typing import FaceSwapperInputs
 from facefusion.program_helper import find_argument_group
-from facefusion.thread_helper import conditional_thread_semaphore
+from facefusion.thread_helper import inference_semaphore
 from facefusion.typing import ApplyStateItem, Args, DownloadScope, Embedding, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from facefusion.vision import read_image, read_static_image, read_static_images, unpack_resolution, write_image
+from facefusion.vision import read_static_image, read_static_images, unpack_resolution, write_image
 
 
 @lru_cache(maxsize = None)
@@ -425,9 +427,10 @@ def swap_face(source_face : Face, target_face : Face, temp_vision_frame : Vision
 		crop_masks.append(occlusion_mask)
 
 	pixel_boost_vision_frames = implode_pixel_boost(crop_vision_frame, pixel_boost_total, model_size)
-	for pixel_boost_vision_frame in pixel_boost_vision_frames:
-		pixel_boost_vision_frame = prepare_crop_frame(pixel_boost_vision_frame)
-		pixel_boost_vision_frame = forward_swap_face(source_face, pixel_boost_vision_frame)
+	prepare_vision_frames = get_input_buffer(get_inference_pool().get('face_swapper'), 'target', (len(pixel_boost_vision_frames), 3) + pixel_boost_vision_frames.shape[1:3])
+	for pixel_boost_vision_frame, prepare_vision_frame in zip(pixel_boost_vision_frames, prepare_vision_frames):
+		prepare_crop_frame(pixel_boost_vision_frame, prepare_vision_frame)
+	for pixel_boost_vision_frame in forward_swap_face(source_face, prepare_vision_frames):
 		pixel_boost_vision_frame = normalize_crop_frame(pixel_boost_vision_frame)
 		temp_vision_frames.append(pixel_boost_vision_frame)
 	crop_vision_frame = explode_pixel_boost(temp_vision_frames, pixel_boost_total, model_size, pixel_boost_size)
@@ -441,9 +444,10 @@ def swap_face(source_face : Face, target_face : Face, temp_vision_frame : Vision
 	return temp_vision_frame
 
 
-def forward_swap_face(source_face : Face, crop_vision_frame : VisionFrame) -> VisionFrame:
+def forward_swap_face(source_face : Face, crop_vision_frames : VisionFrame) -> VisionFrame:
 	face_swapper = get_inference_pool().get('face_swapper')
 	model_type = get_model_options().get('type')
+	batch_size = crop_vision_frames.shape[0]
 	face_swapper_inputs = {}
 
 	if has_execution_provider('coreml') and model_type in [ 'ghost', 'uniface' ]:
@@ -452,22 +456,20 @@ def forward_swap_face(source_face : Face, crop_vision_frame : VisionFrame) -> Vi
 	for face_swapper_input in face_swapper.get_inputs():
 		if face_swapper_input.name == 'source':
 			if model_type in [ 'blendswap', 'uniface' ]:
-				face_swapper_inputs[face_swapper_input.name] = prepare_source_frame(source_face)
+				face_swapper_inputs[face_swapper_input.name] = numpy.repeat(prepare_source_frame(source_face), batch_size, axis = 0)
 			else:
-				face_swapper_inputs[face_swapper_input.name] = prepare_source_embedding(source_face)
+				face_swapper_inputs[face_swapper_input.name] = numpy.repeat(prepare_source_embedding(source_face), batch_size, axis = 0)
 		if face_swapper_input.name == 'target':
-			face_swapper_inputs[face_swapper_input.name] = crop_vision_frame
+			face_swapper_inputs[face_swapper_input.name] = crop_vision_frames
 
-	with conditional_thread_semaphore():
-		crop_vision_frame = face_swapper.run(None, face_swapper_inputs)[0][0]
-
-	return crop_vision_frame
+	crop_vision_frames = run_inference_batch(face_swapper, face_swapper_inputs)
+	return crop_vision_frames
 
 
 def forward_convert_embedding(embedding : Embedding) -> Embedding:
 	embedding_converter = get_inference_pool().get('embedding_converter')
 
-	with conditional_thread_semaphore():
+	with inference_semaphore(embedding_converter):
 		embedding = embedding_converter.run(None,
 		{
 			'input': embedding
@@ -515,15 +517,15 @@ def convert_embedding(source_face : Face) -> Tuple[Embedding, Embedding]:
 	return embedding, normed_embedding
 
 
-def prepare_crop_frame(crop_vision_frame : VisionFrame) -> VisionFrame:
-	model_mean = get_model_options().get('mean')
-	model_standard_deviation = get_model_options().get('standard_deviation')
+def prepare_crop_frame(crop_vision_frame : VisionFrame, prepare_vision_frame : VisionFrame) -> VisionFrame:
+	model_mean = numpy.reshape(get_model_options().get('mean'), (-1, 1, 1))
+	model_standard_deviation = numpy.reshape(get_model_options().get('standard_deviation'), (-1, 1, 1))
 
-	crop_vision_frame = crop_vision_frame[:, :, ::-1] / 255.0
-	crop_vision_frame = (crop_vision_frame - model_mean) / model_standard_deviation
-	crop_vision_frame = crop_vision_frame.transpose(2, 0, 1)
-	crop_vision_frame = numpy.expand_dims(crop_vision_frame, axis = 0).astype(numpy.float32)
-	return crop_vision_frame
+	prepare_vision_frame[:] = crop_vision_frame[:, :, ::-1].transpose(2, 0, 1)
+	prepare_vision_frame /= 255.0
+	prepare_vision_frame -= model_mean
+	prepare_vision_frame /= model_standard_deviation
+	return prepare_vision_frame
 
 
 def normalize_crop_frame(crop_vision_frame : VisionFrame) -> VisionFrame:
@@ -540,7 +542,7 @@ def normalize_crop_frame(crop_vision_frame : VisionFrame) -> VisionFrame:
 
 
 def get_reference_frame(source_face : Face, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
-	return swap_face(source_face, target_face, temp_vision_frame)
+	return swap_face(source_face, target_face, temp_vision_frame.copy())
 
 
 def process_frame(inputs : FaceSwapperInputs) -> VisionFrame:
@@ -549,6 +551,9 @@ def process_frame(inputs : FaceSwapperInputs) -> VisionFrame:
 	target_vision_frame = inputs.get('target_vision_frame')
 	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ]))
 
+	if many_faces:
+		target_vision_frame = target_vision_frame.copy()
+
 	if state_manager.get_item('face_selector_mode') == 'many':
 		if many_faces:
 			for target_face in many_faces:
@@ -570,23 +575,20 @@ def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload]
 	source_frames = read_static_images(source_paths)
 	source_faces = []
 
-	for source_frame in source_frames:
-		temp_faces = get_many_faces([ source_frame ])
+	for temp_faces in detect_many_faces(source_frames, get_source_face_analyses()):
 		temp_faces = sort_faces_by_order(temp_faces, 'large-small')
 		if temp_faces:
 			source_faces.append(get_first(temp_faces))
 	source_face = get_average_face(source_faces)
 
-	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
+	for queue_payload, target_vision_frame in processors.read_temp_frames(process_manager.manage(queue_payloads)):
 		output_vision_frame = process_frame(
 		{
 			'reference_faces': reference_faces,
 			'source_face': source_face,
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		processors.write_temp_frame(queue_payload, output_vision_frame)
 		update_progress(1)
 
 
@@ -595,8 +597,7 @@ def process_image(source_paths : List[str], target_path : str, output_path : str
 	source_frames = read_static_images(source_paths)
 	source_faces = []
 
-	for source_frame in source_frames:
-		temp_faces = get_many_faces([ source_frame ])
+	for temp_faces in detect_many_faces(source_frames, get_source_face_analyses()):
 		temp_faces = sort_faces_by_order(temp_faces, 'large-small')
 		if temp_faces:
 			source_faces.append(get_first(temp_faces))
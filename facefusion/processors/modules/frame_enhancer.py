@@ -16,9 +16,9 @@ from facefusion.filesystem import in_directory, is_image, is_video, resolve_rela
 from facefusion.processors import choices as processors_choices
 from facefusion.processors.typing import FrameEnhancerInputs
 from facefusion.program_helper import find_argument_group
-from facefusion.thread_helper import conditional_thread_semaphore
+from facefusion.thread_helper import inference_semaphore
 from facefusion.typing import ApplyStateItem, Args, DownloadScope, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from facefusion.vision import create_tile_frames, merge_tile_frames, read_image, read_static_image, write_image
+from facefusion.vision import create_tile_frames, merge_tile_frames, read_static_image, write_image
 
 
 @lru_cache(maxsize = None)
@@ -464,7 +464,7 @@ def enhance_frame(temp_vision_frame : VisionFrame) -> VisionFrame:
 def forward(tile_vision_frame : VisionFrame) -> VisionFrame:
 	frame_enhancer = get_inference_pool().get('frame_enhancer')
 
-	with conditional_thread_semaphore():
+	with inference_semaphore(frame_enhancer):
 		tile_vision_frame = frame_enhancer.run(None,
 		{
 			'input': tile_vision_frame
@@ -504,13 +504,12 @@ def process_frame(inputs : FrameEnhancerInputs) -> VisionFrame:
 
 def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
+		target_vision_frame = processors.read_temp_frame(queue_payload)
 		output_vision_frame = process_frame(
 		{
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		processors.write_temp_frame(queue_payload, output_vision_frame)
 		update_progress(1)
 
 
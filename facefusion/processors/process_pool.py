@@ -0,0 +1,79 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Set
+
+from facefusion import logger, process_manager, state_manager, wording
+from facefusion.face_store import append_reference_face, clear_reference_faces, get_reference_faces
+from facefusion.typing import FaceSet, ProcessFrames, QueuePayload, UpdateProgress
+
+WORKER_PROGRESS : Optional[Any] = None
+
+
+def multi_process_frames_in_pool(source_paths : List[str], queue_payloads : List[QueuePayload], process_frames : ProcessFrames, update_progress : UpdateProgress) -> None:
+	worker_count = get_process_worker_count()
+	queue_per_future = max(len(queue_payloads) // worker_count * state_manager.get_item('execution_queue_count'), 1)
+	process_context = multiprocessing.get_context('spawn')
+	worker_progress = process_context.Value('i', 0)
+	worker_stop = process_context.Event()
+	progress_total = 0
+
+	with ProcessPoolExecutor(max_workers = worker_count, mp_context = process_context, initializer = init_process_worker, initargs = (create_worker_state(worker_count), get_reference_faces(), worker_progress, worker_stop)) as executor:
+		futures : Set[Future[None]] = { executor.submit(process_frames, source_paths, queue_payloads[index:index + queue_per_future], update_worker_progress) for index in range(0, len(queue_payloads), queue_per_future) }
+
+		while futures:
+			futures_done, futures = wait(futures, timeout = 0.1, return_when = FIRST_COMPLETED)
+			update_progress(worker_progress.value - progress_total)
+			progress_total = worker_progress.value
+
+			for future_done in futures_done:
+				if not future_done.cancelled():
+					future_done.result()
+			if process_manager.is_stopping():
+				worker_stop.set()
+				for future in futures:
+					future.cancel()
+
+
+def get_process_worker_count() -> int:
+	execution_providers = state_manager.get_item('execution_providers')
+
+	if execution_providers != [ 'cpu' ]:
+		logger.warn(wording.get('execution_backend_providers').format(execution_providers = ', '.join(execution_providers)), __name__)
+	return max(min(state_manager.get_item('execution_thread_count'), os.cpu_count() or 1), 1)
+
+
+def create_worker_state(worker_count : int) -> Dict[str, Any]:
+	worker_state = dict(state_manager.get_state())
+
+	if not worker_state.get('execution_intra_op_thread_count'):
+		worker_state['execution_intra_op_thread_count'] = max((os.cpu_count() or 1) // worker_count, 1)
+	return worker_state
+
+
+def init_process_worker(state : Dict[str, Any], reference_faces : Optional[FaceSet], worker_progress : Any, worker_stop : Any) -> None:
+	global WORKER_PROGRESS
+
+	WORKER_PROGRESS = worker_progress
+	for key, value in state.items():
+		state_manager.init_item(key, value) #type:ignore[arg-type]
+	logger.init(state_manager.get_item('log_level'))
+	clear_reference_faces()
+
+	if reference_faces:
+		for reference_name, faces in reference_faces.items():
+			for face in faces:
+				append_reference_face(reference_name, face)
+	process_manager.start()
+	threading.Thread(target = watch_worker_stop, args = (worker_stop,), daemon = True).start()
+
+
+def watch_worker_stop(worker_stop : Any) -> None:
+	worker_stop.wait()
+	process_manager.stop()
+
+
+def update_worker_progress(count : int) -> None:
+	with WORKER_PROGRESS.get_lock():
+		WORKER_PROGRESS.value += count
@@ -113,6 +113,16 @@ def create_face_landmarker_program() -> ArgumentParser:
 	return program
 
 
+def create_face_tracker_program() -> ArgumentParser:
+	program = ArgumentParser(add_help = False)
+	group_face_tracker = program.add_argument_group('face tracker')
+	group_face_tracker.add_argument('--face-tracker', help = wording.get('help.face_tracker'), action = 'store_true', default = config.get_bool_value('face_tracker.face_tracker'))
+	group_face_tracker.add_argument('--face-tracker-interval', help = wording.get('help.face_tracker_interval'), type = int, default = config.get_int_value('face_tracker.face_tracker_interval', '10'), choices = facefusion.choices.face_tracker_interval_range, metavar = create_int_metavar(facefusion.choices.face_tracker_interval_range))
+	group_face_tracker.add_argument('--face-tracker-score', help = wording.get('help.face_tracker_score'), type = float, default = config.get_float_value('face_tracker.face_tracker_score', '0.5'), choices = facefusion.choices.face_tracker_score_range, metavar = create_float_metavar(facefusion.choices.face_tracker_score_range))
+	job_store.register_step_keys([ 'face_tracker', 'face_tracker_interval', 'face_tracker_score' ])
+	return program
+
+
 def create_face_selector_program() -> ArgumentParser:
 	program = ArgumentParser(add_help = False)
 	group_face_selector = program.add_argument_group('face selector')
@@ -149,7 +159,9 @@ def create_frame_extraction_program() -> ArgumentParser:
 	group_frame_extraction.add_argument('--trim-frame-end',	help = wording.get('help.trim_frame_end'), type = int, default = facefusion.config.get_int_value('frame_extraction.trim_frame_end'))
 	group_frame_extraction.add_argument('--temp-frame-format', help = wording.get('help.temp_frame_format'), default = config.get_str_value('frame_extraction.temp_frame_format', 'png'), choices = facefusion.choices.temp_frame_formats)
 	group_frame_extraction.add_argument('--keep-temp', help = wording.get('help.keep_temp'), action = 'store_true',	default = config.get_bool_value('frame_extraction.keep_temp'))
-	job_store.register_step_keys([ 'trim_frame_start', 'trim_frame_end', 'temp_frame_format', 'keep_temp' ])
+	group_frame_extraction.add_argument('--frame-pipeline', help = wording.get('help.frame_pipeline'), default = config.get_str_value('frame_extraction.frame_pipeline', 'temp'), choices = facefusion.choices.frame_pipelines)
+	group_frame_extraction.add_argument('--video-segment-count', help = wording.get('help.video_segment_count'), type = int, default = config.get_int_value('frame_extraction.video_segment_count', '1'), choices = facefusion.choices.video_segment_count_range, metavar = create_int_metavar(facefusion.choices.video_segment_count_range))
+	job_store.register_step_keys([ 'trim_frame_start', 'trim_frame_end', 'temp_frame_format', 'keep_temp', 'frame_pipeline', 'video_segment_count' ])
 	return program
 
 
@@ -198,7 +210,16 @@ def create_execution_program() -> ArgumentParser:
 	group_execution.add_argument('--execution-providers', help = wording.get('help.execution_providers').format(choices = ', '.join(available_execution_providers)), default = config.get_str_list('execution.execution_providers', 'cpu'), choices = available_execution_providers, nargs = '+', metavar = 'EXECUTION_PROVIDERS')
 	group_execution.add_argument('--execution-thread-count', help = wording.get('help.execution_thread_count'), type = int, default = config.get_int_value('execution.execution_thread_count', '4'), choices = facefusion.choices.execution_thread_count_range, metavar = create_int_metavar(facefusion.choices.execution_thread_count_range))
 	group_execution.add_argument('--execution-queue-count', help = wording.get('help.execution_queue_count'), type = int, default = config.get_int_value('execution.execution_queue_count', '1'), choices = facefusion.choices.execution_queue_count_range, metavar = create_int_metavar(facefusion.choices.execution_queue_count_range))
-	job_store.register_job_keys([ 'execution_device_id', 'execution_providers', 'execution_thread_count', 'execution_queue_count' ])
+	group_execution.add_argument('--execution-backend', help = wording.get('help.execution_backend'), default = config.get_str_value('execution.execution_backend', 'thread'), choices = facefusion.choices.execution_backends)
+	group_execution.add_argument('--execution-batch-size', help = wording.get('help.execution_batch_size'), type = int, default = config.get_int_value('execution.execution_batch_size', '1'), choices = facefusion.choices.execution_batch_size_range, metavar = create_int_metavar(facefusion.choices.execution_batch_size_range))
+	group_execution.add_argument('--execution-batch-wait', help = wording.get('help.execution_batch_wait'), type = int, default = config.get_int_value('execution.execution_batch_wait', '10'), choices = facefusion.choices.execution_batch_wait_range, metavar = create_int_metavar(facefusion.choices.execution_batch_wait_range))
+	group_execution.add_argument('--execution-session-count', help = wording.get('help.execution_session_count'), type = int, default = config.get_int_value('execution.execution_session_count', '1'), choices = facefusion.choices.execution_session_count_range, metavar = create_int_metavar(facefusion.choices.execution_session_count_range))
+	group_execution.add_argument('--execution-concurrency-limit', help = wording.get('help.execution_concurrency_limit'), type = int, default = config.get_int_value('execution.execution_concurrency_limit', '0'), choices = facefusion.choices.execution_concurrency_limit_range, metavar = create_int_metavar(facefusion.choices.execution_concurrency_limit_range))
+	group_execution.add_argument('--execution-intra-op-thread-count', help = wording.get('help.execution_intra_op_thread_count'), type = int, default = config.get_int_value('execution.execution_intra_op_thread_count', '0'), choices = facefusion.choices.execution_op_thread_count_range, metavar = create_int_metavar(facefusion.choices.execution_op_thread_count_range))
+	group_execution.add_argument('--execution-inter-op-thread-count', help = wording.get('help.execution_inter_op_thread_count'), type = int, default = config.get_int_value('execution.execution_inter_op_thread_count', '0'), choices = facefusion.choices.execution_op_thread_count_range, metavar = create_int_metavar(facefusion.choices.execution_op_thread_count_range))
+	group_execution.add_argument('--execution-graph-optimization', help = wording.get('help.execution_graph_optimization'), default = config.get_str_value('execution.execution_graph_optimization', 'all'), choices = facefusion.choices.execution_graph_optimizations)
+	group_execution.add_argument('--execution-quantization', help = wording.get('help.execution_quantization'), default = config.get_str_value('execution.execution_quantization', 'none'), choices = facefusion.choices.execution_quantizations)
+	job_store.register_job_keys([ 'execution_device_id', 'execution_providers', 'execution_thread_count', 'execution_queue_count', 'execution_backend', 'execution_batch_size', 'execution_batch_wait', 'execution_session_count', 'execution_concurrency_limit', 'execution_intra_op_thread_count', 'execution_inter_op_thread_count', 'execution_graph_optimization', 'execution_quantization' ])
 	return program
 
 
@@ -224,7 +245,9 @@ def create_memory_program() -> ArgumentParser:
 	group_memory = program.add_argument_group('memory')
 	group_memory.add_argument('--video-memory-strategy', help = wording.get('help.video_memory_strategy'), default = config.get_str_value('memory.video_memory_strategy', 'strict'), choices = facefusion.choices.video_memory_strategies)
 	group_memory.add_argument('--system-memory-limit', help = wording.get('help.system_memory_limit'), type = int, default = config.get_int_value('memory.system_memory_limit', '0'), choices = facefusion.choices.system_memory_limit_range, metavar = create_int_metavar(facefusion.choices.system_memory_limit_range))
-	job_store.register_job_keys([ 'video_memory_strategy', 'system_memory_limit' ])
+	group_memory.add_argument('--face-store-memory-limit', help = wording.get('help.face_store_memory_limit'), type = int, default = config.get_int_value('memory.face_store_memory_limit', '512'), choices = facefusion.choices.face_store_memory_limit_range, metavar = create_int_metavar(facefusion.choices.face_store_memory_limit_range))
+	group_memory.add_argument('--inference-pool-memory-limit', help = wording.get('help.inference_pool_memory_limit'), type = int, default = config.get_int_value('memory.inference_pool_memory_limit', '0'), choices = facefusion.choices.inference_pool_memory_limit_range, metavar = create_int_metavar(facefusion.choices.inference_pool_memory_limit_range))
+	job_store.register_job_keys([ 'video_memory_strategy', 'system_memory_limit', 'face_store_memory_limit', 'inference_pool_memory_limit' ])
 	return program
 
 
@@ -233,7 +256,9 @@ def create_misc_program() -> ArgumentParser:
 	log_level_keys = list(facefusion.choices.log_level_set.keys())
 	group_misc = program.add_argument_group('misc')
 	group_misc.add_argument('--log-level', help = wording.get('help.log_level'), default = config.get_str_value('misc.log_level', 'info'), choices = log_level_keys)
-	job_store.register_job_keys([ 'log_level' ])
+	group_misc.add_argument('--log-inference-profile', help = wording.get('help.log_inference_profile'), action = 'store_true', default = config.get_bool_value('misc.log_inference_profile'))
+	group_misc.add_argument('--inference-profile-path', help = wording.get('help.inference_profile_path'), default = config.get_str_value('misc.inference_profile_path'))
+	job_store.register_job_keys([ 'log_level', 'log_inference_profile', 'inference_profile_path' ])
 	return program
 
 
@@ -257,7 +282,7 @@ def create_step_index_program() -> ArgumentParser:
 
 
 def collect_step_program() -> ArgumentParser:
-	return ArgumentParser(parents= [ create_face_detector_program(), create_face_landmarker_program(), create_face_selector_program(), create_face_masker_program(), create_frame_extraction_program(), create_output_creation_program(), create_processors_program() ], add_help = False)
+	return ArgumentParser(parents= [ create_face_detector_program(), create_face_landmarker_program(), create_face_tracker_program(), create_face_selector_program(), create_face_masker_program(), create_frame_extraction_program(), create_output_creation_program(), create_processors_program() ], add_help = False)
 
 
 def collect_job_program() -> ArgumentParser:
@@ -273,6 +298,7 @@ def create_program() -> ArgumentParser:
 	sub_program.add_parser('run', help = wording.get('help.run'), parents = [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), create_source_paths_program(), create_target_path_program(), create_output_path_program(), collect_step_program(), create_uis_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
 	sub_program.add_parser('headless-run', help = wording.get('help.headless_run'), parents = [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), create_source_paths_program(), create_target_path_program(), create_output_path_program(), collect_step_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
 	sub_program.add_parser('batch-run', help = wording.get('help.batch_run'), parents = [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), create_source_pattern_program(), create_target_pattern_program(), create_output_pattern_program(), collect_step_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
+	sub_program.add_parser('autotune', help = wording.get('help.autotune'), parents = [ create_config_path_program(), create_temp_path_program(), create_source_paths_program(), create_target_path_program(), collect_step_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
 	sub_program.add_parser('force-download', help = wording.get('help.force_download'), parents = [ create_download_providers_program(), create_download_scope_program(), create_misc_program() ], formatter_class = create_help_formatter_large)
 	# job manager
 	sub_program.add_parser('job-list', help = wording.get('help.job_list'), parents = [ create_job_status_program(), create_jobs_path_program(), create_misc_program() ], formatter_class = create_help_formatter_large)
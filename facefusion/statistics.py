@@ -20,7 +20,9 @@ def create_statistics(static_faces : FaceSet) -> Dict[str, Any]:
 		'average_face_landmarker_score': 0,
 		'total_face_landmark_5_fallbacks': 0,
 		'total_frames_with_faces': 0,
-		'total_faces': 0
+		'total_faces': 0,
+		'static_face_hits': get_face_store().get('static_face_hits'),
+		'static_face_misses': get_face_store().get('static_face_misses')
 	}
 
 	for faces in static_faces.values():
@@ -3,6 +3,8 @@ from typing import List
 
 from facefusion import state_manager
 from facefusion.filesystem import create_directory, move_file, remove_directory, resolve_file_pattern
+from facefusion.typing import TempFrameFormat
+from facefusion.vision import clear_frame_stores, count_frame_store_total
 
 
 def get_temp_file_path(file_path : str) -> str:
@@ -13,6 +15,12 @@ def get_temp_file_path(file_path : str) -> str:
 	return temp_file_path
 
 
+def get_temp_segment_path(file_path : str, segment_index : int) -> str:
+	_, temp_file_extension = os.path.splitext(os.path.basename(file_path))
+	temp_directory_path = get_temp_directory_path(file_path)
+	return os.path.join(temp_directory_path, 'segment-' + str(segment_index).zfill(4) + temp_file_extension)
+
+
 def move_temp_file(file_path : str, move_path : str) -> bool:
 	temp_file_path = get_temp_file_path(file_path)
 	move_file_path = move_file(temp_file_path, move_path)
@@ -34,6 +42,7 @@ def create_temp_directory(file_path : str) -> bool:
 
 
 def clear_temp_directory(file_path : str) -> bool:
+	clear_frame_stores()
 	if not state_manager.get_item('keep_temp'):
 		temp_directory_path = get_temp_directory_path(file_path)
 		print(f"******* temp_helper.clear_temp_directory: temp_directory_path: {temp_directory_path}")
@@ -44,11 +53,25 @@ def clear_temp_directory(file_path : str) -> bool:
 def get_temp_frame_paths(target_path : str) -> List[str]:
 	temp_frames_pattern = get_temp_frames_pattern(target_path, '*')
 	print(f"******* temp_helper.get_temp_frame_paths: temp_frames_pattern: {temp_frames_pattern}")
-	return resolve_file_pattern(temp_frames_pattern)
+	temp_frame_paths = resolve_file_pattern(temp_frames_pattern)
+
+	if get_temp_frame_format() == 'raw':
+		return [ temp_frame_path for temp_frame_path in temp_frame_paths for _ in range(count_frame_store_total(temp_frame_path)) ]
+	return temp_frame_paths
+
+
+def get_temp_frame_store_path(target_path : str) -> str:
+	return get_temp_frames_pattern(target_path, 'frames')
+
+
+def get_temp_frame_format() -> TempFrameFormat:
+	if state_manager.get_item('temp_frame_format') == 'raw' and 'frame_enhancer' in (state_manager.get_item('processors') or []):
+		return 'png'
+	return state_manager.get_item('temp_frame_format')
 
 
 def get_temp_frames_pattern(target_path : str, temp_frame_prefix : str) -> str:
 	temp_directory_path = get_temp_directory_path(target_path)
-	temp_frames_pattern = os.path.join(temp_directory_path, temp_frame_prefix + '.' + state_manager.get_item('temp_frame_format'))
+	temp_frames_pattern = os.path.join(temp_directory_path, temp_frame_prefix + '.' + get_temp_frame_format())
 	print(f"******* temp_helper.get_temp_frames_pattern: temp_frames_pattern: {temp_frames_pattern}")
 	return temp_frames_pattern
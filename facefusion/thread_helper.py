@@ -1,23 +1,52 @@
 import threading
-from contextlib import nullcontext
-from typing import ContextManager, Union
+from typing import List, Tuple
+from weakref import WeakKeyDictionary
 
-from facefusion.execution import has_execution_provider
+from onnxruntime import InferenceSession
+
+import facefusion.choices
+from facefusion import state_manager
+from facefusion.typing import ExecutionProvider
 
 THREAD_LOCK : threading.Lock = threading.Lock()
-THREAD_SEMAPHORE : threading.Semaphore = threading.Semaphore()
-NULL_CONTEXT : ContextManager[None] = nullcontext()
+SEMAPHORE_LOCK : threading.Lock = threading.Lock()
+INFERENCE_SEMAPHORES : 'WeakKeyDictionary[InferenceSession, Tuple[int, threading.Semaphore]]' = WeakKeyDictionary()
 
 
 def thread_lock() -> threading.Lock:
 	return THREAD_LOCK
 
 
-def thread_semaphore() -> threading.Semaphore:
-	return THREAD_SEMAPHORE
+def split_thread_count(thread_count : int, split_total : int) -> List[int]:
+	return [ max(thread_count // split_total + int(split_index < thread_count % split_total), 1) for split_index in range(split_total) ]
+
+
+def inference_semaphore(inference_session : InferenceSession) -> threading.Semaphore:
+	concurrency_limit = get_concurrency_limit(inference_session)
+
+	with SEMAPHORE_LOCK:
+		if inference_session in INFERENCE_SEMAPHORES:
+			semaphore_limit, semaphore = INFERENCE_SEMAPHORES.get(inference_session)
+
+			if semaphore_limit == concurrency_limit:
+				return semaphore
+
+		semaphore = threading.Semaphore(concurrency_limit)
+		INFERENCE_SEMAPHORES[inference_session] = (concurrency_limit, semaphore)
+	return semaphore
+
+
+def get_concurrency_limit(inference_session : InferenceSession) -> int:
+	execution_concurrency_limit = state_manager.get_item('execution_concurrency_limit')
+
+	if execution_concurrency_limit:
+		return execution_concurrency_limit
+	if is_serial_execution_provider(inference_session):
+		return 1
+	return state_manager.get_item('execution_thread_count') or 1
 
 
-def conditional_thread_semaphore() -> Union[threading.Semaphore, ContextManager[None]]:
-	if has_execution_provider('directml') or has_execution_provider('rocm'):
-		return THREAD_SEMAPHORE
-	return NULL_CONTEXT
+def is_serial_execution_provider(inference_session : InferenceSession) -> bool:
+	execution_providers = inference_session.get_providers()
+	serial_execution_providers : List[ExecutionProvider] = [ 'directml', 'rocm' ]
+	return any(facefusion.choices.execution_provider_set.get(execution_provider) in execution_providers for execution_provider in serial_execution_providers)
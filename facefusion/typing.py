@@ -1,5 +1,5 @@
 from collections import namedtuple
-from typing import Any, Callable, Dict, List, Literal, Optional, Tuple, TypedDict
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional, OrderedDict, Tuple, TypedDict
 
 import numpy
 from numpy.typing import NDArray
@@ -13,8 +13,12 @@ Detection = NDArray[Any]
 Prediction = NDArray[Any]
 
 BoundingBox = NDArray[Any]
+BoundingBoxes = NDArray[Any]
+FaceScores = NDArray[Any]
 FaceLandmark5 = NDArray[Any]
+FaceLandmarks5 = NDArray[Any]
 FaceLandmark68 = NDArray[Any]
+FaceDetection = Tuple[BoundingBoxes, FaceScores, FaceLandmarks5]
 FaceLandmarkSet = TypedDict('FaceLandmarkSet',
 {
 	'5' : FaceLandmark5, #type:ignore[valid-type]
@@ -46,11 +50,15 @@ Face = namedtuple('Face',
 FaceSet = Dict[str, List[Face]]
 FaceStore = TypedDict('FaceStore',
 {
-	'static_faces' : FaceSet,
+	'static_faces' : OrderedDict[str, List[Face]],
+	'static_face_memory' : int,
+	'static_face_hits' : int,
+	'static_face_misses' : int,
 	'reference_faces' : FaceSet
 })
 
 VisionFrame = NDArray[Any]
+VisionFrameBatch = NDArray[Any]
 Mask = NDArray[Any]
 Points = NDArray[Any]
 Distance = NDArray[Any]
@@ -58,6 +66,15 @@ Matrix = NDArray[Any]
 Anchors = NDArray[Any]
 Translation = NDArray[Any]
 
+FaceTracker = TypedDict('FaceTracker',
+{
+	'track_vision_frame' : Optional[VisionFrame],
+	'faces' : List[Face],
+	'track_ids' : List[int],
+	'track_total' : int,
+	'frame_count' : int
+})
+
 AudioBuffer = bytes
 Audio = NDArray[Any]
 AudioChunk = NDArray[Any]
@@ -71,6 +88,17 @@ Duration = float
 Padding = Tuple[int, int, int, int]
 Orientation = Literal['landscape', 'portrait']
 Resolution = Tuple[int, int]
+VideoSegment = Tuple[int, int]
+FrameStore = NDArray[Any]
+VideoInfo = TypedDict('VideoInfo',
+{
+	'frame_total' : int,
+	'fps' : Fps,
+	'resolution' : Resolution,
+	'duration' : Duration,
+	'codec' : str,
+	'keyframes' : Optional[List[int]]
+})
 
 ProcessState = Literal['checking', 'processing', 'stopping', 'pending']
 QueuePayload = TypedDict('QueuePayload',
@@ -81,6 +109,7 @@ QueuePayload = TypedDict('QueuePayload',
 Args = Dict[str, Any]
 UpdateProgress = Callable[[int], None]
 ProcessFrames = Callable[[List[str], List[QueuePayload], UpdateProgress], None]
+ProcessStream = Callable[[Iterator[VisionFrame]], Iterator[VisionFrame]]
 ProcessStep = Callable[[str, int, Args], bool]
 
 Content = Dict[str, Any]
@@ -100,13 +129,15 @@ FaceDetectorModel = Literal['many', 'retinaface', 'scrfd', 'yoloface']
 FaceLandmarkerModel = Literal['many', '2dfan4', 'peppa_wutz']
 FaceDetectorSet = Dict[FaceDetectorModel, List[str]]
 FaceSelectorMode = Literal['many', 'one', 'reference']
+FaceAnalysis = Literal['recognizer', 'classifier']
 FaceSelectorOrder = Literal['left-right', 'right-left', 'top-bottom', 'bottom-top', 'small-large', 'large-small', 'best-worst', 'worst-best']
 FaceOccluderModel = Literal['xseg_1', 'xseg_2']
 FaceParserModel = Literal['bisenet_resnet_18', 'bisenet_resnet_34']
 FaceMaskType = Literal['box', 'occlusion', 'region']
 FaceMaskRegion = Literal['skin', 'left-eyebrow', 'right-eyebrow', 'left-eye', 'right-eye', 'glasses', 'nose', 'mouth', 'upper-lip', 'lower-lip']
 FaceMaskRegionSet = Dict[FaceMaskRegion, int]
-TempFrameFormat = Literal['bmp', 'jpg', 'png']
+TempFrameFormat = Literal['bmp', 'jpg', 'png', 'raw']
+FramePipeline = Literal['temp', 'fused', 'stream']
 OutputAudioEncoder = Literal['aac', 'libmp3lame', 'libopus', 'libvorbis']
 OutputVideoEncoder = Literal['libx264', 'libx265', 'libvpx-vp9', 'h264_nvenc', 'hevc_nvenc', 'h264_amf', 'hevc_amf','h264_qsv', 'hevc_qsv', 'h264_videotoolbox', 'hevc_videotoolbox']
 OutputVideoPreset = Literal['ultrafast', 'superfast', 'veryfast', 'faster', 'fast', 'medium', 'slow', 'slower', 'veryslow']
@@ -118,6 +149,10 @@ ModelInitializer = NDArray[Any]
 ExecutionProvider = Literal['cpu', 'coreml', 'cuda', 'directml', 'openvino', 'rocm', 'tensorrt']
 ExecutionProviderValue = Literal['CPUExecutionProvider', 'CoreMLExecutionProvider', 'CUDAExecutionProvider', 'DmlExecutionProvider', 'OpenVINOExecutionProvider', 'ROCMExecutionProvider', 'TensorrtExecutionProvider']
 ExecutionProviderSet = Dict[ExecutionProvider, ExecutionProviderValue]
+ExecutionBackend = Literal['thread', 'process']
+ExecutionGraphOptimization = Literal['disable', 'basic', 'extended', 'all']
+ExecutionQuantization = Literal['none', 'int8']
+QuantizationMetric = Literal['error', 'similarity', 'landmark']
 ValueAndUnit = TypedDict('ValueAndUnit',
 {
 	'value' : int,
@@ -185,7 +220,63 @@ File = TypedDict('File',
 AppContext = Literal['cli', 'ui']
 
 InferencePool = Dict[str, InferenceSession]
-InferencePoolSet = Dict[AppContext, Dict[str, InferencePool]]
+InferencePoolSet = Dict[AppContext, Dict[str, List[InferencePool]]]
+InferenceProfileRecord = TypedDict('InferenceProfileRecord',
+{
+	'call_total' : int,
+	'batch_total' : int,
+	'total_duration' : float,
+	'durations' : List[float]
+})
+InferenceProfile = TypedDict('InferenceProfile',
+{
+	'model_name' : str,
+	'execution_provider' : str,
+	'call_total' : int,
+	'batch_total' : int,
+	'total_duration' : float,
+	'p50_duration' : float,
+	'p95_duration' : float,
+	'p99_duration' : float
+})
+InferencePoolUsage = TypedDict('InferencePoolUsage',
+{
+	'model_paths' : List[str],
+	'memory_size' : int
+})
+InferenceSessionOptions = TypedDict('InferenceSessionOptions',
+{
+	'intra_op_thread_count' : int,
+	'inter_op_thread_count' : int,
+	'graph_optimization' : ExecutionGraphOptimization,
+	'quantization' : ExecutionQuantization,
+	'memory_arena' : bool,
+	'memory_pattern' : bool
+})
+InferenceInputs = Dict[str, NDArray[Any]]
+InferenceBatch = TypedDict('InferenceBatch',
+{
+	'inference_inputs' : InferenceInputs,
+	'inference_output' : Optional[NDArray[Any]],
+	'inference_error' : Optional[Exception],
+	'inference_event' : Any
+})
+AutotuneConfig = TypedDict('AutotuneConfig',
+{
+	'execution_thread_count' : int,
+	'execution_queue_count' : int,
+	'execution_batch_size' : int,
+	'execution_intra_op_thread_count' : int
+})
+AutotuneConfigSet = Dict[str, AutotuneConfig]
+InferenceBindingKey = Tuple[Tuple[str, Tuple[int, ...]], ...]
+InferenceBinding = TypedDict('InferenceBinding',
+{
+	'io_binding' : Any,
+	'binding_key' : Optional[InferenceBindingKey],
+	'input_buffers' : Dict[Tuple[str, Tuple[int, ...]], NDArray[Any]],
+	'output_buffers' : Dict[InferenceBindingKey, List[NDArray[Any]]]
+})
 
 UiWorkflow = Literal['instant_runner', 'job_runner', 'job_manager']
 
@@ -230,6 +321,9 @@ StateKey = Literal\
 	'face_detector_score',
 	'face_landmarker_model',
 	'face_landmarker_score',
+	'face_tracker',
+	'face_tracker_interval',
+	'face_tracker_score',
 	'face_selector_mode',
 	'face_selector_order',
 	'face_selector_gender',
@@ -249,6 +343,8 @@ StateKey = Literal\
 	'trim_frame_end',
 	'temp_frame_format',
 	'keep_temp',
+	'frame_pipeline',
+	'video_segment_count',
 	'output_image_quality',
 	'output_image_resolution',
 	'output_audio_encoder',
@@ -266,11 +362,24 @@ StateKey = Literal\
 	'execution_providers',
 	'execution_thread_count',
 	'execution_queue_count',
+	'execution_backend',
+	'execution_batch_size',
+	'execution_batch_wait',
+	'execution_session_count',
+	'execution_concurrency_limit',
+	'execution_intra_op_thread_count',
+	'execution_inter_op_thread_count',
+	'execution_graph_optimization',
+	'execution_quantization',
 	'download_providers',
 	'download_scope',
 	'video_memory_strategy',
 	'system_memory_limit',
+	'face_store_memory_limit',
+	'inference_pool_memory_limit',
 	'log_level',
+	'log_inference_profile',
+	'inference_profile_path',
 	'job_id',
 	'job_status',
 	'step_index'
@@ -293,6 +402,9 @@ State = TypedDict('State',
 	'face_detector_score' : Score,
 	'face_landmarker_model' : FaceLandmarkerModel,
 	'face_landmarker_score' : Score,
+	'face_tracker' : bool,
+	'face_tracker_interval' : int,
+	'face_tracker_score' : Score,
 	'face_selector_mode' : FaceSelectorMode,
 	'face_selector_order' : FaceSelectorOrder,
 	'face_selector_race' : Race,
@@ -312,6 +424,8 @@ State = TypedDict('State',
 	'trim_frame_end' : int,
 	'temp_frame_format' : TempFrameFormat,
 	'keep_temp' : bool,
+	'frame_pipeline' : FramePipeline,
+	'video_segment_count' : int,
 	'output_image_quality' : int,
 	'output_image_resolution' : str,
 	'output_audio_encoder' : OutputAudioEncoder,
@@ -329,11 +443,24 @@ State = TypedDict('State',
 	'execution_providers' : List[ExecutionProvider],
 	'execution_thread_count' : int,
 	'execution_queue_count' : int,
+	'execution_backend' : ExecutionBackend,
+	'execution_batch_size' : int,
+	'execution_batch_wait' : int,
+	'execution_session_count' : int,
+	'execution_concurrency_limit' : int,
+	'execution_intra_op_thread_count' : int,
+	'execution_inter_op_thread_count' : int,
+	'execution_graph_optimization' : ExecutionGraphOptimization,
+	'execution_quantization' : ExecutionQuantization,
 	'download_providers' : List[DownloadProvider],
 	'download_scope' : DownloadScope,
 	'video_memory_strategy' : VideoMemoryStrategy,
 	'system_memory_limit' : int,
+	'face_store_memory_limit' : int,
+	'inference_pool_memory_limit' : int,
 	'log_level' : LogLevel,
+	'log_inference_profile' : bool,
+	'inference_profile_path' : Optional[str],
 	'job_id' : str,
 	'job_status' : JobStatus,
 	'step_index' : int
@@ -12,7 +12,7 @@ from facefusion import logger, state_manager, wording
 from facefusion.audio import create_empty_audio_frame
 from facefusion.common_helper import get_first, is_windows
 from facefusion.content_analyser import analyse_stream
-from facefusion.face_analyser import get_average_face, get_many_faces
+from facefusion.face_analyser import get_average_face, get_many_faces, get_source_face_analyses
 from facefusion.ffmpeg import open_ffmpeg
 from facefusion.filesystem import filter_image_paths
 from facefusion.processors.core import get_processors_modules
@@ -89,7 +89,7 @@ def start(webcam_device_id : int, webcam_mode : WebcamMode, webcam_resolution :
 	state_manager.set_item('face_selector_mode', 'one')
 	source_image_paths = filter_image_paths(state_manager.get_item('source_paths'))
 	source_frames = read_static_images(source_image_paths)
-	source_faces = get_many_faces(source_frames)
+	source_faces = get_many_faces(source_frames, get_source_face_analyses())
 	source_face = get_average_face(source_faces)
 	stream = None
 	webcam_capture = None
@@ -1,5 +1,8 @@
+import mmap
+import os
+import threading
 from functools import lru_cache
-from typing import List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import cv2
 import numpy
@@ -7,8 +10,13 @@ from cv2.typing import Size
 
 import facefusion.choices
 from facefusion.common_helper import is_windows
-from facefusion.filesystem import is_image, is_video, sanitize_path_for_windows
-from facefusion.typing import Duration, Fps, Orientation, Resolution, VisionFrame
+from facefusion.filesystem import is_file, is_image, is_video, sanitize_path_for_windows
+from facefusion.json import read_json, write_json
+from facefusion.typing import Duration, Fps, FrameStore, Orientation, Resolution, VideoInfo, VideoSegment, VisionFrame
+
+
+FRAME_STORES : Dict[str, Tuple[Tuple[int, int], mmap.mmap, FrameStore]] = {}
+FRAME_STORE_LOCK : threading.Lock = threading.Lock()
 
 
 @lru_cache(maxsize = 128)
@@ -41,6 +49,96 @@ def write_image(image_path : str, vision_frame : VisionFrame) -> bool:
 	return False
 
 
+def read_frame_store(frame_store_path : str) -> Optional[FrameStore]:
+	if is_file(frame_store_path):
+		frame_store_stat = os.stat(frame_store_path)
+		frame_store_key = (frame_store_stat.st_ino, frame_store_stat.st_size)
+
+		with FRAME_STORE_LOCK:
+			if frame_store_path in FRAME_STORES and FRAME_STORES.get(frame_store_path)[0] != frame_store_key:
+				close_frame_store(FRAME_STORES.pop(frame_store_path)[1])
+			if frame_store_path not in FRAME_STORES:
+				frame_store_mmap, frame_store = open_frame_store(frame_store_path, frame_store_stat.st_size)
+				if frame_store is None:
+					return None
+				FRAME_STORES[frame_store_path] = (frame_store_key, frame_store_mmap, frame_store)
+			return FRAME_STORES.get(frame_store_path)[2]
+	return None
+
+
+def open_frame_store(frame_store_path : str, frame_store_size : int) -> Tuple[Optional[mmap.mmap], Optional[FrameStore]]:
+	frame_store_resolution = detect_frame_store_resolution(frame_store_path)
+
+	if frame_store_resolution:
+		frame_store_width, frame_store_height = frame_store_resolution
+		frame_store_total = frame_store_size // (frame_store_width * frame_store_height * 3)
+
+		if frame_store_total:
+			with open(frame_store_path, 'r+b') as frame_store_file:
+				frame_store_mmap = mmap.mmap(frame_store_file.fileno(), frame_store_total * frame_store_width * frame_store_height * 3)
+			frame_store = numpy.frombuffer(frame_store_mmap, dtype = numpy.uint8).reshape(frame_store_total, frame_store_height, frame_store_width, 3)
+			return frame_store_mmap, frame_store
+	return None, None
+
+
+def close_frame_store(frame_store_mmap : mmap.mmap) -> None:
+	try:
+		frame_store_mmap.flush()
+		frame_store_mmap.close()
+	except BufferError:
+		pass
+
+
+def clear_frame_stores() -> None:
+	with FRAME_STORE_LOCK:
+		frame_store_mmaps = [ frame_store_mmap for _, frame_store_mmap, _ in FRAME_STORES.values() ]
+		FRAME_STORES.clear()
+
+	for frame_store_mmap in frame_store_mmaps:
+		close_frame_store(frame_store_mmap)
+
+
+def count_frame_store_total(frame_store_path : str) -> int:
+	frame_store = read_frame_store(frame_store_path)
+
+	if frame_store is not None:
+		return frame_store.shape[0]
+	return 0
+
+
+def get_frame_store_info_path(frame_store_path : str) -> str:
+	return frame_store_path + '.json'
+
+
+def detect_frame_store_resolution(frame_store_path : str) -> Optional[Resolution]:
+	frame_store_info = read_json(get_frame_store_info_path(frame_store_path))
+
+	if frame_store_info and frame_store_info.get('resolution'):
+		return unpack_resolution(frame_store_info.get('resolution'))
+	return None
+
+
+def write_frame_store_resolution(frame_store_path : str, frame_store_resolution : Resolution) -> bool:
+	return write_json(get_frame_store_info_path(frame_store_path), { 'resolution': pack_resolution(frame_store_resolution) })
+
+
+def read_frame_store_frame(frame_store_path : str, frame_number : int) -> Optional[VisionFrame]:
+	frame_store = read_frame_store(frame_store_path)
+
+	if frame_store is not None and frame_number < frame_store.shape[0]:
+		return frame_store[frame_number].copy()
+	return None
+
+
+def write_frame_store_frame(frame_store_path : str, frame_number : int, vision_frame : VisionFrame) -> bool:
+	frame_store = read_frame_store(frame_store_path)
+
+	if frame_store is not None and frame_number < frame_store.shape[0] and vision_frame.shape == frame_store.shape[1:]:
+		frame_store[frame_number] = vision_frame
+		return True
+	return False
+
+
 def detect_image_resolution(image_path : str) -> Optional[Resolution]:
 	if is_image(image_path):
 		image = read_image(image_path)
@@ -87,27 +185,70 @@ def get_video_frame(video_path : str, frame_number : int = 0) -> Optional[Vision
 	return None
 
 
-def count_video_frame_total(video_path : str) -> int:
+def sample_video_frames(video_path : str, trim_frame_start : int, trim_frame_end : int, frame_step : int) -> Iterator[Tuple[int, VisionFrame]]:
 	if is_video(video_path):
 		if is_windows():
 			video_path = sanitize_path_for_windows(video_path)
 		video_capture = cv2.VideoCapture(video_path)
-		if video_capture.isOpened():
-			video_frame_total = int(video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
+		try:
+			if video_capture.isOpened():
+				video_capture.set(cv2.CAP_PROP_POS_FRAMES, trim_frame_start)
+				for frame_number in range(trim_frame_start, trim_frame_end):
+					if frame_number % frame_step == 0:
+						has_vision_frame, vision_frame = video_capture.read()
+						if not has_vision_frame:
+							break
+						yield frame_number, vision_frame
+					elif not video_capture.grab():
+						break
+		finally:
 			video_capture.release()
-			return video_frame_total
+
+
+def detect_video_info(video_path : str) -> Optional[VideoInfo]:
+	if is_video(video_path):
+		video_stat = os.stat(video_path)
+		return probe_static_video_info(video_path, video_stat.st_mtime_ns, video_stat.st_size)
+	return None
+
+
+@lru_cache(maxsize = 128)
+def probe_static_video_info(video_path : str, video_modified_time : int, video_size : int) -> Optional[VideoInfo]:
+	if is_windows():
+		video_path = sanitize_path_for_windows(video_path)
+	video_capture = cv2.VideoCapture(video_path)
+
+	if video_capture.isOpened():
+		video_frame_total = int(video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
+		video_fps = video_capture.get(cv2.CAP_PROP_FPS)
+		video_width = int(video_capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+		video_height = int(video_capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+		video_fourcc = int(video_capture.get(cv2.CAP_PROP_FOURCC))
+		video_capture.release()
+		video_info : VideoInfo =\
+		{
+			'frame_total': video_frame_total,
+			'fps': video_fps,
+			'resolution': (video_width, video_height),
+			'duration': video_frame_total / video_fps if video_frame_total and video_fps else 0,
+			'codec': video_fourcc.to_bytes(4, 'little').decode(errors = 'ignore').strip('\x00 '),
+			'keyframes': None
+		}
+		return video_info
+	return None
+
+
+def count_video_frame_total(video_path : str) -> int:
+	video_info = detect_video_info(video_path)
+	if video_info:
+		return video_info.get('frame_total')
 	return 0
 
 
 def detect_video_fps(video_path : str) -> Optional[float]:
-	if is_video(video_path):
-		if is_windows():
-			video_path = sanitize_path_for_windows(video_path)
-		video_capture = cv2.VideoCapture(video_path)
-		if video_capture.isOpened():
-			video_fps = video_capture.get(cv2.CAP_PROP_FPS)
-			video_capture.release()
-			return video_fps
+	video_info = detect_video_info(video_path)
+	if video_info:
+		return video_info.get('fps')
 	return None
 
 
@@ -120,11 +261,9 @@ def restrict_video_fps(video_path : str, fps : Fps) -> Fps:
 
 
 def detect_video_duration(video_path : str) -> Duration:
-	video_frame_total = count_video_frame_total(video_path)
-	video_fps = detect_video_fps(video_path)
-
-	if video_frame_total and video_fps:
-		return video_frame_total / video_fps
+	video_info = detect_video_info(video_path)
+	if video_info:
+		return video_info.get('duration')
 	return 0
 
 
@@ -134,6 +273,18 @@ def count_trim_frame_total(video_path : str, trim_frame_start : Optional[int], t
 	return trim_frame_end - trim_frame_start
 
 
+def calc_video_segments(video_keyframes : List[int], trim_frame_start : int, trim_frame_end : int, video_segment_count : int) -> List[VideoSegment]:
+	segment_frames = [ trim_frame_start ]
+
+	for segment_index in range(1, video_segment_count):
+		segment_frame = trim_frame_start + (trim_frame_end - trim_frame_start) * segment_index // video_segment_count
+		segment_keyframes = [ video_keyframe for video_keyframe in video_keyframes if segment_frames[-1] < video_keyframe < trim_frame_end ]
+		if segment_keyframes:
+			segment_frames.append(min(segment_keyframes, key = lambda segment_keyframe: abs(segment_keyframe - segment_frame)))
+	segment_frames.append(trim_frame_end)
+	return list(zip(segment_frames[:-1], segment_frames[1:]))
+
+
 def restrict_trim_frame(video_path : str, trim_frame_start : Optional[int], trim_frame_end : Optional[int]) -> Tuple[int, int]:
 	video_frame_total = count_video_frame_total(video_path)
 
@@ -153,15 +304,9 @@ def restrict_trim_frame(video_path : str, trim_frame_start : Optional[int], trim
 
 
 def detect_video_resolution(video_path : str) -> Optional[Resolution]:
-	if is_video(video_path):
-		if is_windows():
-			video_path = sanitize_path_for_windows(video_path)
-		video_capture = cv2.VideoCapture(video_path)
-		if video_capture.isOpened():
-			width = video_capture.get(cv2.CAP_PROP_FRAME_WIDTH)
-			height = video_capture.get(cv2.CAP_PROP_FRAME_HEIGHT)
-			video_capture.release()
-			return int(width), int(height)
+	video_info = detect_video_info(video_path)
+	if video_info:
+		return video_info.get('resolution')
 	return None
 
 
@@ -7,7 +7,7 @@ import scipy
 from facefusion import inference_manager
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.filesystem import resolve_relative_path
-from facefusion.thread_helper import thread_semaphore
+from facefusion.thread_helper import inference_semaphore
 from facefusion.typing import Audio, AudioChunk, DownloadScope, InferencePool, ModelOptions, ModelSet
 
 
@@ -82,7 +82,7 @@ def extract_voice(temp_audio_chunk : AudioChunk) -> AudioChunk:
 def forward(temp_audio_chunk : AudioChunk) -> AudioChunk:
 	voice_extractor = get_inference_pool().get('voice_extractor')
 
-	with thread_semaphore():
+	with inference_semaphore(voice_extractor):
 		temp_audio_chunk = voice_extractor.run(None,
 		{
 			'input': temp_audio_chunk
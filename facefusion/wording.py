@@ -17,6 +17,11 @@ WORDING : Dict[str, Any] =\
 	'merging': 'Merging',
 	'downloading': 'Downloading',
 	'temp_frames_not_found': 'Temporary frames not found',
+	'inference_pool_memory_limit_exceeded': 'Inference pool memory limit of {inference_pool_memory_limit} MB is below the {inference_pool_memory} MB of the active models, eviction is stopped',
+	'inference_pool_not_warmed_up': 'Inference pool of {model_module} could not be warmed up: {exception}',
+	'execution_backend_fallback': 'Falling back to the thread backend as the process backend requires raw temporary frames',
+	'execution_backend_providers': 'Every worker process loads its own models onto {execution_providers}, consider fewer execution threads',
+	'temp_frame_format_fallback': 'Falling back to {temp_frame_format} temporary frames as raw frames cannot change resolution',
 	'copying_image': 'Copying image with a resolution of {resolution}',
 	'copying_image_succeed': 'Copying image succeed',
 	'copying_image_failed': 'Copying image failed',
@@ -26,6 +31,12 @@ WORDING : Dict[str, Any] =\
 	'merging_video': 'Merging video with a resolution of {resolution} and {fps} frames per second',
 	'merging_video_succeed': 'Merging video succeed',
 	'merging_video_failed': 'Merging video failed',
+	'streaming_video': 'Streaming video with a resolution of {resolution} and {fps} frames per second',
+	'streaming_video_succeed': 'Streaming video succeed',
+	'streaming_video_failed': 'Streaming video failed',
+	'streaming_video_segments': 'Streaming video in {segment_total} segments with a resolution of {resolution} and {fps} frames per second',
+	'concatenating_video_succeed': 'Concatenating video succeed',
+	'concatenating_video_failed': 'Concatenating video failed',
 	'skipping_audio': 'Skipping audio',
 	'replacing_audio_succeed': 'Replacing audio succeed',
 	'replacing_audio_skipped': 'Replacing audio skipped',
@@ -37,6 +48,11 @@ WORDING : Dict[str, Any] =\
 	'processing_image_failed': 'Processing to image failed',
 	'processing_video_succeed': 'Processing to video succeed in {seconds} seconds',
 	'processing_video_failed': 'Processing to video failed',
+	'autotuning_trial': 'Autotuning {thread_count} threads, {queue_count} queues, batch size {batch_size} and {intra_op_thread_count} intra op threads with {frames_per_second} frames per second',
+	'autotuning_succeed': 'Autotuning succeed with {thread_count} threads, {queue_count} queues, batch size {batch_size} and {intra_op_thread_count} intra op threads',
+	'autotuning_failed': 'Autotuning failed',
+	'autotuning_without_faces': 'Autotuning skipped as the sample frames contain no faces, provide a target with faces',
+	'applying_autotune': 'Applying autotuned {key} of {value}',
 	'choose_image_source': 'Choose a image for the source',
 	'choose_audio_source': 'Choose a audio for the source',
 	'choose_video_target': 'Choose a video for the target',
@@ -78,6 +94,9 @@ WORDING : Dict[str, Any] =\
 	'processing_jobs_failed': 'Processing of all jobs failed',
 	'processing_step': 'Processing step {step_current} of {step_total}',
 	'validating_hash_succeed': 'Validating hash for {hash_file_name} succeed',
+	'quantizing_model_succeed': 'Quantizing model {model_name} succeed',
+	'quantizing_model_rejected': 'Quantizing model {model_name} rejected due to accuracy loss or slower inference',
+	'quantizing_model_skipped': 'Quantizing model {model_name} skipped without target frames to validate on',
 	'validating_hash_failed': 'Validating hash for {hash_file_name} failed',
 	'validating_source_succeed': 'Validating source for {source_file_name} succeed',
 	'validating_source_failed': 'Validating source for {source_file_name} failed',
@@ -115,6 +134,10 @@ WORDING : Dict[str, Any] =\
 		# face landmarker
 		'face_landmarker_model': 'choose the model responsible for detecting the face landmarks',
 		'face_landmarker_score': 'filter the detected face landmarks base on the confidence score',
+		# face tracker
+		'face_tracker': 'track the faces between frames instead of detecting them on every frame',
+		'face_tracker_interval': 'specify the frame interval to detect the faces while tracking',
+		'face_tracker_score': 'detect the faces again when the tracking score drops below',
 		# face selector
 		'face_selector_mode': 'use reference based tracking or simple matching',
 		'face_selector_order': 'specify the order of the detected faces',
@@ -137,6 +160,8 @@ WORDING : Dict[str, Any] =\
 		'trim_frame_end': 'specify the ending frame of the target video',
 		'temp_frame_format': 'specify the temporary resources format',
 		'keep_temp': 'keep the temporary resources after processing',
+		'frame_pipeline': 'choose between one pass per processor, one fused pass over the temporary frames or streaming frames through pipes',
+		'video_segment_count': 'split the streamed video into keyframe aligned segments that are processed in parallel',
 		# output creation
 		'output_image_quality': 'specify the image quality which translates to the compression factor',
 		'output_image_resolution': 'specify the image output resolution based on the target image',
@@ -191,19 +216,33 @@ WORDING : Dict[str, Any] =\
 		'execution_providers': 'inference using different providers (choices: {choices}, ...)',
 		'execution_thread_count': 'specify the amount of parallel threads while processing',
 		'execution_queue_count': 'specify the amount of frames each thread is processing',
+		'execution_backend': 'run the frame workers in threads or in separate processes',
+		'execution_batch_size': 'specify the maximum amount of crops combined into one batched inference',
+		'execution_batch_wait': 'specify the milliseconds a batched inference waits to be filled',
+		'execution_session_count': 'specify the amount of inference sessions kept per model',
+		'execution_concurrency_limit': 'specify the amount of concurrent inferences per session (0 for auto)',
+		'execution_intra_op_thread_count': 'specify the amount of threads used within an operator (0 for auto)',
+		'execution_inter_op_thread_count': 'specify the amount of threads used across operators (0 for auto)',
+		'execution_graph_optimization': 'specify the graph optimization level of the inference sessions',
+		'execution_quantization': 'quantize the models when running on the cpu',
 		# download
 		'download_providers': 'download using different providers (choices: {choices}, ...)',
 		'download_scope': 'specify the download scope',
 		# memory
 		'video_memory_strategy': 'balance fast processing and low VRAM usage',
 		'system_memory_limit': 'limit the available RAM that can be used while processing',
+		'face_store_memory_limit': 'limit the RAM in megabytes used to cache analysed faces',
+		'inference_pool_memory_limit': 'keep inference sessions warm within a memory budget in megabytes (0 to follow the video memory strategy)',
 		# misc
 		'log_level': 'adjust the message severity displayed in the terminal',
+		'log_inference_profile': 'log the latency of every model after processing',
+		'inference_profile_path': 'specify the json file to write the inference profile to',
 		# run
 		'run': 'run the program',
 		'headless_run': 'run the program in headless mode',
 		'batch_run': 'run the program in batch mode',
 		'force_download': 'force automate downloads and exit',
+		'autotune': 'tune the execution options for the selected processors and exit',
 		# jobs
 		'job_id': 'specify the job id',
 		'job_status': 'specify the job status',
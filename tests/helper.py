@@ -1,5 +1,8 @@
 import os
 import tempfile
+from typing import Dict, List, Optional, Union
+
+from onnx import NodeProto, TensorProto, helper, save_model
 
 from facefusion.filesystem import create_directory, is_directory, is_file, remove_directory
 from facefusion.typing import JobStatus
@@ -42,3 +45,18 @@ def prepare_test_output_directory() -> bool:
 	remove_directory(test_outputs_directory)
 	create_directory(test_outputs_directory)
 	return is_directory(test_outputs_directory)
+
+
+def create_test_model(model_nodes : List[NodeProto], model_inputs : Dict[str, List[Union[int, str]]], model_outputs : Dict[str, List[Union[int, str]]], model_initializers : Optional[List[TensorProto]] = None) -> str:
+	model_path = os.path.join(tempfile.mkdtemp(), 'test.onnx')
+	graph = helper.make_graph(model_nodes, 'test',
+	[
+		helper.make_tensor_value_info(input_name, TensorProto.FLOAT, input_shape) for input_name, input_shape in model_inputs.items()
+	],
+	[
+		helper.make_tensor_value_info(output_name, TensorProto.FLOAT, output_shape) for output_name, output_shape in model_outputs.items()
+	], model_initializers)
+	model = helper.make_model(graph, opset_imports = [ helper.make_opsetid('', 13) ])
+	model.ir_version = 8
+	save_model(model, model_path)
+	return model_path
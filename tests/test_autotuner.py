@@ -0,0 +1,71 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+from facefusion import state_manager
+from facefusion.autotuner import autotune, conditional_apply_autotune, create_sample_frames, get_autotune_config
+
+
+def before_each() -> None:
+	state_manager.init_item('config_path', 'facefusion.ini')
+	state_manager.init_item('temp_path', tempfile.gettempdir())
+	state_manager.init_item('execution_device_id', '0')
+	state_manager.init_item('execution_providers', [ 'cpu' ])
+	state_manager.init_item('execution_backend', 'thread')
+	state_manager.init_item('execution_thread_count', 4)
+	state_manager.init_item('execution_queue_count', 1)
+	state_manager.init_item('execution_batch_size', 1)
+	state_manager.init_item('execution_intra_op_thread_count', 0)
+	state_manager.init_item('processors', [])
+	state_manager.init_item('log_level', 'error')
+
+
+def test_create_sample_frames() -> None:
+	sample_vision_frames = create_sample_frames(None)
+
+	assert len(sample_vision_frames) == 16
+	assert sample_vision_frames[0].shape == (720, 1280, 3)
+
+
+def test_autotune() -> None:
+	before_each()
+	autotune_path = os.path.join(tempfile.mkdtemp(), 'autotune.json')
+
+	with patch('facefusion.autotuner.get_autotune_path', return_value = autotune_path), patch('facefusion.autotuner.AUTOTUNE_THREAD_COUNTS', [ 1, 2 ]), patch('facefusion.autotuner.AUTOTUNE_INTRA_OP_THREAD_COUNTS', [ 0 ]):
+		autotune_config = autotune([], None)
+
+		assert autotune_config.get('execution_thread_count') in [ 1, 2 ]
+		assert autotune_config.get('execution_intra_op_thread_count') == 0
+		assert get_autotune_config() == autotune_config
+
+		state_manager.init_item('execution_thread_count', 32)
+		state_manager.init_item('execution_queue_count', 4)
+
+		with patch('sys.argv', [ 'facefusion.py', 'headless-run', '--execution-queue-count', '4' ]):
+			conditional_apply_autotune()
+
+		assert state_manager.get_item('execution_thread_count') == autotune_config.get('execution_thread_count')
+		assert state_manager.get_item('execution_queue_count') == 4
+
+
+def test_autotune_early_stopping() -> None:
+	before_each()
+	autotune_path = os.path.join(tempfile.mkdtemp(), 'autotune.json')
+
+	with patch('facefusion.autotuner.get_autotune_path', return_value = autotune_path), patch('facefusion.autotuner.resolve_autotune_thread_counts', return_value = [ 1, 2, 4, 8 ]), patch('facefusion.autotuner.run_autotune_trial', side_effect = [ 1.0, 2.0, 1.5, 1.0, 1.0, 1.0 ]) as run_autotune_trial:
+		autotune_config = autotune([], None)
+
+	assert autotune_config.get('execution_thread_count') == 2
+	assert autotune_config.get('execution_batch_size') == 1
+	assert run_autotune_trial.call_count == 6
+
+
+def test_autotune_without_faces() -> None:
+	before_each()
+	state_manager.init_item('processors', [ 'face_swapper' ])
+	autotune_path = os.path.join(tempfile.mkdtemp(), 'autotune.json')
+
+	with patch('facefusion.autotuner.get_autotune_path', return_value = autotune_path), patch('facefusion.autotuner.has_sample_faces', return_value = False):
+		assert autotune([], None) is None
+
+	assert os.path.isfile(autotune_path) is False
@@ -37,3 +37,31 @@ def test_debug_face_to_video() -> None:
 
 	assert subprocess.run(commands).returncode == 0
 	assert is_test_output_file('test-debug-face-to-video.mp4') is True
+
+
+def test_debug_face_to_video_as_fused() -> None:
+	commands = [ sys.executable, 'facefusion.py', 'headless-run', '--jobs-path', get_test_jobs_directory(), '--processors', 'face_debugger', '-t', get_test_example_file('target-240p.mp4'), '-o', get_test_output_file('test-debug-face-to-video-as-fused.mp4'), '--trim-frame-end', '1', '--frame-pipeline', 'fused' ]
+
+	assert subprocess.run(commands).returncode == 0
+	assert is_test_output_file('test-debug-face-to-video-as-fused.mp4') is True
+
+
+def test_debug_face_to_video_as_stream() -> None:
+	commands = [ sys.executable, 'facefusion.py', 'headless-run', '--jobs-path', get_test_jobs_directory(), '--processors', 'face_debugger', '-t', get_test_example_file('target-240p.mp4'), '-o', get_test_output_file('test-debug-face-to-video-as-stream.mp4'), '--trim-frame-end', '1', '--frame-pipeline', 'stream' ]
+
+	assert subprocess.run(commands).returncode == 0
+	assert is_test_output_file('test-debug-face-to-video-as-stream.mp4') is True
+
+
+def test_debug_face_to_video_as_stream_segments() -> None:
+	commands = [ sys.executable, 'facefusion.py', 'headless-run', '--jobs-path', get_test_jobs_directory(), '--processors', 'face_debugger', '-t', get_test_example_file('target-240p.mp4'), '-o', get_test_output_file('test-debug-face-to-video-as-stream-segments.mp4'), '--trim-frame-end', '100', '--frame-pipeline', 'stream', '--video-segment-count', '2' ]
+
+	assert subprocess.run(commands).returncode == 0
+	assert is_test_output_file('test-debug-face-to-video-as-stream-segments.mp4') is True
+
+
+def test_debug_face_to_video_with_raw_frames() -> None:
+	commands = [ sys.executable, 'facefusion.py', 'headless-run', '--jobs-path', get_test_jobs_directory(), '--processors', 'face_debugger', '-t', get_test_example_file('target-240p.mp4'), '-o', get_test_output_file('test-debug-face-to-video-with-raw-frames.mp4'), '--trim-frame-end', '1', '--temp-frame-format', 'raw' ]
+
+	assert subprocess.run(commands).returncode == 0
+	assert is_test_output_file('test-debug-face-to-video-with-raw-frames.mp4') is True
@@ -1,10 +1,12 @@
 import subprocess
 
+import numpy
 import pytest
 
 from facefusion import face_classifier, face_detector, face_landmarker, face_recognizer, state_manager
 from facefusion.download import conditional_download
-from facefusion.face_analyser import get_many_faces, get_one_face
+from facefusion.face_analyser import carry_static_faces, get_face_analyses, get_many_faces, get_one_face, get_source_face_analyses, scale_face
+from facefusion.face_store import clear_static_faces, get_static_faces, set_static_faces
 from facefusion.typing import Face
 from facefusion.vision import read_static_image
 from .helper import get_test_example_file, get_test_examples_directory
@@ -108,3 +110,74 @@ def test_get_many_faces() -> None:
 	assert isinstance(many_faces[0], Face)
 	assert isinstance(many_faces[1], Face)
 	assert isinstance(many_faces[2], Face)
+
+
+def test_get_face_analyses() -> None:
+	state_manager.init_item('processors', [ 'face_enhancer' ])
+	state_manager.init_item('face_selector_mode', 'many')
+
+	assert get_face_analyses() == []
+
+	state_manager.init_item('processors', [ 'face_swapper' ])
+
+	assert get_face_analyses() == []
+	assert get_source_face_analyses() == [ 'recognizer' ]
+
+	state_manager.init_item('processors', [ 'face_debugger' ])
+	state_manager.init_item('face_debugger_items', [ 'age' ])
+
+	assert get_face_analyses() == [ 'classifier' ]
+
+	state_manager.init_item('processors', [ 'face_enhancer' ])
+	state_manager.init_item('face_selector_mode', 'reference')
+	state_manager.init_item('face_selector_gender', 'female')
+
+	assert get_face_analyses() == [ 'recognizer', 'classifier' ]
+	assert get_source_face_analyses() == [ 'recognizer', 'classifier' ]
+
+
+def create_face() -> Face:
+	face_landmark_5 = numpy.array([ [ 10, 20 ], [ 30, 40 ], [ 20, 30 ], [ 10, 40 ], [ 30, 40 ] ]).astype(numpy.float32)
+	face_landmark_68 = numpy.tile(face_landmark_5, (14, 1))[:68]
+	return Face(
+		bounding_box = numpy.array([ 10, 20, 30, 40 ]).astype(numpy.float32),
+		score_set = {},
+		landmark_set = { '5': face_landmark_5, '5/68': face_landmark_5, '68': face_landmark_68, '68/5': face_landmark_68 },
+		angle = 0,
+		embedding = numpy.ones(512).astype(numpy.float32),
+		normed_embedding = numpy.ones(512).astype(numpy.float32),
+		gender = 'female',
+		age = range(20, 30),
+		race = 'white'
+	)
+
+
+def test_scale_face() -> None:
+	face = scale_face(create_face(), numpy.array([ 2.0, 0.5 ]))
+
+	assert face.bounding_box.tolist() == [ 20, 10, 60, 20 ]
+	assert face.landmark_set.get('5')[1].tolist() == [ 60, 20 ]
+	assert face.landmark_set.get('68')[1].tolist() == [ 60, 20 ]
+	assert numpy.array_equal(face.embedding, numpy.ones(512))
+	assert face.gender == 'female'
+
+
+def test_carry_static_faces() -> None:
+	state_manager.init_item('face_store_memory_limit', 0)
+	clear_static_faces()
+	source_vision_frame = numpy.random.default_rng(0).integers(1, 255, (100, 200, 3), dtype = numpy.uint8)
+	target_vision_frame = numpy.random.default_rng(1).integers(1, 255, (200, 400, 3), dtype = numpy.uint8)
+
+	carry_static_faces(source_vision_frame, target_vision_frame)
+
+	assert get_static_faces(target_vision_frame) is None
+
+	set_static_faces(source_vision_frame, [ create_face() ])
+	carry_static_faces(source_vision_frame, target_vision_frame)
+	static_faces = get_static_faces(target_vision_frame)
+
+	assert len(static_faces) == 1
+	assert static_faces[0].bounding_box.tolist() == [ 20, 40, 60, 80 ]
+	assert static_faces[0].landmark_set.get('5')[0].tolist() == [ 20, 40 ]
+
+	clear_static_faces()
@@ -0,0 +1,110 @@
+from typing import Dict, List, Union
+from unittest.mock import patch
+
+import numpy
+from onnx import helper, numpy_helper
+from onnxruntime import InferenceSession
+
+from facefusion import state_manager
+from facefusion.face_detector import decode_with_retinaface, detect_rotated_faces_batch, forward_detect_frames, prepare_detect_frames
+from .helper import create_test_model
+
+
+def create_inference_session(batch_size : Union[int, str]) -> InferenceSession:
+	model_path = create_test_model(
+	[
+		helper.make_node('Relu', [ 'input' ], [ 'output' ])
+	],
+	{
+		'input': [ batch_size, 3, 8, 8 ]
+	},
+	{
+		'output': [ batch_size, 3, 8, 8 ]
+	})
+	return InferenceSession(model_path, providers = [ 'CPUExecutionProvider' ])
+
+
+def create_retinaface_session(batch_size : Union[int, str]) -> InferenceSession:
+	model_nodes = [ helper.make_node('Reshape', [ 'input', 'flatten_shape' ], [ 'flatten' ]) ]
+	model_outputs : Dict[str, List[Union[int, str]]] = {}
+	model_initializers = [ numpy_helper.from_array(numpy.array([ 0, -1 ], dtype = numpy.int64), 'flatten_shape') ]
+	output_start = 0
+
+	for output_name, anchor_total, channel_total in [ ('score_8', 32, 1), ('score_16', 8, 1), ('score_32', 2, 1), ('bounding_box_8', 32, 4), ('bounding_box_16', 8, 4), ('bounding_box_32', 2, 4), ('face_landmark_5_8', 32, 10), ('face_landmark_5_16', 8, 10), ('face_landmark_5_32', 2, 10) ]:
+		output_end = output_start + anchor_total * channel_total
+		output_shape : List[Union[int, str]] = [ anchor_total, channel_total ] if batch_size == 1 else [ batch_size, anchor_total, channel_total ]
+		model_nodes.extend(
+		[
+			helper.make_node('Slice', [ 'flatten', output_name + '_start', output_name + '_end', 'slice_axes' ], [ output_name + '_slice' ]),
+			helper.make_node('Reshape', [ output_name + '_slice', output_name + '_shape' ], [ output_name ])
+		])
+		model_initializers.extend(
+		[
+			numpy_helper.from_array(numpy.array([ output_start ], dtype = numpy.int64), output_name + '_start'),
+			numpy_helper.from_array(numpy.array([ output_end ], dtype = numpy.int64), output_name + '_end'),
+			numpy_helper.from_array(numpy.array([ anchor_total, channel_total ] if batch_size == 1 else [ 0, anchor_total, channel_total ], dtype = numpy.int64), output_name + '_shape')
+		])
+		model_outputs[output_name] = output_shape
+		output_start = output_end
+	model_initializers.append(numpy_helper.from_array(numpy.array([ 1 ], dtype = numpy.int64), 'slice_axes'))
+	model_path = create_test_model(model_nodes,
+	{
+		'input': [ batch_size, 3, 32, 32 ]
+	}, model_outputs, model_initializers)
+	return InferenceSession(model_path, providers = [ 'CPUExecutionProvider' ])
+
+
+def test_prepare_detect_frames() -> None:
+	vision_frames =\
+	[
+		numpy.full((16, 8, 3), 255, dtype = numpy.uint8),
+		numpy.full((4, 8, 3), 255, dtype = numpy.uint8)
+	]
+	detect_vision_frames, detect_ratios = prepare_detect_frames(vision_frames, '8x8')
+
+	assert detect_vision_frames.shape == (2, 3, 8, 8)
+	assert detect_vision_frames.dtype == numpy.float32
+	assert detect_ratios == [ (2.0, 2.0), (1.0, 1.0) ]
+	assert detect_vision_frames[0, :, :, 4:].min() == -127.5 / 128.0
+	assert detect_vision_frames[1, :, 4:, :].min() == -127.5 / 128.0
+
+
+def test_forward_detect_frames() -> None:
+	state_manager.init_item('execution_thread_count', 1)
+	detect_vision_frames = numpy.random.default_rng(0).standard_normal((3, 3, 8, 8)).astype(numpy.float32)
+	batch_sizes : List[Union[int, str]] = [ 1, 'batch' ]
+
+	for batch_size in batch_sizes:
+		detections = forward_detect_frames(create_inference_session(batch_size), detect_vision_frames)
+
+		assert len(detections) == 3
+		for detection, detect_vision_frame in zip(detections, detect_vision_frames):
+			assert numpy.array_equal(detection[0].reshape(detect_vision_frame.shape), numpy.maximum(detect_vision_frame, 0))
+
+
+def test_forward_detect_frames_with_retinaface() -> None:
+	state_manager.init_item('execution_thread_count', 1)
+	state_manager.init_item('face_detector_score', 0.5)
+	detect_vision_frames = numpy.random.default_rng(0).random((2, 3, 32, 32)).astype(numpy.float32)
+	fixed_detections = forward_detect_frames(create_retinaface_session(1), detect_vision_frames)
+	dynamic_detections = forward_detect_frames(create_retinaface_session('batch'), detect_vision_frames)
+
+	for fixed_detection, dynamic_detection in zip(fixed_detections, dynamic_detections):
+		fixed_bounding_boxes, fixed_face_scores, fixed_face_landmarks_5 = decode_with_retinaface(fixed_detection, (1.0, 1.0), '32x32')
+		dynamic_bounding_boxes, dynamic_face_scores, dynamic_face_landmarks_5 = decode_with_retinaface(dynamic_detection, (1.0, 1.0), '32x32')
+
+		assert len(fixed_face_scores) > 0
+		assert numpy.array_equal(fixed_bounding_boxes, dynamic_bounding_boxes)
+		assert numpy.array_equal(fixed_face_scores, dynamic_face_scores)
+		assert numpy.array_equal(fixed_face_landmarks_5, dynamic_face_landmarks_5)
+
+
+def test_detect_rotated_faces_batch_without_faces() -> None:
+	vision_frames = [ numpy.zeros((8, 16, 3), dtype = numpy.uint8) ]
+
+	with patch('facefusion.face_detector.detect_faces_batch', return_value = [ (numpy.empty((0, 4)), numpy.empty(0), numpy.empty((0, 5, 2))) ]):
+		bounding_boxes, face_scores, face_landmarks_5 = detect_rotated_faces_batch(vision_frames, 90)[0]
+
+	assert bounding_boxes.shape == (0, 4)
+	assert face_scores.shape == (0,)
+	assert face_landmarks_5.shape == (0, 5, 2)
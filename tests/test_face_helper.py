@@ -0,0 +1,65 @@
+import cv2
+import numpy
+
+from facefusion.face_helper import apply_nms, calc_paste_area, normalize_bounding_boxes, paste_back, transform_bounding_box, transform_bounding_boxes, warp_face_by_face_landmark_5
+from facefusion.typing import Mask, Matrix, VisionFrame
+
+
+def paste_back_full_frame(temp_vision_frame : VisionFrame, crop_vision_frame : VisionFrame, crop_mask : Mask, affine_matrix : Matrix) -> VisionFrame:
+	inverse_matrix = cv2.invertAffineTransform(affine_matrix)
+	temp_size = temp_vision_frame.shape[:2][::-1]
+	inverse_mask = numpy.expand_dims(cv2.warpAffine(crop_mask, inverse_matrix, temp_size).clip(0, 1), axis = -1)
+	inverse_vision_frame = cv2.warpAffine(crop_vision_frame, inverse_matrix, temp_size, borderMode = cv2.BORDER_REPLICATE)
+	return (inverse_mask * inverse_vision_frame + (1 - inverse_mask) * temp_vision_frame).astype(temp_vision_frame.dtype)
+
+
+def test_paste_back() -> None:
+	temp_vision_frame = numpy.random.randint(0, 255, (1080, 1920, 3)).astype(numpy.uint8)
+	face_landmark_5 = numpy.array([ [ 38.3, 51.7 ], [ 73.5, 51.5 ], [ 56.0, 71.7 ], [ 41.5, 92.4 ], [ 70.7, 92.2 ] ]) * 2
+
+	for translation in [ (800, 500), (1860, 1020), (-60, -40) ]:
+		crop_vision_frame, affine_matrix = warp_face_by_face_landmark_5(temp_vision_frame, face_landmark_5 + translation, 'ffhq_512', (512, 512))
+		crop_vision_frame = 255 - crop_vision_frame
+		crop_mask = numpy.random.rand(512, 512).astype(numpy.float32)
+		full_paste_vision_frame = paste_back_full_frame(temp_vision_frame, crop_vision_frame, crop_mask, affine_matrix)
+		paste_vision_frame = paste_back(temp_vision_frame.copy(), crop_vision_frame, crop_mask, affine_matrix)
+		paste_difference = numpy.abs(paste_vision_frame.astype(int) - full_paste_vision_frame.astype(int))
+
+		assert paste_vision_frame.shape == temp_vision_frame.shape
+		assert numpy.max(paste_difference) <= 4
+		assert numpy.mean(paste_difference > 0) < 0.001
+
+
+def test_calc_paste_area() -> None:
+	temp_vision_frame = numpy.zeros((1080, 1920, 3)).astype(numpy.uint8)
+	crop_vision_frame = numpy.zeros((128, 128, 3)).astype(numpy.uint8)
+	affine_matrix = numpy.array([ [ 1, 0, -100 ], [ 0, 1, -200 ] ]).astype(numpy.float32)
+
+	paste_bounding_box, paste_matrix = calc_paste_area(temp_vision_frame, crop_vision_frame, affine_matrix)
+	assert paste_bounding_box.tolist() == [ 99, 199, 229, 329 ]
+	assert paste_matrix.tolist() == [ [ 1, 0, 1 ], [ 0, 1, 1 ] ]
+
+	affine_matrix = numpy.array([ [ 1, 0, 4000 ], [ 0, 1, 4000 ] ]).astype(numpy.float32)
+	paste_bounding_box, _ = calc_paste_area(temp_vision_frame, crop_vision_frame, affine_matrix)
+	assert paste_bounding_box[2] <= paste_bounding_box[0]
+
+
+def test_normalize_bounding_boxes() -> None:
+	bounding_boxes = numpy.array([ [ 10, 20, 0, 5 ], [ 0, 5, 10, 20 ] ])
+
+	assert normalize_bounding_boxes(bounding_boxes).tolist() == [ [ 0, 5, 10, 20 ], [ 0, 5, 10, 20 ] ]
+
+
+def test_transform_bounding_boxes() -> None:
+	bounding_boxes = numpy.array([ [ 0, 0, 10, 20 ], [ 30, 40, 50, 70 ] ])
+	matrix = cv2.getRotationMatrix2D((25, 25), 30, 1)
+
+	assert numpy.allclose(transform_bounding_boxes(bounding_boxes, matrix), [ transform_bounding_box(bounding_box, matrix) for bounding_box in bounding_boxes ])
+
+
+def test_apply_nms() -> None:
+	bounding_boxes = numpy.array([ [ 0, 0, 10, 10 ], [ 1, 1, 10, 10 ], [ 50, 50, 60, 60 ] ])
+	face_scores = numpy.array([ 0.9, 0.8, 0.7 ])
+
+	assert apply_nms(bounding_boxes, face_scores, 0.5, 0.4).tolist() == [ 0, 2 ]
+	assert apply_nms(bounding_boxes, face_scores, 0.95, 0.4).tolist() == []
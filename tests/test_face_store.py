@@ -0,0 +1,75 @@
+import numpy
+import pytest
+
+from facefusion import state_manager
+from facefusion.face_store import clear_static_faces, create_frame_key, create_frame_number_key, get_face_store, get_frame_key, get_static_faces, set_frame_key, set_static_faces
+from facefusion.typing import Face
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	state_manager.init_item('face_store_memory_limit', 0)
+	clear_static_faces()
+
+
+def create_face() -> Face:
+	return Face(
+		bounding_box = numpy.array([ 0, 0, 256, 256 ]).astype(numpy.float32),
+		score_set = {},
+		landmark_set = { '5': numpy.zeros((5, 2)).astype(numpy.float32) },
+		angle = 0,
+		embedding = numpy.zeros(512).astype(numpy.float32),
+		normed_embedding = numpy.zeros(512).astype(numpy.float32),
+		gender = None,
+		age = None,
+		race = None
+	)
+
+
+def test_create_frame_key() -> None:
+	vision_frame = numpy.random.randint(0, 200, (2160, 3840, 3)).astype(numpy.uint8)
+
+	assert create_frame_key(vision_frame) == create_frame_key(vision_frame.copy())
+	assert create_frame_key(vision_frame) != create_frame_key(numpy.flip(vision_frame))
+	assert create_frame_key(vision_frame) != create_frame_key(vision_frame[:1080])
+
+	edit_vision_frame = vision_frame.copy()
+	edit_vision_frame[1000:1008, 1000:1008] += 50
+
+	assert create_frame_key(vision_frame) != create_frame_key(edit_vision_frame)
+	assert create_frame_key(numpy.random.randint(0, 255, (8, 8, 3)).astype(numpy.uint8))
+	assert create_frame_key(numpy.zeros((240, 426, 3)).astype(numpy.uint8)) is None
+
+
+def test_get_and_set_frame_key() -> None:
+	state_manager.init_item('target_path', 'target.mp4')
+	vision_frame = numpy.random.randint(0, 255, (240, 426, 3)).astype(numpy.uint8)
+
+	assert get_frame_key(vision_frame) == create_frame_key(vision_frame)
+
+	set_frame_key(vision_frame, create_frame_number_key(vision_frame, 10, 25.0))
+
+	assert get_frame_key(vision_frame) == 'target.mp4|25.0|10|(240, 426, 3)'
+	assert get_frame_key(vision_frame.copy()) == create_frame_key(vision_frame)
+
+
+def test_get_and_set_static_faces() -> None:
+	vision_frame = numpy.random.randint(0, 255, (240, 426, 3)).astype(numpy.uint8)
+
+	assert get_static_faces(vision_frame) is None
+	set_static_faces(vision_frame, [ create_face() ])
+	assert len(get_static_faces(vision_frame)) == 1
+	assert get_face_store().get('static_face_hits') == 1
+	assert get_face_store().get('static_face_misses') == 1
+
+
+def test_evict_static_faces() -> None:
+	state_manager.set_item('face_store_memory_limit', 1)
+	vision_frames = [ numpy.random.randint(0, 255, (240, 426, 3)).astype(numpy.uint8) for _ in range(1000) ]
+
+	for vision_frame in vision_frames:
+		set_static_faces(vision_frame, [ create_face() ])
+
+	assert get_face_store().get('static_face_memory') <= 1024 * 1024
+	assert get_static_faces(vision_frames[0]) is None
+	assert get_static_faces(vision_frames[-1])
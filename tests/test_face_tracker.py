@@ -0,0 +1,124 @@
+from unittest.mock import patch
+
+import cv2
+import numpy
+
+from facefusion import state_manager
+from facefusion.face_store import clear_static_faces, get_static_faces, set_static_faces
+from facefusion.face_tracker import calc_bounding_box_iou, create_face_tracker, match_track_ids, propagate_faces, redetect_faces, track_faces
+from facefusion.typing import BoundingBox, Face
+
+
+def create_face(bounding_box : BoundingBox) -> Face:
+	x1, y1, x2, y2 = bounding_box
+	face_landmark_5 = numpy.array([ [ x1 + 30, y1 + 40 ], [ x2 - 30, y1 + 40 ], [ (x1 + x2) / 2, (y1 + y2) / 2 ], [ x1 + 35, y2 - 30 ], [ x2 - 35, y2 - 30 ] ], dtype = numpy.float32)
+	face_landmark_68 = numpy.stack(numpy.meshgrid(numpy.linspace(x1 + 10, x2 - 10, 17), numpy.linspace(y1 + 10, y2 - 10, 4)), axis = -1).reshape(-1, 2)[:68].astype(numpy.float32)
+	return Face(
+		bounding_box = bounding_box,
+		score_set = { 'detector': 0.9, 'landmarker': 0.9 },
+		landmark_set = { '5': face_landmark_5, '5/68': face_landmark_5, '68': face_landmark_68, '68/5': face_landmark_68 },
+		angle = 0,
+		embedding = numpy.ones(512),
+		normed_embedding = numpy.ones(512),
+		gender = 'female',
+		age = range(20, 30),
+		race = 'white'
+	)
+
+
+def test_propagate_faces() -> None:
+	state_manager.init_item('face_tracker_score', 0.5)
+	vision_frame = cv2.GaussianBlur(numpy.random.default_rng(0).integers(0, 255, (240, 320), dtype = numpy.uint8), (5, 5), 0)
+	translation = numpy.array([ 3, 2 ])
+	face_tracker = create_face_tracker()
+	face = create_face(numpy.array([ 100, 60, 220, 200 ], dtype = numpy.float32))
+	face_tracker['track_vision_frame'] = vision_frame
+	face_tracker['faces'] = [ face ]
+
+	faces = propagate_faces(face_tracker, numpy.roll(vision_frame, translation[::-1], axis = (0, 1)))
+
+	assert len(faces) == 1
+	assert numpy.allclose(faces[0].bounding_box, face.bounding_box + numpy.tile(translation, 2), atol = 0.5)
+	assert numpy.allclose(faces[0].landmark_set.get('68'), face.landmark_set.get('68') + translation, atol = 0.5)
+	assert faces[0].embedding is face.embedding
+	assert propagate_faces(face_tracker, numpy.random.default_rng(1).integers(0, 255, (240, 320), dtype = numpy.uint8)) is None
+
+
+def test_match_track_ids() -> None:
+	face_tracker = create_face_tracker()
+	previous_face = create_face(numpy.array([ 100, 60, 220, 200 ]))
+	next_face = create_face(numpy.array([ 0, 0, 50, 50 ]))
+
+	assert match_track_ids(face_tracker, [ previous_face ]) == [ 0 ]
+
+	face_tracker['faces'] = [ previous_face ]
+	face_tracker['track_ids'] = [ 0 ]
+
+	assert match_track_ids(face_tracker, [ next_face, create_face(numpy.array([ 104, 62, 224, 202 ])) ]) == [ 1, 0 ]
+
+
+def test_calc_bounding_box_iou() -> None:
+	assert calc_bounding_box_iou(numpy.array([ 0, 0, 10, 10 ]), numpy.array([ 0, 0, 10, 10 ])) == 1.0
+	assert calc_bounding_box_iou(numpy.array([ 0, 0, 10, 10 ]), numpy.array([ 5, 0, 15, 10 ])) == 1 / 3
+	assert calc_bounding_box_iou(numpy.array([ 0, 0, 10, 10 ]), numpy.array([ 20, 20, 30, 30 ])) == 0.0
+
+
+def test_redetect_faces() -> None:
+	face_tracker = create_face_tracker()
+	previous_face = create_face(numpy.array([ 100, 60, 220, 200 ]))
+	face_tracker['faces'] = [ previous_face ]
+	face_tracker['track_ids'] = [ 0 ]
+	face_tracker['track_total'] = 1
+	match_face = create_face(numpy.array([ 104, 62, 224, 202 ]))._replace(embedding = None, normed_embedding = None, gender = None)
+	new_face = create_face(numpy.array([ 0, 0, 50, 50 ]))._replace(embedding = None, normed_embedding = None, gender = None)
+	vision_frame = numpy.ones((240, 320, 3), dtype = numpy.uint8)
+
+	with patch('facefusion.face_tracker.detect_many_faces', return_value = [ [ match_face, new_face ] ]), patch('facefusion.face_tracker.analyse_faces', side_effect = lambda _, faces, __: [ face._replace(gender = 'male') for face in faces ]) as analyse_faces:
+		faces = redetect_faces(face_tracker, vision_frame, [ 'classifier' ])
+
+	assert analyse_faces.call_args[0][1] == [ new_face ]
+	assert faces[0].gender == 'female'
+	assert faces[0].embedding is previous_face.embedding
+	assert faces[1].gender == 'male'
+	assert face_tracker.get('track_ids') == [ 0, 1 ]
+
+
+def test_track_faces_with_static_faces() -> None:
+	state_manager.init_item('face_store_memory_limit', 0)
+	state_manager.init_item('face_tracker_interval', 10)
+	state_manager.init_item('face_selector_mode', 'many')
+	clear_static_faces()
+	face_tracker = create_face_tracker()
+	face_tracker['frame_count'] = 5
+	face = create_face(numpy.array([ 100, 60, 220, 200 ]))
+	vision_frame = numpy.random.default_rng(0).integers(0, 255, (240, 320, 3), dtype = numpy.uint8)
+	set_static_faces(vision_frame, [ face ])
+
+	with patch('facefusion.face_tracker.detect_many_faces') as detect_many_faces:
+		assert track_faces(face_tracker, vision_frame) == [ face ]
+		assert detect_many_faces.call_count == 0
+
+	assert face_tracker.get('frame_count') == 6
+	assert face_tracker.get('track_ids') == [ 0 ]
+
+
+def test_track_faces_with_empty_static_faces() -> None:
+	state_manager.init_item('face_store_memory_limit', 0)
+	state_manager.init_item('face_tracker_interval', 10)
+	state_manager.init_item('execution_batch_size', 1)
+	state_manager.init_item('processors', [])
+	state_manager.init_item('face_selector_mode', 'many')
+	state_manager.init_item('face_detector_score', 0.5)
+	clear_static_faces()
+	vision_frame = numpy.random.default_rng(0).integers(0, 255, (240, 320, 3), dtype = numpy.uint8)
+	edit_vision_frame = vision_frame.copy()
+	edit_vision_frame[120:136, 160:176] //= 2
+	set_static_faces(vision_frame, [])
+
+	with patch('facefusion.face_analyser.detect_faces_by_angles', return_value = [ (numpy.empty((0, 4)), numpy.empty(0), numpy.empty((0, 5, 2))) ]) as detect_faces_by_angles:
+		assert track_faces(create_face_tracker(), vision_frame) == []
+		assert detect_faces_by_angles.call_count == 0
+		assert track_faces(create_face_tracker(), edit_vision_frame) == []
+		assert detect_faces_by_angles.call_count == 1
+
+	assert get_static_faces(edit_vision_frame) == []
@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union
+
+import numpy
+import pytest
+from onnx import helper
+from onnxruntime import InferenceSession
+
+from facefusion import state_manager
+from facefusion.inference_batcher import has_dynamic_batch, run_inference_batch, run_inference_stack
+from .helper import create_test_model
+
+
+def create_inference_session(batch_size : Union[int, str]) -> InferenceSession:
+	model_path = create_test_model(
+	[
+		helper.make_node('Add', [ 'source', 'target' ], [ 'output' ])
+	],
+	{
+		'source': [ batch_size, 4 ],
+		'target': [ batch_size, 4 ]
+	},
+	{
+		'output': [ batch_size, 4 ]
+	})
+	return InferenceSession(model_path, providers = [ 'CPUExecutionProvider' ])
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('execution_providers', [ 'cpu' ])
+	state_manager.init_item('execution_batch_size', 8)
+	state_manager.init_item('execution_batch_wait', 10)
+
+
+def test_has_dynamic_batch() -> None:
+	assert has_dynamic_batch(create_inference_session('batch')) is True
+	assert has_dynamic_batch(create_inference_session(1)) is False
+
+
+def test_run_inference_batch() -> None:
+	for inference_session in [ create_inference_session('batch'), create_inference_session(1) ]:
+		inference_inputs_list = [
+		{
+			'source': numpy.full((batch_size, 4), batch_size).astype(numpy.float32),
+			'target': numpy.ones((batch_size, 4)).astype(numpy.float32)
+		} for batch_size in [ 1, 2, 3, 4, 1, 2, 3, 4 ] ]
+
+		with ThreadPoolExecutor(max_workers = 8) as executor:
+			inference_outputs = list(executor.map(lambda inference_inputs: run_inference_batch(inference_session, inference_inputs), inference_inputs_list))
+
+		for inference_inputs, inference_output in zip(inference_inputs_list, inference_outputs):
+			assert inference_output.shape == inference_inputs.get('source').shape
+			assert numpy.array_equal(inference_output, inference_inputs.get('source') + 1)
+
+
+def test_run_inference_stack() -> None:
+	inference_inputs =\
+	{
+		'source': numpy.arange(12).reshape(3, 4),
+		'target': numpy.ones((3, 4))
+	}
+
+	for inference_session in [ create_inference_session('batch'), create_inference_session(1) ]:
+		inference_outputs = run_inference_stack(inference_session, inference_inputs)
+
+		assert len(inference_outputs) == 1
+		assert inference_outputs[0].dtype == numpy.float32
+		assert numpy.array_equal(inference_outputs[0], inference_inputs.get('source') + 1)
@@ -0,0 +1,43 @@
+import numpy
+from onnx import helper
+from onnxruntime import InferenceSession
+
+from facefusion import state_manager
+from facefusion.inference_binder import get_input_buffer, run_inference_binding
+from .helper import create_test_model
+
+
+def create_inference_session() -> InferenceSession:
+	model_path = create_test_model(
+	[
+		helper.make_node('Relu', [ 'input' ], [ 'output' ])
+	],
+	{
+		'input': [ 'batch', 4 ]
+	},
+	{
+		'output': [ 'batch', 4 ]
+	})
+	return InferenceSession(model_path, providers = [ 'CPUExecutionProvider' ])
+
+
+def test_run_inference_binding() -> None:
+	state_manager.init_item('execution_thread_count', 1)
+	inference_session = create_inference_session()
+	input_buffer = get_input_buffer(inference_session, 'input', (2, 4))
+
+	assert input_buffer is get_input_buffer(inference_session, 'input', (2, 4))
+	assert input_buffer.dtype == numpy.float32
+
+	input_buffer[:] = numpy.array([ [ -1, 2, -3, 4 ], [ 5, -6, 7, -8 ] ])
+	output_buffer = run_inference_binding(inference_session, { 'input': input_buffer })[0]
+
+	assert output_buffer.tolist() == [ [ 0, 2, 0, 4 ], [ 5, 0, 7, 0 ] ]
+
+	input_buffer *= -1
+
+	assert run_inference_binding(inference_session, { 'input': input_buffer })[0] is output_buffer
+	assert output_buffer.tolist() == [ [ 1, 0, 3, 0 ], [ 0, 6, 0, 8 ] ]
+	assert run_inference_binding(inference_session, { 'input': numpy.ones((3, 4), dtype = numpy.float32) })[0].shape == (3, 4)
+	assert run_inference_binding(inference_session, { 'input': input_buffer })[0] is output_buffer
+	assert output_buffer.tolist() == [ [ 1, 0, 3, 0 ], [ 0, 6, 0, 8 ] ]
@@ -1,18 +1,58 @@
+import os
+import tempfile
+from threading import Thread
+from types import ModuleType
+from typing import Iterator
 from unittest.mock import patch
 
 import pytest
+from onnx import helper
 from onnxruntime import InferenceSession
 
 from facefusion import content_analyser, state_manager
-from facefusion.inference_manager import INFERENCE_POOLS, get_inference_pool
+from facefusion.inference_manager import INFERENCE_POOLS, INFERENCE_POOL_USAGES, clear_inference_pool, clear_inference_pools, create_dummy_inputs, create_inference_session, create_inference_session_options, estimate_inference_pool_memory, get_inference_pool, resolve_optimized_model_path, warm_up_inference_pool
+from facefusion.typing import DownloadSet
+from .helper import create_test_model
+
+
+def create_model_sources() -> DownloadSet:
+	model_path = create_test_model(
+	[
+		helper.make_node('Add', [ 'source', 'target' ], [ 'output' ])
+	],
+	{
+		'source': [ 1, 4 ],
+		'target': [ 1, 4 ]
+	},
+	{
+		'output': [ 1, 4 ]
+	})
+	return\
+	{
+		'add':
+		{
+			'url': None,
+			'path': model_path
+		}
+	}
 
 
 @pytest.fixture(scope = 'module', autouse = True)
-def before_all() -> None:
+def before_all() -> Iterator[None]:
+	current_path = os.getcwd()
 	state_manager.init_item('execution_device_id', 0)
 	state_manager.init_item('execution_providers', [ 'cpu' ])
+	state_manager.init_item('execution_session_count', 1)
+	state_manager.init_item('execution_intra_op_thread_count', 0)
+	state_manager.init_item('execution_inter_op_thread_count', 2)
+	state_manager.init_item('execution_graph_optimization', 'basic')
+	state_manager.init_item('system_memory_limit', 0)
+	state_manager.init_item('inference_pool_memory_limit', 0)
 	state_manager.init_item('download_providers', [ 'github' ])
 	content_analyser.pre_check()
+	os.chdir(tempfile.mkdtemp())
+	yield
+	os.chdir(current_path)
 
 
 def test_get_inference_pool() -> None:
@@ -21,11 +61,116 @@ def test_get_inference_pool() -> None:
 	with patch('facefusion.inference_manager.detect_app_context', return_value = 'cli'):
 		get_inference_pool('test', model_sources)
 
-		assert isinstance(INFERENCE_POOLS.get('cli').get('test.cpu').get('content_analyser'), InferenceSession)
+		assert isinstance(INFERENCE_POOLS.get('cli').get('test.cpu')[0].get('content_analyser'), InferenceSession)
 
 	with patch('facefusion.inference_manager.detect_app_context', return_value = 'ui'):
 		get_inference_pool('test', model_sources)
 
-		assert isinstance(INFERENCE_POOLS.get('ui').get('test.cpu').get('content_analyser'), InferenceSession)
+		assert isinstance(INFERENCE_POOLS.get('ui').get('test.cpu')[0].get('content_analyser'), InferenceSession)
+
+	assert INFERENCE_POOLS.get('cli').get('test.cpu')[0].get('content_analyser') == INFERENCE_POOLS.get('ui').get('test.cpu')[0].get('content_analyser')
+
+
+def test_create_inference_session() -> None:
+	state_manager.init_item('execution_session_count', 2)
+	inference_session_options = create_inference_session_options()
+	inference_session = create_inference_session(create_model_sources().get('add').get('path'), '0', [ 'cpu' ], inference_session_options)
+	session_options = inference_session.get_session_options()
+
+	assert inference_session_options.get('intra_op_thread_count') == max((os.cpu_count() or 1) // 2, 1)
+	assert session_options.inter_op_num_threads == 2
+	assert session_options.enable_cpu_mem_arena is True
+
+
+def test_create_inference_session_with_optimized_model() -> None:
+	model_path = create_model_sources().get('add').get('path')
+	inference_session_options = create_inference_session_options()
+	optimized_model_path = resolve_optimized_model_path(model_path, [ 'cpu' ], inference_session_options)
+	create_inference_session(model_path, '0', [ 'cpu' ], inference_session_options)
+
+	assert os.path.isfile(optimized_model_path) is True
+	assert create_inference_session(model_path, '0', [ 'cpu' ], inference_session_options).get_session_options().graph_optimization_level.name == 'ORT_DISABLE_ALL'
+	assert resolve_optimized_model_path(model_path, [ 'cuda', 'cpu' ], inference_session_options) is None
+
+	inference_session_options['graph_optimization'] = 'all'
+
+	assert resolve_optimized_model_path(model_path, [ 'cpu' ], inference_session_options).endswith('-extended.onnx')
+	assert create_inference_session(model_path, '0', [ 'cpu' ], inference_session_options).get_session_options().graph_optimization_level.name == 'ORT_ENABLE_ALL'
+
+
+def test_get_inference_pool_per_thread() -> None:
+	state_manager.init_item('execution_session_count', 2)
+	model_sources = create_model_sources()
+	inference_pools = []
+
+	for _ in range(4):
+		thread = Thread(target = lambda: inference_pools.append(get_inference_pool(__name__, model_sources)))
+		thread.start()
+		thread.join()
+
+	assert len(INFERENCE_POOLS.get('cli').get(__name__ + '.cpu')) == 2
+	assert len({ id(inference_pool) for inference_pool in inference_pools }) == 2
+
+	clear_inference_pool(__name__)
+
+	assert INFERENCE_POOLS.get('cli').get(__name__ + '.cpu') is None
+
+
+def test_warm_up_inference_pool() -> None:
+	state_manager.init_item('execution_session_count', 1)
+	model_sources = create_model_sources()
+	model_module = ModuleType('test_warm_up')
+	setattr(model_module, 'get_inference_pool', lambda: get_inference_pool('test_warm_up', model_sources))
+	warm_up_inference_pool(model_module, 'cli')
+	inference_session = INFERENCE_POOLS.get('cli').get('test_warm_up.cpu')[0].get('add')
+	inference_inputs = create_dummy_inputs(inference_session)
+
+	assert inference_inputs.get('source').shape == (1, 4)
+	assert inference_inputs.get('target').dtype == 'float32'
+
+	warm_up_inference_pool(model_module, 'ui')
+
+	assert INFERENCE_POOLS.get('ui').get('test_warm_up.cpu') == INFERENCE_POOLS.get('cli').get('test_warm_up.cpu')
+
+	clear_inference_pools()
+
+
+def test_evict_inference_pool() -> None:
+	state_manager.init_item('execution_session_count', 1)
+	state_manager.init_item('inference_pool_memory_limit', 256)
+	model_sources = create_model_sources()
+
+	with patch('facefusion.inference_manager.estimate_inference_pool_memory', return_value = 200 * 1024 * 1024):
+		get_inference_pool('test_evict_1', model_sources)
+		clear_inference_pool('test_evict_1')
+
+		assert INFERENCE_POOLS.get('cli').get('test_evict_1.cpu')
+
+		get_inference_pool('test_evict_2', model_sources)
+
+	assert INFERENCE_POOLS.get('cli').get('test_evict_1.cpu') is None
+	assert INFERENCE_POOLS.get('cli').get('test_evict_2.cpu')
+	assert list(INFERENCE_POOL_USAGES.keys())[-1] == 'test_evict_2.cpu'
+
+	with patch('facefusion.inference_manager.estimate_inference_pool_memory', return_value = 200 * 1024 * 1024):
+		get_inference_pool('test_evict_1', model_sources)
+
+	assert INFERENCE_POOLS.get('cli').get('test_evict_1.cpu')
+	assert INFERENCE_POOLS.get('cli').get('test_evict_2.cpu')
+
+	clear_inference_pool('test_evict_2')
+	clear_inference_pool('test_evict_1')
+
+	assert INFERENCE_POOLS.get('cli').get('test_evict_1.cpu')
+	assert INFERENCE_POOLS.get('cli').get('test_evict_2.cpu') is None
+
+	state_manager.init_item('inference_pool_memory_limit', 0)
+	clear_inference_pools()
+
+
+def test_estimate_inference_pool_memory() -> None:
+	model_sources = create_model_sources()
+	model_size = os.path.getsize(model_sources.get('add').get('path'))
 
-	assert INFERENCE_POOLS.get('cli').get('test.cpu').get('content_analyser') == INFERENCE_POOLS.get('ui').get('test.cpu').get('content_analyser')
+	assert estimate_inference_pool_memory(model_sources, 2, 0) == model_size * 2
+	assert estimate_inference_pool_memory(model_sources, 2, 1024) == model_size * 2 + 1024
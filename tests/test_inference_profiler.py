@@ -0,0 +1,53 @@
+from unittest.mock import patch
+
+import numpy
+from onnx import helper
+from onnxruntime import InferenceSession
+
+from facefusion import state_manager
+from facefusion.inference_profiler import INFERENCE_PROFILE_RECORDS, clear_inference_profiles, conditional_profile_inference_session, create_inference_profiles, format_inference_profiles
+from .helper import create_test_model
+
+
+def create_model_path() -> str:
+	return create_test_model(
+	[
+		helper.make_node('Relu', [ 'input' ], [ 'output' ])
+	],
+	{
+		'input': [ 'batch', 4 ]
+	},
+	{
+		'output': [ 'batch', 4 ]
+	})
+
+
+def test_conditional_profile_inference_session() -> None:
+	state_manager.init_item('log_inference_profile', True)
+	clear_inference_profiles()
+	inference_session = conditional_profile_inference_session(InferenceSession(create_model_path(), providers = [ 'CPUExecutionProvider' ]), 'relu')
+
+	for batch_size in [ 4, 1, 2, 3 ]:
+		inference_session.run(None, { 'input': numpy.ones((batch_size, 4), dtype = numpy.float32) })
+
+	inference_profiles = create_inference_profiles()
+
+	assert len(inference_profiles) == 1
+	assert inference_profiles[0].get('model_name') == 'relu'
+	assert inference_profiles[0].get('execution_provider') == 'CPUExecutionProvider'
+	assert inference_profiles[0].get('call_total') == 3
+	assert inference_profiles[0].get('batch_total') == 6
+	assert inference_profiles[0].get('p50_duration') <= inference_profiles[0].get('p99_duration')
+	assert len(format_inference_profiles(inference_profiles)) == 2
+
+	with patch('facefusion.inference_profiler.INFERENCE_PROFILE_SAMPLE_TOTAL', 2):
+		for _ in range(8):
+			inference_session.run(None, { 'input': numpy.ones((1, 4), dtype = numpy.float32) })
+
+	assert create_inference_profiles()[0].get('call_total') == 11
+	assert len(INFERENCE_PROFILE_RECORDS.get(('relu', 'CPUExecutionProvider')).get('durations')) == 3
+
+	clear_inference_profiles()
+	state_manager.init_item('log_inference_profile', False)
+
+	assert create_inference_profiles() == []
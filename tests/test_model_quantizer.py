@@ -0,0 +1,113 @@
+import itertools
+import os
+import tempfile
+from unittest.mock import patch
+
+import cv2
+import numpy
+import pytest
+from onnx import helper, numpy_helper
+from onnxruntime import InferenceSession
+
+from facefusion import state_manager
+from facefusion.model_quantizer import calc_landmark_error, calc_output_errors, calc_output_similarities, conditional_quantize_model, create_sample_inputs
+from .helper import create_test_model
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	target_path = os.path.join(tempfile.mkdtemp(), 'target.png')
+	target_vision_frame = numpy.zeros((48, 64, 3), dtype = numpy.uint8)
+	target_vision_frame[:, :, 0] = numpy.linspace(0, 255, 64)
+	target_vision_frame[:, :, 1] = numpy.linspace(0, 255, 48)[:, numpy.newaxis]
+	target_vision_frame[:, :, 2] = 128
+	cv2.imwrite(target_path, target_vision_frame)
+	state_manager.init_item('target_path', target_path)
+
+
+def create_model_path() -> str:
+	weight = numpy.random.default_rng(0).standard_normal((768, 32)).astype(numpy.float32)
+	return create_test_model(
+	[
+		helper.make_node('Flatten', [ 'input' ], [ 'flatten' ]),
+		helper.make_node('MatMul', [ 'flatten', 'weight' ], [ 'output' ])
+	],
+	{
+		'input': [ 'batch', 3, 16, 16 ]
+	},
+	{
+		'output': [ 'batch', 32 ]
+	},
+	[
+		numpy_helper.from_array(weight, 'weight')
+	])
+
+
+def test_conditional_quantize_model() -> None:
+	model_path = create_model_path()
+	quantized_model_path = model_path.replace('.onnx', '-int8.onnx')
+
+	with patch('facefusion.model_quantizer.perf_counter', side_effect = itertools.cycle([ 0, 2, 0, 1 ])):
+		assert conditional_quantize_model(model_path, quantized_model_path) is True
+
+	assert os.path.getsize(quantized_model_path) < os.path.getsize(model_path)
+
+
+def test_conditional_quantize_model_rejected() -> None:
+	model_path = create_model_path()
+	quantized_model_path = model_path.replace('.onnx', '-int8.onnx')
+
+	with patch('facefusion.model_quantizer.QUANTIZATION_ERROR_LIMIT', 0):
+		assert conditional_quantize_model(model_path, quantized_model_path) is False
+
+	assert os.path.isfile(quantized_model_path) is False
+	assert os.path.isfile(quantized_model_path + '.rejected') is True
+	assert conditional_quantize_model(model_path, quantized_model_path) is False
+
+	model_path = create_model_path()
+	quantized_model_path = model_path.replace('.onnx', '-int8.onnx')
+
+	with patch('facefusion.model_quantizer.perf_counter', side_effect = itertools.cycle([ 0, 1, 0, 2 ])):
+		assert conditional_quantize_model(model_path, quantized_model_path) is False
+
+	assert os.path.isfile(quantized_model_path + '.rejected') is True
+
+
+def test_conditional_quantize_model_skipped() -> None:
+	model_path = create_model_path()
+	quantized_model_path = model_path.replace('.onnx', '-int8.onnx')
+	state_manager.set_item('target_path', None)
+
+	assert conditional_quantize_model(model_path, quantized_model_path) is False
+	assert os.path.isfile(quantized_model_path + '.rejected') is False
+
+
+def test_create_sample_inputs() -> None:
+	inference_session = InferenceSession(create_model_path(), providers = [ 'CPUExecutionProvider' ])
+	sample_inputs = create_sample_inputs(inference_session, numpy.zeros((48, 64, 3), dtype = numpy.uint8))
+
+	assert sample_inputs.get('input').shape == (1, 3, 16, 16)
+	assert sample_inputs.get('input').min() == -1
+
+
+def test_calc_output_errors() -> None:
+	output = numpy.ones((1, 4), dtype = numpy.float32)
+
+	assert calc_output_errors([ output ], [ output ]) == [ 0.0 ]
+	assert abs(calc_output_errors([ output ], [ output * 1.1 ])[0] - 0.1) < 1e-6
+
+
+def test_calc_output_similarities() -> None:
+	output = numpy.ones((1, 4), dtype = numpy.float32)
+
+	assert abs(calc_output_similarities([ output ], [ output * 2 ])[0] - 1) < 1e-6
+	assert abs(calc_output_similarities([ output ], [ -output ])[0] + 1) < 1e-6
+
+
+def test_calc_landmark_error() -> None:
+	output = numpy.zeros((1, 68, 3), dtype = numpy.float32)
+	quantized_output = output.copy()
+	quantized_output[..., 0] = 3
+	quantized_output[..., 1] = 4
+
+	assert calc_landmark_error(output, quantized_output) == 5
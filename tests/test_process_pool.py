@@ -0,0 +1,61 @@
+import os
+import tempfile
+import threading
+from time import sleep
+from typing import List
+
+from facefusion import process_manager, state_manager
+from facefusion.processors.process_pool import multi_process_frames_in_pool
+from facefusion.typing import QueuePayload, UpdateProgress
+
+
+def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
+	for queue_payload in process_manager.manage(queue_payloads):
+		with open(queue_payload.get('frame_path'), 'w') as frame_file:
+			frame_file.write(state_manager.get_item('face_selector_mode') + ':' + str(os.getpid()))
+		update_progress(1)
+
+
+def process_frames_slowly(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
+	for queue_payload in process_manager.manage(queue_payloads):
+		sleep(0.05)
+		open(queue_payload.get('frame_path'), 'w').close()
+		update_progress(1)
+
+
+def test_multi_process_frames_in_pool() -> None:
+	state_manager.init_item('execution_providers', [ 'cpu' ])
+	state_manager.init_item('execution_thread_count', 2)
+	state_manager.init_item('execution_queue_count', 1)
+	state_manager.init_item('face_selector_mode', 'many')
+	state_manager.init_item('log_level', 'error')
+	temp_directory_path = tempfile.mkdtemp()
+	queue_payloads : List[QueuePayload] = [ { 'frame_number': frame_number, 'frame_path': os.path.join(temp_directory_path, str(frame_number) + '.txt') } for frame_number in range(8) ]
+	progress_updates : List[int] = []
+
+	multi_process_frames_in_pool([], queue_payloads, process_frames, progress_updates.append)
+
+	for queue_payload in queue_payloads:
+		with open(queue_payload.get('frame_path')) as frame_file:
+			face_selector_mode, process_id = frame_file.read().split(':')
+
+		assert face_selector_mode == 'many'
+		assert int(process_id) != os.getpid()
+
+	assert sum(progress_updates) == 8
+
+
+def test_multi_process_frames_in_pool_stop() -> None:
+	state_manager.init_item('execution_providers', [ 'cpu' ])
+	state_manager.init_item('execution_thread_count', 2)
+	state_manager.init_item('execution_queue_count', 1)
+	state_manager.init_item('log_level', 'error')
+	temp_directory_path = tempfile.mkdtemp()
+	queue_payloads : List[QueuePayload] = [ { 'frame_number': frame_number, 'frame_path': os.path.join(temp_directory_path, str(frame_number) + '.txt') } for frame_number in range(100) ]
+	process_manager.start()
+	threading.Timer(0.5, process_manager.stop).start()
+
+	multi_process_frames_in_pool([], queue_payloads, process_frames_slowly, lambda count: None)
+	process_manager.end()
+
+	assert len(os.listdir(temp_directory_path)) < 100
@@ -0,0 +1,51 @@
+from onnx import helper
+from onnxruntime import InferenceSession
+
+from facefusion import state_manager
+from facefusion.thread_helper import get_concurrency_limit, inference_semaphore, split_thread_count
+from .helper import create_test_model
+
+
+def create_inference_session() -> InferenceSession:
+	model_path = create_test_model(
+	[
+		helper.make_node('Relu', [ 'input' ], [ 'output' ])
+	],
+	{
+		'input': [ 'batch', 4 ]
+	},
+	{
+		'output': [ 'batch', 4 ]
+	})
+	return InferenceSession(model_path, providers = [ 'CPUExecutionProvider' ])
+
+
+def test_inference_semaphore() -> None:
+	state_manager.init_item('execution_thread_count', 4)
+	state_manager.init_item('execution_concurrency_limit', 0)
+	inference_session = create_inference_session()
+	other_inference_session = create_inference_session()
+
+	assert get_concurrency_limit(inference_session) == 4
+	assert inference_semaphore(inference_session) is inference_semaphore(inference_session)
+	assert inference_semaphore(inference_session) is not inference_semaphore(other_inference_session)
+
+	for _ in range(4):
+		assert inference_semaphore(inference_session).acquire(blocking = False) is True
+	assert inference_semaphore(inference_session).acquire(blocking = False) is False
+	assert inference_semaphore(other_inference_session).acquire(blocking = False) is True
+
+	state_manager.init_item('execution_concurrency_limit', 1)
+
+	assert get_concurrency_limit(inference_session) == 1
+	assert inference_semaphore(inference_session).acquire(blocking = False) is True
+	assert inference_semaphore(inference_session).acquire(blocking = False) is False
+
+	state_manager.init_item('execution_concurrency_limit', 0)
+
+
+def test_split_thread_count() -> None:
+	assert split_thread_count(8, 1) == [ 8 ]
+	assert split_thread_count(8, 4) == [ 2, 2, 2, 2 ]
+	assert split_thread_count(8, 3) == [ 3, 3, 2 ]
+	assert split_thread_count(2, 4) == [ 1, 1, 1, 1 ]
@@ -1,9 +1,12 @@
+import os
 import subprocess
+import tempfile
 
+import numpy
 import pytest
 
 from facefusion.download import conditional_download
-from facefusion.vision import calc_histogram_difference, count_trim_frame_total, count_video_frame_total, create_image_resolutions, create_video_resolutions, detect_image_resolution, detect_video_duration, detect_video_fps, detect_video_resolution, get_video_frame, match_frame_color, normalize_resolution, pack_resolution, read_image, restrict_image_resolution, restrict_trim_frame, restrict_video_fps, restrict_video_resolution, unpack_resolution
+from facefusion.vision import calc_histogram_difference, calc_video_segments, clear_frame_stores, count_frame_store_total, count_trim_frame_total, count_video_frame_total, create_image_resolutions, create_video_resolutions, detect_frame_store_resolution, detect_image_resolution, detect_video_duration, detect_video_fps, detect_video_info, detect_video_resolution, get_video_frame, match_frame_color, normalize_resolution, pack_resolution, read_frame_store_frame, read_image, restrict_image_resolution, restrict_trim_frame, restrict_video_fps, restrict_video_resolution, sample_video_frames, unpack_resolution, write_frame_store_frame, write_frame_store_resolution
 from .helper import get_test_example_file, get_test_examples_directory
 
 
@@ -54,6 +57,53 @@ def test_get_video_frame() -> None:
 	assert get_video_frame('invalid') is None
 
 
+def test_sample_video_frames() -> None:
+	frame_numbers = [ frame_number for frame_number, _ in sample_video_frames(get_test_example_file('target-240p-25fps.mp4'), 0, 100, 25) ]
+
+	assert frame_numbers == [ 0, 25, 50, 75 ]
+	assert [ frame_number for frame_number, _ in sample_video_frames(get_test_example_file('target-240p-25fps.mp4'), 10, 60, 25) ] == [ 25, 50 ]
+	assert list(sample_video_frames('invalid', 0, 100, 25)) == []
+
+
+def test_read_frame_store_frame() -> None:
+	frame_store_path = os.path.join(tempfile.mkdtemp(), 'frames.raw')
+	numpy.zeros((3, 2, 4, 3), dtype = numpy.uint8).tofile(frame_store_path)
+
+	assert count_frame_store_total(frame_store_path) == 0
+
+	write_frame_store_resolution(frame_store_path, (4, 2))
+
+	assert detect_frame_store_resolution(frame_store_path) == (4, 2)
+	assert count_frame_store_total(frame_store_path) == 3
+	assert write_frame_store_frame(frame_store_path, 1, numpy.full((2, 4, 3), 255, dtype = numpy.uint8)) is True
+	assert write_frame_store_frame(frame_store_path, 2, numpy.full((4, 8, 3), 127, dtype = numpy.uint8)) is False
+	assert write_frame_store_frame(frame_store_path, 3, numpy.zeros((2, 4, 3), dtype = numpy.uint8)) is False
+	assert numpy.all(read_frame_store_frame(frame_store_path, 1) == 255)
+	assert numpy.all(read_frame_store_frame(frame_store_path, 2) == 0)
+	assert read_frame_store_frame(frame_store_path, 3) is None
+	assert count_frame_store_total('invalid') == 0
+
+	clear_frame_stores()
+	os.remove(frame_store_path)
+	numpy.full((3, 2, 4, 3), 64, dtype = numpy.uint8).tofile(frame_store_path)
+
+	assert numpy.all(read_frame_store_frame(frame_store_path, 1) == 64)
+
+	clear_frame_stores()
+
+
+def test_detect_video_info() -> None:
+	video_info = detect_video_info(get_test_example_file('target-240p.mp4'))
+
+	assert video_info.get('frame_total') == 270
+	assert video_info.get('fps') == 25.0
+	assert video_info.get('resolution') == (426, 226)
+	assert video_info.get('duration') == 10.8
+	assert video_info.get('codec') == 'avc1'
+	assert detect_video_info(get_test_example_file('target-240p.mp4')) is video_info
+	assert detect_video_info('invalid') is None
+
+
 def test_count_video_frame_total() -> None:
 	assert count_video_frame_total(get_test_example_file('target-240p-25fps.mp4')) == 270
 	assert count_video_frame_total(get_test_example_file('target-240p-30fps.mp4')) == 324
@@ -99,6 +149,13 @@ def test_restrict_trim_frame() -> None:
 	assert restrict_trim_frame(get_test_example_file('target-240p.mp4'), None, None) == (0, 270)
 
 
+def test_calc_video_segments() -> None:
+	assert calc_video_segments([ 0, 50, 100, 150, 200, 250 ], 0, 270, 1) == [ (0, 270) ]
+	assert calc_video_segments([ 0, 50, 100, 150, 200, 250 ], 0, 270, 3) == [ (0, 100), (100, 200), (200, 270) ]
+	assert calc_video_segments([ 0, 50, 100, 150, 200, 250 ], 124, 224, 2) == [ (124, 150), (150, 224) ]
+	assert calc_video_segments([ 0 ], 0, 270, 4) == [ (0, 270) ]
+
+
 def test_detect_video_resolution() -> None:
 	assert detect_video_resolution(get_test_example_file('target-240p.mp4')) == (426, 226)
 	assert detect_video_resolution(get_test_example_file('target-240p-90deg.mp4')) == (226, 426)